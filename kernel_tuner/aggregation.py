@@ -0,0 +1,96 @@
+""" Module with the functions used to aggregate the execution times of multiple iterations
+
+All aggregators accept a numpy array of execution times and aggregate over the last axis,
+such that the times of many configurations with the same number of iterations can be
+aggregated at once.
+"""
+import numpy as np
+from scipy import stats
+
+
+def mean(times):
+    """ Plain average of the execution times """
+    return np.mean(times, axis=-1)
+
+
+def median(times):
+    """ Median of the execution times """
+    return np.median(times, axis=-1)
+
+
+def minimum(times):
+    """ Lowest execution time """
+    return np.min(times, axis=-1)
+
+
+def trimmed_mean(times, proportion=0.2):
+    """ Average of the execution times after removing the given proportion of lowest and highest values """
+    return stats.trim_mean(times, proportion, axis=-1)
+
+
+def mad_mean(times, threshold=3.0):
+    """ Average of the execution times that lie within threshold scaled median absolute deviations from the median """
+    times = np.asarray(times, dtype=np.float64)
+    med = np.median(times, axis=-1, keepdims=True)
+    deviation = np.abs(times - med)
+    # scale the MAD to make it a consistent estimator of the standard deviation of normally distributed data
+    mad = 1.4826 * np.median(deviation, axis=-1, keepdims=True)
+    mask = deviation <= threshold * mad
+    return np.sum(times * mask, axis=-1) / np.sum(mask, axis=-1)
+
+
+aggregators = {
+    "mean": mean,
+    "median": median,
+    "min": minimum,
+    "trimmed_mean": trimmed_mean,
+    "mad_mean": mad_mean,
+}
+
+
+def get_aggregator(aggregator):
+    """ Return the aggregation function for aggregator, which is either the name of a built-in aggregator or a callable """
+    if callable(aggregator):
+        return aggregator
+    if aggregator not in aggregators:
+        raise ValueError(f"Unknown aggregator {aggregator}, choose from {list(aggregators.keys())} or pass a callable")
+    return aggregators[aggregator]
+
+
+def get_aggregator_name(aggregator):
+    """ Return the name under which the aggregator is stored in the cache
+
+    Anonymous functions are rejected, because all of them share the same name and a cache
+    aggregated with one lambda would be mistaken for a cache aggregated with another.
+    """
+    if callable(aggregator):
+        if aggregator.__name__ == "<lambda>":
+            raise ValueError("Aggregator should be a named function instead of a lambda, because its name is stored in the cache")
+        return aggregator.__name__
+    return aggregator
+
+
+def aggregate(times, aggregator="mean"):
+    """ Aggregate the execution times over the last axis using aggregator
+
+    User-supplied callables are only expected to accept a one-dimensional array.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    func = get_aggregator(aggregator)
+    if func in aggregators.values() or times.ndim == 1:
+        return func(times)
+    return np.apply_along_axis(func, -1, times)
+
+
+def bootstrap_confidence_interval(times, aggregator="mean", resamples=1000, confidence=0.95, seed=None):
+    """ Return the percentile bootstrap confidence interval of the aggregated execution times
+
+    All resamples are drawn and aggregated at once as a (resamples, iterations) array.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, times.shape[-1], size=(resamples, times.shape[-1]))
+    estimates = aggregate(times[..., indices], aggregator)
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(estimates, [alpha, 1 - alpha], axis=-1)
+    return lower, upper
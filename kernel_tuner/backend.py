@@ -0,0 +1,98 @@
+""" Module that specifies the interface that backends offer to the DeviceInterface
+
+New backends can be made available as a lang by passing them to kernel_tuner.core.register_backend,
+or by installing a package that advertises them in the "kernel_tuner.backends" entry point group,
+where the name of the entry point is the lang and the value refers to the backend class.
+"""
+from abc import ABC, abstractmethod
+
+# capabilities that backends can declare, features that require a capability the backend lacks are skipped
+capability_flags = ("shared_memory", "constant_memory", "texture_memory", "batch_compile")
+
+required_methods = ("ready_argument_list", "compile", "start_event", "stop_event", "kernel_finished", "synchronize", "run_kernel", "memset",
+                    "memcpy_dtoh", "memcpy_htod")
+
+
+class Backend(ABC):
+    """Base class that specifies the interface of a backend
+
+    The DeviceInterface instantiates the backend passing those of the keyword arguments device, platform,
+    iterations, compiler, compiler_options, observers, compile_cache, precompiled_header, and single_step_compile that appear in
+    the signature of its constructor, or all of them if it accepts arbitrary keyword arguments.
+
+    After construction, a backend should have the following attributes:
+
+     * name, the name of the device
+     * max_threads, the maximum number of threads in a thread block
+     * units, a dictionary with the units of the quantities the backend reports
+     * env, a dictionary with information about the environment
+     * observers, a list of benchmark observers, including one that reports the "time" of each run
+
+    Backends declare which optional features they support in the capabilities class attribute,
+    using the names in kernel_tuner.backend.capability_flags. Backends with the batch_compile capability
+    implement precompile(kernel_instances, max_workers), which compiles a batch of instances ahead of
+    the calls to compile for each of them.
+    """
+    capabilities = frozenset()
+
+    @abstractmethod
+    def ready_argument_list(self, arguments):
+        """ready argument list to be passed to the kernel, allocates device memory if necessary"""
+
+    @abstractmethod
+    def compile(self, kernel_instance):
+        """compile the kernel instance and return a function that can be passed to run_kernel"""
+
+    @abstractmethod
+    def start_event(self):
+        """records the event that marks the start of a measurement"""
+
+    @abstractmethod
+    def stop_event(self):
+        """records the event that marks the end of a measurement"""
+
+    @abstractmethod
+    def kernel_finished(self):
+        """returns True if the kernel has finished, False otherwise"""
+
+    @abstractmethod
+    def synchronize(self):
+        """halts execution until the device has finished its tasks"""
+
+    @abstractmethod
+    def run_kernel(self, func, gpu_args, threads, grid):
+        """runs the kernel once with the given thread block and grid dimensions"""
+
+    @abstractmethod
+    def memset(self, allocation, value, size):
+        """set the memory in allocation to value"""
+
+    @abstractmethod
+    def memcpy_dtoh(self, dest, src):
+        """copy the device memory in src to the host array dest"""
+
+    @abstractmethod
+    def memcpy_htod(self, dest, src):
+        """copy the host array src to the device memory in dest"""
+
+    def copy_shared_memory_args(self, smem_args):
+        """add shared memory arguments to the kernel, requires the shared_memory capability"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support shared memory arguments")
+
+    def copy_constant_memory_args(self, cmem_args):
+        """add constant memory arguments to the most recently compiled module, requires the constant_memory capability"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support constant memory arguments")
+
+    def copy_texture_memory_args(self, texmem_args):
+        """add texture memory arguments to the most recently compiled module, requires the texture_memory capability"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support texture memory arguments")
+
+
+def check_backend(backend):
+    """ raise an exception if backend does not implement the backend interface or declares unknown capabilities """
+    missing = [method for method in required_methods if not callable(getattr(backend, method, None))]
+    if missing:
+        raise TypeError(f"Backend {backend.__name__} does not implement {', '.join(missing)}")
+    unknown = set(getattr(backend, "capabilities", ())) - set(capability_flags)
+    if unknown:
+        raise ValueError(f"Backend {backend.__name__} declares unknown capabilities {', '.join(sorted(unknown))}")
@@ -1,19 +1,27 @@
 """ This module contains the functionality for running and compiling C functions """
 
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 import subprocess
 import platform
 import errno
 import re
 import logging
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import ctypes as C
 import _ctypes
 
 import numpy as np
 import numpy.ctypeslib
 
-from kernel_tuner.observers import BenchmarkObserver
-from kernel_tuner.util import get_temp_filename, delete_temp_file, write_file, SkippableFailure
+from kernel_tuner.observers import RuntimeObserver
+from kernel_tuner.backend import Backend
+from kernel_tuner.util import get_temp_filename, delete_temp_file, write_file, get_runtime_param_type, SkippableFailure
 
 dtype_map = {"int8": C.c_int8,
              "int16": C.c_int16,
@@ -31,7 +39,17 @@ dtype_map = {"int8": C.c_int8,
 # of the argument data. For an ndarray, the ctypes object is a wrapper for the ndarray's data.
 Argument = namedtuple("Argument", ["numpy", "ctypes"])
 
-class CRuntimeObserver(BenchmarkObserver):
+# This represents everything needed to build the shared library of a kernel instance.
+# The precompiled header is optional and not part of what determines the resulting library.
+Build = namedtuple("Build", ["kernel_string", "kernel_name", "suffix", "compiler", "compiler_options", "lib_args", "precompiled_header"],
+                   defaults=[None])
+
+# This represents a loaded shared library and the kernel function it contains.
+Library = namedtuple("Library", ["lib", "func"])
+
+lib_extension = ".dylib" if platform.system() == "Darwin" else ".so"
+
+class CRuntimeObserver(RuntimeObserver):
     """ Observer that collects results returned by benchmarking function """
 
     def __init__(self, dev):
@@ -42,44 +60,172 @@ class CRuntimeObserver(BenchmarkObserver):
     def after_finish(self):
         self.times.append(self.dev.last_result)
 
-    def get_results(self):
-        results = {
-            self.objective: np.average(self.times),
-            self.objective + "s": self.times.copy()
-        }
-        self.times = []
-        return results
 
+def split_include_prefix(kernel_string, params):
+    """split the system includes at the start of the user code from kernel_string
+
+    Only the leading #include <...> lines that do not refer to any tunable parameter are
+    considered independent of the configuration. These lines are replaced by empty lines.
+    The user code starts after the "#line 1" directive inserted by util.prepare_kernel_string.
+
+    :returns: A string with the includes, and the kernel string without the includes.
+    :rtype: string, string
+    """
+    marker = "#line 1\n"
+    start = kernel_string.find(marker)
+    start = 0 if start == -1 else start + len(marker)
+    lines = kernel_string[start:].split("\n")
+
+    include = re.compile(r"\s*#\s*include\s*<[^>]+>\s*$")
+    param_names = re.compile(r"\b(" + "|".join(re.escape(k) for k in params) + r")\b") if params else None
+    includes = []
+    for i, line in enumerate(lines):
+        if include.match(line) and not (param_names and param_names.search(line)):
+            includes.append(line.strip())
+            lines[i] = ""
+        elif line.strip() and not line.strip().startswith("//"):
+            break
 
-class CFunctions(object):
+    if not includes:
+        return "", kernel_string
+    return "\n".join(includes) + "\n", kernel_string[:start] + "\n".join(lines)
+
+
+class CompileCache(object):
+    """On-disk cache of compiled shared libraries, addressed by a hash of everything that determines the library
+
+    The least recently used libraries are evicted when the total size of the cache exceeds max_size bytes.
+    Files are marked as used by updating their modification time, which also works on filesystems mounted
+    with noatime.
+    """
+
+    def __init__(self, directory, max_size=1024**3):
+        """instantiate the compile cache
+
+        :param directory: Directory in which the compiled libraries are stored, created if it does not exist.
+        :type directory: string
+
+        :param max_size: Maximum total size of the cached libraries in bytes, 1 GiB by default.
+        :type max_size: int
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(*args):
+        """ return the hash of all strings and lists of strings in args """
+        hasher = hashlib.sha256()
+        for arg in args:
+            if isinstance(arg, (list, tuple)):
+                arg = "\0".join(arg)
+            hasher.update(str(arg).encode())
+            hasher.update(b"\1")
+        return hasher.hexdigest()
+
+    def get_filename(self, key, lib_extension):
+        return os.path.join(self.directory, key + lib_extension)
+
+    def lookup(self, key, lib_extension):
+        """ return the filename of the cached library for key, or None if it is not in the cache """
+        filename = self.get_filename(key, lib_extension)
+        try:
+            os.utime(filename)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return filename
+
+    def store(self, key, lib_file, lib_extension):
+        """ copy the compiled library lib_file into the cache and evict the least recently used libraries """
+        filename = self.get_filename(key, lib_extension)
+        # copy to a temporary name first, such that concurrent sessions never load a partially written library
+        tmp_filename = filename + "." + str(os.getpid()) + ".tmp"
+        shutil.copyfile(lib_file, tmp_filename)
+        os.replace(tmp_filename, filename)
+        self.evict()
+        return filename
+
+    def evict(self):
+        """ remove the least recently used libraries until the cache fits within max_size """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def get_hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+
+class CFunctions(Backend):
     """Class that groups the code for running and compiling C functions"""
+    capabilities = frozenset(["batch_compile"])
 
-    def __init__(self, iterations=7, compiler_options=None, compiler=None):
+    def __init__(self, iterations=7, compiler_options=None, compiler=None, compile_cache=None, compile_cache_size=1024**3, single_step_compile=False,
+                 precompiled_header=False):
         """instantiate CFunctions object used for interacting with C code
 
         :param iterations: Number of iterations used while benchmarking a kernel, 7 by default.
         :type iterations: int
+
+        :param compile_cache: Directory used to cache compiled libraries across tuning sessions,
+            None by default, which disables the compile cache.
+        :type compile_cache: string
+
+        :param compile_cache_size: Maximum size of the compile cache in bytes, 1 GiB by default.
+        :type compile_cache_size: int
+
+        :param single_step_compile: Compile and link the shared library in a single compiler
+            invocation instead of separate compile and link steps, False by default.
+        :type single_step_compile: bool
+
+        :param precompiled_header: Precompile the system includes at the start of the kernel code once
+            and reuse them for every configuration, only used with g++, False by default.
+        :type precompiled_header: bool
         """
         self.iterations = iterations
         self.max_threads = 1024
         self.compiler_options = compiler_options
         self.compiler = compiler or "g++"  # use gcc by default
+        self.single_step_compile = single_step_compile
+        self.precompiled_header = precompiled_header
+        self.precompiled_headers = dict()
         self.lib = None
+        # recently used libraries of kernels with runtime parameters, such that configurations that only differ in runtime parameters share a library
+        self.loaded_libs = OrderedDict()
+        self.max_loaded_libs = 16
+        # libraries compiled ahead by precompile, used by compile for the same kernel instance
+        self.precompiled = dict()
         self.using_openmp = False
         self.observers = [CRuntimeObserver(self)]
         self.last_result = None
 
         try:
-            cc_version = str(subprocess.check_output([self.compiler, "--version"]))
-            cc_version = cc_version.splitlines()[0].split(" ")[-1]
+            self.cc_version_output = str(subprocess.check_output([self.compiler, "--version"]))
+            cc_version = self.cc_version_output.splitlines()[0].split(" ")[-1]
         except OSError as e:
             raise e
 
         #check if nvcc is available
         self.nvcc_available = False
+        self.nvcc_version_output = None
         try:
-            nvcc_version = str(subprocess.check_output(["nvcc", "--version"]))
-            nvcc_version = nvcc_version.splitlines()[-1].split(" ")[-1]
+            self.nvcc_version_output = str(subprocess.check_output(["nvcc", "--version"]))
+            nvcc_version = self.nvcc_version_output.splitlines()[-1].split(" ")[-1]
             self.nvcc_available = True
         except OSError as e:
             if e.errno != errno.ENOENT:
@@ -93,6 +239,19 @@ class CFunctions(object):
         env["iterations"] = self.iterations
         env["compiler_options"] = compiler_options
         self.env = env
+
+        self.compile_cache = None
+        if compile_cache:
+            self.compile_cache = CompileCache(compile_cache, compile_cache_size)
+            self.update_compile_cache_env()
+
+        if self.precompiled_header:
+            self.pch_dir = tempfile.mkdtemp(prefix="kernel_tuner_pch_")
+            weakref.finalize(self, shutil.rmtree, self.pch_dir, ignore_errors=True)
+            self.pch_build_time = 0.0
+            self.pch_time_saved = 0.0
+            self.pch_uses = 0
+            self.update_precompiled_header_env()
         self.name = platform.processor()
 
     def ready_argument_list(self, arguments):
@@ -139,12 +298,143 @@ class CFunctions(object):
         """
         logging.debug('compiling ' + kernel_instance.name)
 
+        build = self.prepare_build(kernel_instance)
+        build_key = self.get_build_key(build)
+
+        # only configurations that differ in runtime parameters share a library, otherwise the previous library is unloaded
+        reuse = bool(kernel_instance.kernel_source.runtime_params)
+        library = self.precompiled.pop(self.get_instance_key(build_key, kernel_instance), None)
+        if reuse and build_key in self.loaded_libs:
+            logging.debug('reusing loaded library')
+            if library:
+                self.cleanup_lib(library.lib)
+            self.loaded_libs.move_to_end(build_key)
+            self.lib = self.loaded_libs[build_key]
+            func = getattr(self.lib, build.kernel_name)
+        else:
+            if not reuse and self.lib is not None:
+                self.cleanup_lib()
+
+            if library:
+                logging.debug('using precompiled library')
+                self.lib, func = library
+            else:
+                lib_file = self.lookup_compile_cache(build)
+                if lib_file:
+                    self.lib, func = self.load_library(lib_file, build)
+                else:
+                    lib_file = self.run_compiler(self.use_precompiled_header(build, kernel_instance.params))
+                    try:
+                        self.store_compile_cache(build, lib_file)
+                        self.lib, func = self.load_library(lib_file, build)
+                    finally:
+                        delete_temp_file(lib_file)
+
+            if reuse:
+                self.loaded_libs[build_key] = self.lib
+                while len(self.loaded_libs) > self.max_loaded_libs:
+                    _, lib = self.loaded_libs.popitem(last=False)
+                    self.cleanup_lib(lib)
+
+        self.set_runtime_params(self.lib, kernel_instance)
+
+        return func
+
+    def set_runtime_params(self, lib, kernel_instance):
+        """set the global variables of the runtime parameters in lib to their values for kernel_instance"""
+        for name in kernel_instance.kernel_source.runtime_params:
+            value = kernel_instance.params[name]
+            ctype = C.c_int if get_runtime_param_type(value) == "int" else C.c_double
+            ctype.in_dll(lib, name).value = value
+
+    def precompile(self, kernel_instances, max_workers=None):
+        """compile a batch of kernel instances concurrently using compile_many, such that compile uses their libraries
+
+        Instances that fail to build are left for compile, which raises the error when that instance is compiled.
+        """
+        for instance, library in zip(kernel_instances, self.compile_many(kernel_instances, max_workers)):
+            if isinstance(library, Library):
+                key = self.get_instance_key(self.get_build_key(self.prepare_build(instance)), instance)
+                if key in self.precompiled:
+                    self.cleanup_lib(self.precompiled[key].lib)
+                self.precompiled[key] = library
+
+    def compile_many(self, kernel_instances, max_workers=None):
+        """compile a batch of kernel instances concurrently, return an independent library for each instance
+
+        The compiler invocations run in a pool of at most max_workers threads, while preparing
+        the builds, looking up the compile cache, and loading the libraries happens sequentially.
+        Instances with the same build, such as those that only differ in runtime parameters, are
+        compiled once, but every instance loads a copy of the library with its runtime parameters set.
+        The libraries are not stored in self.lib and should be unloaded by the caller
+        using cleanup_lib once they are no longer needed.
+
+        :param kernel_instances: The instances of the tunable kernel to compile.
+        :type kernel_instances: list(kernel_tuner.core.KernelInstance)
+
+        :param max_workers: The maximum number of concurrent compiler invocations,
+            by default the number of CPUs available to this process.
+        :type max_workers: int
+
+        :returns: For each kernel instance a Library with the ctypes library handle and function,
+            or the exception raised while compiling or loading that instance.
+        :rtype: list(Library or Exception)
+        """
+        if max_workers is None:
+            max_workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+        builds = [self.prepare_build(instance) for instance in kernel_instances]
+        build_keys = [self.get_build_key(build) for build in builds]
+        # the index of the first instance with each build
+        first = dict()
+        for i, build_key in enumerate(build_keys):
+            first.setdefault(build_key, i)
+        lib_files = {build_key: self.lookup_compile_cache(builds[i]) for build_key, i in first.items()}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                build_key: executor.submit(self.run_compiler, self.use_precompiled_header(builds[i], kernel_instances[i].params))
+                for build_key, i in first.items() if not lib_files[build_key]
+            }
+
+        errors = dict()
+        for build_key, future in futures.items():
+            try:
+                lib_files[build_key] = future.result()
+                self.store_compile_cache(builds[first[build_key]], lib_files[build_key])
+            except Exception as e:
+                logging.debug('compile_many failed for ' + builds[first[build_key]].kernel_name + ': ' + str(e))
+                errors[build_key] = e
+
+        libraries = []
+        try:
+            for instance, build, build_key in zip(kernel_instances, builds, build_keys):
+                if build_key in errors:
+                    libraries.append(errors[build_key])
+                    continue
+                try:
+                    lib, func = self.load_library_copy(lib_files[build_key], build)
+                    self.set_runtime_params(lib, instance)
+                    libraries.append(Library(lib, func))
+                except Exception as e:
+                    logging.debug('compile_many failed for ' + build.kernel_name + ': ' + str(e))
+                    libraries.append(e)
+        finally:
+            for build_key in futures:
+                if lib_files[build_key]:
+                    delete_temp_file(lib_files[build_key])
+
+        return libraries
+
+    def prepare_build(self, kernel_instance):
+        """determine the source code, compiler, and compiler options used to build kernel_instance
+
+        :returns: A Build describing the compilation of this kernel instance.
+        :rtype: Build
+        """
         kernel_string = kernel_instance.kernel_string
         kernel_name = kernel_instance.name
 
-        if self.lib is not None:
-            self.cleanup_lib()
-
         compiler_options = ["-fPIC"]
 
         #detect openmp
@@ -198,9 +488,6 @@ class CFunctions(object):
         logging.debug('compiler_options ' + " ".join(compiler_options))
         logging.debug('lib_args ' + " ".join(lib_args))
 
-        source_file = get_temp_filename(suffix=suffix)
-        filename = ".".join(source_file.split(".")[:-1])
-
         #detect Fortran modules
         match = re.search(r"\s*module\s+([a-zA-Z_]*)", kernel_string)
         if match:
@@ -215,28 +502,138 @@ class CFunctions(object):
             if self.compiler in ["gfortran", "ftn", "ifort", "pgfortran"]:
                 kernel_name = kernel_name + "_"
 
-        try:
-            write_file(source_file, kernel_string)
+        return Build(kernel_string, kernel_name, suffix, self.compiler, compiler_options, lib_args)
 
-            lib_extension = ".so"
-            if platform.system() == "Darwin":
-                lib_extension = ".dylib"
+    def run_compiler(self, build):
+        """compile build into a temporary shared library, return the filename of the library
 
-            subprocess.check_call([self.compiler, "-c", source_file] + compiler_options + ["-o", filename + ".o"])
-            subprocess.check_call([self.compiler, filename + ".o"] + compiler_options + ["-shared", "-o", filename + lib_extension] + lib_args)
+        The caller is responsible for deleting the library once it has been loaded.
+        This method only touches its own temporary files and can be called from multiple threads.
+        """
+        source_file = get_temp_filename(suffix=build.suffix)
+        filename = ".".join(source_file.split(".")[:-1])
+        lib_file = filename + lib_extension
+
+        include_args = ["-include", build.precompiled_header] if build.precompiled_header else []
 
-            self.lib = np.ctypeslib.load_library(filename, '.')
-            func = getattr(self.lib, kernel_name)
-            func.restype = C.c_float
+        try:
+            write_file(source_file, build.kernel_string)
 
+            if self.single_step_compile:
+                subprocess.check_call([build.compiler, source_file] + include_args + build.compiler_options + ["-shared", "-o", lib_file] +
+                                      build.lib_args)
+            else:
+                subprocess.check_call([build.compiler, "-c", source_file] + include_args + build.compiler_options + ["-o", filename + ".o"])
+                subprocess.check_call([build.compiler, filename + ".o"] + build.compiler_options + ["-shared", "-o", lib_file] + build.lib_args)
+        except Exception:
+            delete_temp_file(lib_file)
+            raise
         finally:
             delete_temp_file(source_file)
             delete_temp_file(filename+".o")
-            delete_temp_file(filename+".so")
-            delete_temp_file(filename+".dylib")
 
-        return func
+        return lib_file
+
+    def use_precompiled_header(self, build, params):
+        """return build modified to include a precompiled header with the includes at the start of the kernel code
 
+        The includes are replaced by empty lines in the kernel code to preserve line numbers. The precompiled
+        header is built once for every distinct set of includes and compiler options. If building the
+        precompiled header fails, the build is returned unmodified. The precompiled header is built without
+        the defines that are inserted in front of the kernel code, so the build is also returned unmodified
+        if the includes expand or test any of these macros, such as NDEBUG for <cassert>.
+        """
+        if not self.precompiled_header or build.compiler != "g++":
+            return build
+        includes, kernel_string = split_include_prefix(build.kernel_string, params)
+        if not includes:
+            return build
+
+        key = CompileCache.get_key(includes, build.compiler_options)
+        if key not in self.precompiled_headers:
+            header = os.path.join(self.pch_dir, key + ".h")
+            write_file(header, includes)
+            start = time.perf_counter()
+            try:
+                subprocess.check_call([build.compiler, "-x", "c++-header", header] + build.compiler_options + ["-o", header + ".gch"])
+                start_parse = time.perf_counter()
+                # the time needed to parse the includes is what the precompiled header saves for every compile
+                subprocess.check_call([build.compiler, "-fsyntax-only", "-x", "c++", header] + build.compiler_options)
+                parse_time = 1000 * (time.perf_counter() - start_parse)
+                # -dU lists the macros that the includes expand or test with defined, -Wundef warns about undefined macros in #if
+                preprocessed = subprocess.run([build.compiler, "-E", "-dU", "-Wundef", "-Wsystem-headers", "-x", "c++", header] + build.compiler_options,
+                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+                used_macros = frozenset(re.findall(r"^#\s*(?:define|undef)\s+(\w+)", preprocessed.stdout, re.MULTILINE) +
+                                        re.findall(r"\"(\w+)\" is not defined", preprocessed.stderr))
+                self.precompiled_headers[key] = (header, parse_time, used_macros)
+                self.pch_build_time += 1000 * (time.perf_counter() - start)
+            except subprocess.CalledProcessError as e:
+                logging.debug('building precompiled header failed: ' + str(e))
+                self.precompiled_headers[key] = None
+        if not self.precompiled_headers[key]:
+            return build
+
+        header, parse_time, used_macros = self.precompiled_headers[key]
+        marker = build.kernel_string.find("#line 1\n")
+        defines = set(re.findall(r"^\s*#\s*define\s+(\w+)", build.kernel_string[:max(marker, 0)], re.MULTILINE))
+        if defines & used_macros:
+            logging.debug('not using precompiled header, the includes depend on ' + ", ".join(sorted(defines & used_macros)))
+            return build
+        self.pch_uses += 1
+        self.pch_time_saved += parse_time
+        self.update_precompiled_header_env()
+        return build._replace(kernel_string=kernel_string, precompiled_header=header)
+
+    def update_precompiled_header_env(self):
+        """ report the time spent on building and saved by using precompiled headers in the environment """
+        self.env["precompiled_header_uses"] = self.pch_uses
+        self.env["precompiled_header_build_time"] = self.pch_build_time
+        self.env["precompiled_header_time_saved"] = self.pch_time_saved - self.pch_build_time
+
+    def load_library(self, lib_file, build):
+        """load the shared library lib_file, return the library and the kernel function"""
+        lib = np.ctypeslib.load_library(lib_file, '.')
+        func = getattr(lib, build.kernel_name)
+        func.restype = C.c_float
+        return lib, func
+
+    def load_library_copy(self, lib_file, build):
+        """load a copy of the shared library lib_file, such that the library gets a handle of its own even if lib_file is loaded already"""
+        lib_copy = get_temp_filename(suffix=lib_extension)
+        try:
+            shutil.copyfile(lib_file, lib_copy)
+            return self.load_library(lib_copy, build)
+        finally:
+            delete_temp_file(lib_copy)
+
+    def get_instance_key(self, build_key, kernel_instance):
+        """return the key of kernel_instance in the precompiled libraries, its build and the values of its runtime parameters"""
+        return (build_key, ) + tuple(kernel_instance.params[name] for name in kernel_instance.kernel_source.runtime_params)
+
+    def get_build_key(self, build):
+        compiler_version = self.nvcc_version_output if build.compiler == "nvcc" else self.cc_version_output
+        return CompileCache.get_key(build.kernel_string, build.suffix, build.compiler, compiler_version, build.compiler_options, build.lib_args)
+
+    def lookup_compile_cache(self, build):
+        """return the filename of the cached library for build, or None if the compile cache is disabled or misses"""
+        if not self.compile_cache:
+            return None
+        lib_file = self.compile_cache.lookup(self.get_build_key(build), lib_extension)
+        self.update_compile_cache_env()
+        if lib_file:
+            logging.debug('using cached library ' + lib_file)
+        return lib_file
+
+    def store_compile_cache(self, build, lib_file):
+        if self.compile_cache:
+            self.compile_cache.store(self.get_build_key(build), lib_file, lib_extension)
+
+    def update_compile_cache_env(self):
+        """ report the compile cache statistics in the environment """
+        self.env["compile_cache"] = self.compile_cache.directory
+        self.env["compile_cache_hits"] = self.compile_cache.hits
+        self.env["compile_cache_misses"] = self.compile_cache.misses
+        self.env["compile_cache_hit_rate"] = self.compile_cache.get_hit_rate()
 
     def start_event(self):
         """ Records the event that marks the start of a measurement
@@ -328,12 +725,12 @@ class CFunctions(object):
         """
         dest.numpy[:] = src
 
-    def cleanup_lib(self):
-        """ unload the previously loaded shared library """
+    def cleanup_lib(self, lib=None):
+        """ unload the previously loaded shared library, or lib if it is given """
         if not self.using_openmp:
             #this if statement is necessary because shared libraries that use
             #OpenMP will core dump when unloaded, this is a well-known issue with OpenMP
             logging.debug('unloading shared library')
-            _ctypes.dlclose(self.lib._handle)
+            _ctypes.dlclose((lib or self.lib)._handle)
 
     units = {}
@@ -1,29 +1,128 @@
 """ Module for grouping the core functionality needed by most runners """
 
 import time
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+import hashlib
+import importlib
+import inspect
 import logging
 import re
+import sys
+import warnings
 import numpy as np
+from scipy import stats
 
-try:
-    import cupy as cp
-except ImportError:
-    cp = np
-
-from kernel_tuner.cupy import CupyFunctions
-from kernel_tuner.pycuda import PyCudaFunctions
-from kernel_tuner.nvcuda import CudaFunctions
-from kernel_tuner.c import CFunctions
-from kernel_tuner.nvml import NVMLObserver
-from kernel_tuner.observers import ContinuousObserver
-from kernel_tuner.opencl import OpenCLFunctions
+from kernel_tuner.backend import check_backend
+from kernel_tuner.observers import ContinuousObserver, RuntimeObserver
 import kernel_tuner.util as util
-
-try:
-    import torch
-except ImportError:
-    torch = util.TorchPlaceHolder()
+from kernel_tuner import aggregation
+
+# the classes implementing the built-in backends, these are only imported when they are used,
+# such that importing kernel_tuner does not import any GPU libraries
+_builtin_backends = OrderedDict(
+    CUDA="kernel_tuner.pycuda:PyCudaFunctions",
+    CUPY="kernel_tuner.cupy:CupyFunctions",
+    NVCUDA="kernel_tuner.nvcuda:CudaFunctions",
+    OPENCL="kernel_tuner.opencl:OpenCLFunctions",
+    C="kernel_tuner.c:CFunctions",
+    FORTRAN="kernel_tuner.c:CFunctions",
+    NUMBA="kernel_tuner.numba:NumbaFunctions",
+)
+
+# the registered backends for each language, either a class or a string "module:Class"
+_backends = OrderedDict(_builtin_backends)
+_entry_points_loaded = False
+
+
+def __getattr__(name):
+    """ import built-in backend classes on first access as attributes of this module """
+    for spec in _builtin_backends.values():
+        module_name, class_name = spec.split(":")
+        if name == class_name:
+            backend = getattr(importlib.import_module(module_name), class_name)
+            globals()[name] = backend
+            return backend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def register_backend(lang, backend, replace=False):
+    """ Register backend as the implementation of lang
+
+    :param lang: The name of the language, as passed to tune_kernel and run_kernel, case insensitive.
+    :type lang: string
+
+    :param backend: A class implementing the interface specified by kernel_tuner.backend.Backend,
+        or a string "module:Class" referring to such a class, which is imported when it is first used.
+    :type backend: class or string
+
+    :param replace: Replace the backend that is already registered for lang, False by default.
+    :type replace: bool
+    """
+    lang = lang.upper()
+    if lang in _backends and not replace:
+        raise ValueError(f"A backend for {lang} is already registered, pass replace=True to replace it")
+    if not isinstance(backend, str):
+        check_backend(backend)
+    _backends[lang] = backend
+
+
+def _load_entry_points():
+    """ register the backends advertised by installed packages in the kernel_tuner.backends entry point group """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return
+    eps = entry_points()
+    eps = eps.select(group="kernel_tuner.backends") if hasattr(eps, "select") else eps.get("kernel_tuner.backends", [])
+    for ep in eps:
+        if ep.name.upper() not in _backends:
+            _backends[ep.name.upper()] = ep.value
+
+
+def get_backend(lang):
+    """ return the class implementing the backend for lang, importing it if needed """
+    lang = lang.upper()
+    if lang not in _backends:
+        _load_entry_points()
+    if lang not in _backends:
+        raise ValueError(f"Sorry, support for languages other than {', '.join(_backends.keys())} is not implemented yet")
+
+    backend = _backends[lang]
+    if isinstance(backend, str):
+        if backend in _builtin_backends.values():
+            # look up built-in classes as attribute of this module, which allows these to be patched
+            return getattr(sys.modules[__name__], backend.split(":")[1])
+        module_name, class_name = backend.split(":")
+        backend = getattr(importlib.import_module(module_name), class_name)
+        check_backend(backend)
+        _backends[lang] = backend
+    return backend
+
+
+def create_backend(backend, **options):
+    """ instantiate backend, passing only the options that appear in the signature of its constructor """
+    parameters = inspect.signature(backend).parameters
+    if not any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+        options = {k: v for k, v in options.items() if k in parameters}
+    return backend(**options)
+
+
+_adaptive_iterations_options = OrderedDict(
+    rse=("Target relative standard error of the mean execution time", 0.01),
+    min_iterations=("Minimum number of iterations", 3),
+    max_iterations=("Maximum number of iterations", 100),
+    max_time=("Maximum time in seconds spent on benchmarking a single configuration", 1.0),
+)
+
+_racing_options = OrderedDict(
+    margin=("Relative margin by which a configuration may be slower than the best configuration before it is dropped", 0.0),
+    confidence=("Confidence level of the lower bound on the mean execution time", 0.95),
+    min_iterations=("Minimum number of iterations before a configuration can be dropped", 2),
+)
 
 _KernelInstance = namedtuple("_KernelInstance", ["name", "kernel_source", "kernel_string", "temp_files", "threads", "grid", "params", "arguments"])
 
@@ -42,6 +141,8 @@ class KernelInstance(_KernelInstance):
         util.write_file(temp_filename, self.kernel_string)
         ret = [temp_filename]
         ret.extend(self.temp_files.values())
+        # make sure the temp files are not removed when the kernel source is cleaned up
+        self.kernel_source.keep_temp_files(self.temp_files)
         return ret
 
 
@@ -53,14 +154,22 @@ class KernelSource(object):
     or a callable (generating the kernel source code).
     There can additionally be (one or multiple) secondary kernel sources, which
     must be filenames.
+
+    Kernel sources that are not generated are read only once. The prepared kernel strings
+    and temporary files of the most recently prepared instances are kept for reuse,
+    the temporary files are owned by the KernelSource and removed by cleanup().
     """
 
-    def __init__(self, kernel_name, kernel_sources, lang, defines=None):
+    def __init__(self, kernel_name, kernel_sources, lang, defines=None, runtime_params=None):
         if not isinstance(kernel_sources, list):
             kernel_sources = [kernel_sources]
         self.kernel_sources = kernel_sources
         self.kernel_name = kernel_name
         self.defines = defines
+        self.runtime_params = runtime_params or []
+        self.kernel_strings = dict()
+        self.prepared = OrderedDict()
+        self.max_prepared = 64
         if lang is None:
             if callable(self.kernel_sources[0]):
                 raise TypeError("Please specify language when using a code generator function")
@@ -88,7 +197,11 @@ class KernelSource(object):
         logging.debug('get_kernel_string called')
 
         kernel_source = self.kernel_sources[index]
-        return util.get_kernel_string(kernel_source, params)
+        if callable(kernel_source):
+            return util.get_kernel_string(kernel_source, params)
+        if index not in self.kernel_strings:
+            self.kernel_strings[index] = util.get_kernel_string(kernel_source, params)
+        return self.kernel_strings[index]
 
     def prepare_list_of_files(self, kernel_name, params, grid, threads, block_size_names):
         """ prepare the kernel string along with any additional files
@@ -122,6 +235,24 @@ class KernelSource(object):
         :type block_size_names: list(string)
 
         """
+        # everything that determines the defines inserted in the code
+        key = hashlib.sha1(repr((kernel_name, list(params.items()), tuple(grid), tuple(threads), block_size_names)).encode()).hexdigest()
+        if key in self.prepared:
+            self.prepared.move_to_end(key)
+            name, kernel_string, temp_files = self.prepared[key]
+            return name, kernel_string, dict(temp_files)
+
+        name, kernel_string, temp_files = self._prepare_list_of_files(kernel_name, params, grid, threads, block_size_names)
+
+        self.prepared[key] = (name, kernel_string, temp_files)
+        while len(self.prepared) > self.max_prepared:
+            _, (_, _, evicted_files) = self.prepared.popitem(last=False)
+            for temp_file in evicted_files.values():
+                util.delete_temp_file(temp_file)
+
+        return name, kernel_string, dict(temp_files)
+
+    def _prepare_list_of_files(self, kernel_name, params, grid, threads, block_size_names):
         temp_files = dict()
 
         for i, f in enumerate(self.kernel_sources):
@@ -129,9 +260,9 @@ class KernelSource(object):
                 raise ValueError('When passing multiple kernel sources, the secondary entries must be filenames')
 
             ks = self.get_kernel_string(i, params)
-            # add preprocessor statements
+            # add preprocessor statements, the runtime parameters are only defined in the primary kernel source
             n, ks = util.prepare_kernel_string(kernel_name, ks, params, grid, threads, block_size_names,
-                                               self.lang, self.defines)
+                                               self.lang, self.defines, self.runtime_params, extern_runtime_params=i > 0)
 
             if i == 0:
                 # primary kernel source
@@ -150,6 +281,19 @@ class KernelSource(object):
 
         return name, kernel_string, temp_files
 
+    def keep_temp_files(self, temp_files):
+        """ Stop reusing the prepared instance with temp_files, such that its temporary files are not deleted """
+        for key, (_, _, prepared_files) in list(self.prepared.items()):
+            if temp_files and prepared_files == temp_files:
+                del self.prepared[key]
+
+    def cleanup(self):
+        """ Delete the temporary files of all prepared instances """
+        for _, _, temp_files in self.prepared.values():
+            for temp_file in temp_files.values():
+                util.delete_temp_file(temp_file)
+        self.prepared.clear()
+
     def get_user_suffix(self, index=0):
         """ Get the suffix of the kernel filename, if the user specified one. Return None otherwise.
         """
@@ -172,7 +316,8 @@ class KernelSource(object):
         _suffixes = {
             'CUDA': '.cu',
             'OpenCL': '.cl',
-            'C': '.c'
+            'C': '.c',
+            'NUMBA': '.py'
         }
         try:
             return _suffixes[self.lang]
@@ -184,6 +329,9 @@ class KernelSource(object):
 
         This is done by calling util.check_argument_list on each kernel string.
         """
+        if self.lang == "NUMBA":
+            logging.debug("Checking of arguments list not supported for Python functions.")
+            return
         for i, f in enumerate(self.kernel_sources):
             if not callable(f):
                 util.check_argument_list(kernel_name, self.get_kernel_string(i), arguments)
@@ -194,7 +342,8 @@ class KernelSource(object):
 class DeviceInterface(object):
     """Class that offers a High-Level Device Interface to the rest of the Kernel Tuner"""
 
-    def __init__(self, kernel_source, device=0, platform=0, quiet=False, compiler=None, compiler_options=None, iterations=7, observers=None):
+    def __init__(self, kernel_source, device=0, platform=0, quiet=False, compiler=None, compiler_options=None, iterations=7, observers=None, compile_cache=None,
+                 precompiled_header=False, single_step_compile=False, compile_workers=None):
         """ Instantiate the DeviceInterface, based on language in kernel source
 
         :param kernel_source: The kernel sources
@@ -220,6 +369,18 @@ class DeviceInterface(object):
         :param iterations: Number of iterations to be used when benchmarking using this device.
         :type iterations: int
 
+        :param compile_cache: Directory used to cache compiled libraries across sessions, only used with lang="C".
+        :type compile_cache: string
+
+        :param precompiled_header: Precompile the includes at the start of the kernel code, only used with lang="C".
+        :type precompiled_header: bool
+
+        :param single_step_compile: Compile and link in a single compiler invocation, only used with lang="C".
+        :type single_step_compile: bool
+
+        :param compile_workers: Number of kernel instances compiled concurrently by precompile, None disables precompile.
+        :type compile_workers: int
+
         :param times: Return the execution time of all iterations.
         :type times: bool
 
@@ -228,23 +389,17 @@ class DeviceInterface(object):
 
         logging.debug('DeviceInterface instantiated, lang=%s', lang)
 
-        if lang.upper() == "CUDA":
-            dev = PyCudaFunctions(device, compiler_options=compiler_options, iterations=iterations, observers=observers)
-        elif lang.upper() == "CUPY":
-            dev = CupyFunctions(device, compiler_options=compiler_options, iterations=iterations, observers=observers)
-        elif lang.upper() == "NVCUDA":
-            dev = CudaFunctions(device, compiler_options=compiler_options, iterations=iterations, observers=observers)
-        elif lang.upper() == "OPENCL":
-            dev = OpenCLFunctions(device, platform, compiler_options=compiler_options, iterations=iterations, observers=observers)
-        elif lang.upper() in ["C", "FORTRAN"]:
-            dev = CFunctions(compiler=compiler, compiler_options=compiler_options, iterations=iterations)
-        else:
-            raise ValueError("Sorry, support for languages other than CUDA, OpenCL, or C is not implemented yet")
+        backend = get_backend(lang)
+        dev = create_backend(backend, device=device, platform=platform, compiler=compiler, compiler_options=compiler_options, iterations=iterations,
+                             observers=observers, compile_cache=compile_cache, precompiled_header=precompiled_header,
+                             single_step_compile=single_step_compile)
+        self.capabilities = frozenset(getattr(backend, "capabilities", ()))
 
         #look for NVMLObserver in observers, if present, enable special tunable parameters through nvml
         self.use_nvml = False
         self.continuous_observers = []
         if observers:
+            from kernel_tuner.nvml import NVMLObserver
             for obs in observers:
                 if isinstance(obs, NVMLObserver):
                     self.nvml = obs.nvml
@@ -253,6 +408,7 @@ class DeviceInterface(object):
                     self.continuous_observers.append(obs.continuous_observer)
 
         self.iterations = iterations
+        self.compile_workers = compile_workers if compile_workers and self.check_capability("batch_compile", "compile_workers") else None
 
         self.lang = lang
         self.dev = dev
@@ -263,12 +419,41 @@ class DeviceInterface(object):
             print("Using: " + self.dev.name)
 
 
-    def benchmark_default(self, func, gpu_args, threads, grid, result):
-        """ Benchmark one kernel execution at a time """
+    def benchmark_default(self, func, gpu_args, threads, grid, result, adaptive_iterations=None, racing=None, incumbent=None, aggregator="mean",
+                          bootstrap=None):
+        """ Benchmark one kernel execution at a time
+
+        By default the kernel is executed self.iterations times. When adaptive_iterations
+        is passed, the kernel is executed until the relative standard error of the measured
+        execution times falls below the target or until the maximum number of iterations or
+        the time budget is reached.
+
+        When racing is passed together with the execution time of the best configuration
+        so far (incumbent), benchmarking stops as soon as the lower confidence bound on the
+        aggregated execution time shows that this configuration cannot compete with the incumbent.
+        Such results are marked as partial.
+
+        The execution times are aggregated using aggregator, and if bootstrap is set to a
+        number of resamples a bootstrap confidence interval is reported as well.
+        """
         observers = [obs for obs in self.dev.observers if not isinstance(obs, ContinuousObserver)]
+        for obs in observers:
+            if isinstance(obs, RuntimeObserver):
+                obs.aggregator = aggregator
+                obs.bootstrap = bootstrap
+
+        iterations = self.iterations
+        if adaptive_iterations or racing:
+            runtime_observer = next(obs for obs in observers if isinstance(obs, RuntimeObserver))
+        if adaptive_iterations:
+            options = get_adaptive_iterations_options(adaptive_iterations)
+            iterations = max(options["max_iterations"], options["min_iterations"])
+            start_time = time.perf_counter()
+        if racing:
+            racing_options = get_racing_options(racing)
 
         self.dev.synchronize()
-        for _ in range(self.iterations):
+        for i in range(iterations):
             for obs in observers:
                 obs.before_start()
             self.dev.synchronize()
@@ -285,6 +470,25 @@ class DeviceInterface(object):
             for obs in observers:
                 obs.after_finish()
 
+            if racing and incumbent is not None and i < iterations - 1:
+                times = runtime_observer.times
+                if len(times) >= max(racing_options["min_iterations"], 2):
+                    lower_bound = get_lower_confidence_bound(times, racing_options["confidence"], aggregator, bootstrap or 1000)
+                    if lower_bound > incumbent * (1 + racing_options["margin"]):
+                        result["partial"] = True
+                        break
+
+            if adaptive_iterations:
+                times = runtime_observer.times
+                if len(times) >= max(options["min_iterations"], 2):
+                    if get_relative_standard_error(times) <= options["rse"] or (time.perf_counter() - start_time) >= options["max_time"]:
+                        break
+
+        if adaptive_iterations or result.get("partial"):
+            result["iterations"] = len(runtime_observer.times)
+        if adaptive_iterations:
+            result["time_ci"] = get_confidence_interval(runtime_observer.times, 0.95, aggregator, bootstrap or 1000)
+
         for obs in observers:
             result.update(obs.get_results())
 
@@ -315,7 +519,8 @@ class DeviceInterface(object):
 
 
 
-    def benchmark(self, func, gpu_args, instance, verbose, objective):
+    def benchmark(self, func, gpu_args, instance, verbose, objective, adaptive_iterations=None, racing=None, incumbent=None, aggregator="mean",
+                  bootstrap=None):
         """benchmark the kernel instance"""
         logging.debug('benchmark ' + instance.name)
         logging.debug('thread block dimensions x,y,z=%d,%d,%d', *instance.threads)
@@ -333,9 +538,10 @@ class DeviceInterface(object):
 
         result = {}
         try:
-            self.benchmark_default(func, gpu_args, instance.threads, instance.grid, result)
+            self.benchmark_default(func, gpu_args, instance.threads, instance.grid, result, adaptive_iterations, racing, incumbent, aggregator, bootstrap)
 
-            if self.continuous_observers:
+            # continuous benchmarking is skipped for configurations that were dropped early
+            if self.continuous_observers and not result.get("partial"):
                 duration = 1
                 for obs in self.continuous_observers:
                     obs.results = result
@@ -369,6 +575,9 @@ class DeviceInterface(object):
         if not verify and len(instance.arguments) != len(answer):
             raise TypeError("The length of argument list and provided results do not match.")
 
+        cp = util.get_optional_module("cupy", np)
+        torch = util.get_optional_module("torch", util.TorchPlaceHolder())
+
         #re-copy original contents of output arguments to GPU memory, to overwrite any changes
         #by earlier kernel runs
         for i, arg in enumerate(instance.arguments):
@@ -405,8 +614,11 @@ class DeviceInterface(object):
         if not correct:
             raise RuntimeError("Kernel result verification failed for: " + util.get_config_string(instance.params))
 
-    def compile_and_benchmark(self, kernel_source, gpu_args, params, kernel_options, to):
-        """ Compile and benchmark a kernel instance based on kernel strings and parameters """
+    def compile_and_benchmark(self, kernel_source, gpu_args, params, kernel_options, to, incumbent=None):
+        """ Compile and benchmark a kernel instance based on kernel strings and parameters
+
+        incumbent is the execution time of the best configuration so far, used for racing.
+        """
         instance_string = util.get_instance_string(params)
 
         # reset previous timers
@@ -430,14 +642,12 @@ class DeviceInterface(object):
             if not func:
                 result[to.objective] = util.CompilationFailedConfig()
             else:
-                # add shared memory arguments to compiled module
-                if kernel_options.smem_args is not None:
+                # add shared, constant, and texture memory arguments to compiled module, if supported by the backend
+                if kernel_options.smem_args is not None and self.check_capability("shared_memory", "smem_args"):
                     self.dev.copy_shared_memory_args(util.get_smem_args(kernel_options.smem_args, params))
-                # add constant memory arguments to compiled module
-                if kernel_options.cmem_args is not None:
+                if kernel_options.cmem_args is not None and self.check_capability("constant_memory", "cmem_args"):
                     self.dev.copy_constant_memory_args(kernel_options.cmem_args)
-                # add texture memory arguments to compiled module
-                if kernel_options.texmem_args is not None:
+                if kernel_options.texmem_args is not None and self.check_capability("texture_memory", "texmem_args"):
                     self.dev.copy_texture_memory_args(kernel_options.texmem_args)
 
             # stop compilation stopwatch and convert to miliseconds
@@ -452,7 +662,9 @@ class DeviceInterface(object):
             # benchmark
             if func:
                 start_benchmark = time.perf_counter()
-                result.update(self.benchmark(func, gpu_args, instance, verbose, to.objective))
+                result.update(
+                    self.benchmark(func, gpu_args, instance, verbose, to.objective, to.get("adaptive_iterations"), to.get("racing"), incumbent,
+                                   to.get("aggregator") or "mean", to.get("bootstrap")))
                 last_benchmark_time = 1000 * (time.perf_counter() - start_benchmark)
 
         except Exception as e:
@@ -461,15 +673,23 @@ class DeviceInterface(object):
             print("Error while compiling or benchmarking, see source files: " + " ".join(temp_filenames))
             raise e
 
-        #clean up any temporary files, if no error occured
-        instance.delete_temp_files()
-
         result['compile_time'] = last_compilation_time or 0
         result['verification_time'] = last_verification_time or 0
         result['benchmark_time'] = last_benchmark_time or 0
 
         return result
 
+    def precompile(self, kernel_source, kernel_options, param_configs):
+        """compile the kernel instances of a batch of configurations concurrently, if compile_workers is set
+
+        The backend keeps the compiled instances, such that compile_and_benchmark only has to compile
+        the configurations that failed to build, which raises their errors as usual.
+        """
+        if not self.compile_workers:
+            return
+        instances = [self.create_kernel_instance(kernel_source, kernel_options, params, False) for params in param_configs]
+        self.dev.precompile([instance for instance in instances if not isinstance(instance, util.ErrorConfig)], self.compile_workers)
+
     def compile_kernel(self, instance, verbose):
         """compile the kernel for this specific instance"""
         logging.debug('compile_kernel ' + instance.name)
@@ -493,26 +713,37 @@ class DeviceInterface(object):
                 raise e
         return func
 
+    def supports(self, capability):
+        """return True if the backend supports capability, see kernel_tuner.backend.capability_flags"""
+        return capability in self.capabilities
+
+    def check_capability(self, capability, option):
+        """return True if the backend supports capability, otherwise warn that option is ignored"""
+        if self.supports(capability):
+            return True
+        warnings.warn(f"Ignoring {option}, the backend for {self.lang} does not support {capability.replace('_', ' ')}", UserWarning)
+        return False
+
     def copy_shared_memory_args(self, smem_args):
-        """adds shared memory arguments to the most recently compiled module, if using CUDA"""
-        if self.lang == "CUDA":
+        """adds shared memory arguments to the most recently compiled module, if the backend supports shared memory"""
+        if self.supports("shared_memory"):
             self.dev.copy_shared_memory_args(smem_args)
         else:
-            raise RuntimeError("Error cannot copy shared memory arguments when language is not CUDA")
+            raise RuntimeError(f"Error cannot copy shared memory arguments, the backend for {self.lang} does not support shared memory")
 
     def copy_constant_memory_args(self, cmem_args):
-        """adds constant memory arguments to the most recently compiled module, if using CUDA"""
-        if self.lang == "CUDA":
+        """adds constant memory arguments to the most recently compiled module, if the backend supports constant memory"""
+        if self.supports("constant_memory"):
             self.dev.copy_constant_memory_args(cmem_args)
         else:
-            raise RuntimeError("Error cannot copy constant memory arguments when language is not CUDA")
+            raise RuntimeError(f"Error cannot copy constant memory arguments, the backend for {self.lang} does not support constant memory")
 
     def copy_texture_memory_args(self, texmem_args):
-        """adds texture memory arguments to the most recently compiled module, if using CUDA"""
-        if self.lang == "CUDA":
+        """adds texture memory arguments to the most recently compiled module, if the backend supports texture memory"""
+        if self.supports("texture_memory"):
             self.dev.copy_texture_memory_args(texmem_args)
         else:
-            raise RuntimeError("Error cannot copy texture memory arguments when language is not CUDA")
+            raise RuntimeError(f"Error cannot copy texture memory arguments, the backend for {self.lang} does not support texture memory")
 
     def create_kernel_instance(self, kernel_source, kernel_options, params, verbose):
         """create kernel instance from kernel source, parameters, problem size, grid divisors, and so on"""
@@ -570,8 +801,81 @@ class DeviceInterface(object):
         return True
 
 
+def _get_benchmark_options(user_options, options, name):
+    """ Get the options from a user-supplied bool or dict, using the defaults for options not specified """
+    if user_options is True:
+        user_options = {}
+    if not isinstance(user_options, dict):
+        raise ValueError(f"{name} should be either True or a dict")
+    for key in user_options:
+        if key not in options:
+            raise ValueError(f"Unrecognized option {key} in {name}")
+    return {opt: user_options.get(opt, default) for opt, (_, default) in options.items()}
+
+
+def get_adaptive_iterations_options(adaptive_iterations):
+    """ Get the adaptive iterations options, or their defaults, from a user-supplied bool or dict """
+    options = _get_benchmark_options(adaptive_iterations, _adaptive_iterations_options, "adaptive_iterations")
+    if options["min_iterations"] < 1:
+        raise ValueError("min_iterations in adaptive_iterations should be at least one")
+    return options
+
+
+def get_racing_options(racing):
+    """ Get the racing options, or their defaults, from a user-supplied bool or dict """
+    options = _get_benchmark_options(racing, _racing_options, "racing")
+    if not 0 < options["confidence"] < 1:
+        raise ValueError("confidence in racing should be between 0 and 1")
+    return options
+
+
+def get_relative_standard_error(times):
+    """ Return the standard error of the mean of times relative to the mean """
+    times = np.asarray(times)
+    if times.size < 2:
+        return np.inf
+    mean = np.mean(times)
+    if mean == 0:
+        return 0.0
+    return float(np.std(times, ddof=1) / np.sqrt(times.size) / abs(mean))
+
+
+def get_lower_confidence_bound(times, confidence=0.95, aggregator="mean", resamples=1000):
+    """ Return the one-sided lower confidence bound of the aggregated times
+
+    The bound of the mean is based on the Student t-distribution, for other aggregators a bootstrap is used.
+    """
+    times = np.asarray(times)
+    if times.size < 2:
+        return -np.inf
+    if aggregation.get_aggregator(aggregator) is not aggregation.mean:
+        lower, _ = aggregation.bootstrap_confidence_interval(times, aggregator, resamples, 2 * confidence - 1)
+        return float(lower)
+    mean = float(np.mean(times))
+    return mean - float(stats.t.ppf(confidence, times.size - 1) * np.std(times, ddof=1) / np.sqrt(times.size))
+
+
+def get_confidence_interval(times, confidence=0.95, aggregator="mean", resamples=1000):
+    """ Return the confidence interval of the aggregated times
+
+    The interval of the mean is based on the Student t-distribution, for other aggregators a bootstrap is used.
+    """
+    times = np.asarray(times)
+    if times.size < 2:
+        value = float(aggregation.aggregate(times, aggregator))
+        return [value, value]
+    if aggregation.get_aggregator(aggregator) is not aggregation.mean:
+        lower, upper = aggregation.bootstrap_confidence_interval(times, aggregator, resamples, confidence)
+        return [float(lower), float(upper)]
+    mean = float(np.mean(times))
+    half_width = stats.t.ppf(0.5 + confidence / 2, times.size - 1) * np.std(times, ddof=1) / np.sqrt(times.size)
+    return [mean - float(half_width), mean + float(half_width)]
+
+
 def _default_verify_function(instance, answer, result_host, atol, verbose):
     """default verify function based on np.allclose"""
+    cp = util.get_optional_module("cupy", np)
+    torch = util.get_optional_module("torch", util.TorchPlaceHolder())
 
     #first check if the length is the same
     if len(instance.arguments) != len(answer):
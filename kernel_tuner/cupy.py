@@ -6,7 +6,8 @@ import logging
 import time
 import numpy as np
 
-from kernel_tuner.observers import BenchmarkObserver
+from kernel_tuner.backend import Backend
+from kernel_tuner.observers import RuntimeObserver
 
 #embedded in try block to be able to generate documentation
 #and run tests without cupy installed
@@ -16,7 +17,7 @@ except ImportError:
     cp = None
 
 
-class CupyRuntimeObserver(BenchmarkObserver):
+class CupyRuntimeObserver(RuntimeObserver):
     """ Observer that measures time using CUDA events during benchmarking """
     def __init__(self, dev):
         self.dev = dev
@@ -28,14 +29,10 @@ class CupyRuntimeObserver(BenchmarkObserver):
     def after_finish(self):
         self.times.append(cp.cuda.get_elapsed_time(self.start, self.end)) #ms
 
-    def get_results(self):
-        results = {"time": np.average(self.times), "times": self.times.copy()}
-        self.times = []
-        return results
-
 
-class CupyFunctions:
+class CupyFunctions(Backend):
     """Class that groups the Cupy functions on maintains state about the device"""
+    capabilities = frozenset(["shared_memory", "constant_memory"])
 
     def __init__(self, device=0, iterations=7, compiler_options=None, observers=None):
         """instantiate CupyFunctions object used for interacting with the CUDA device
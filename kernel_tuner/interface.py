@@ -31,17 +31,14 @@ import numpy
 from time import perf_counter
 
 from kernel_tuner.integration import get_objective_defaults
+from kernel_tuner import aggregation, models
 
 import kernel_tuner.util as util
 import kernel_tuner.core as core
 
 from kernel_tuner.runners.sequential import SequentialRunner
 from kernel_tuner.runners.simulation import SimulationRunner
-
-try:
-    import torch
-except ImportError:
-    torch = util.TorchPlaceHolder()
+from kernel_tuner.runners.model import ModelRunner
 
 from kernel_tuner.strategies import (
     brute_force,
@@ -59,6 +56,12 @@ from kernel_tuner.strategies import (
     greedy_ils,
     ordered_greedy_mls,
     dual_annealing,
+    smac,
+    tpe,
+    cma_es,
+    island_genetic_algorithm,
+    tabu_search,
+    successive_halving,
 )
 
 strategy_map = {
@@ -77,6 +80,12 @@ strategy_map = {
     "simulated_annealing": simulated_annealing,
     "firefly_algorithm": firefly_algorithm,
     "bayes_opt": bayes_opt,
+    "smac": smac,
+    "tpe": tpe,
+    "cma_es": cma_es,
+    "island_genetic_algorithm": island_genetic_algorithm,
+    "tabu_search": tabu_search,
+    "successive_halving": successive_halving,
 }
 
 
@@ -123,7 +132,9 @@ _kernel_options = Options([
             """Specifies the language used for GPU kernels. The kernel_tuner
         automatically detects the language, but if it fails, you may specify
         the language using this argument, currently supported: "CUDA", "Cupy",
-        "OpenCL", or "C".""",
+        "OpenCL", "C", or "NUMBA" for Python functions compiled with Numba.
+        Additional languages can be supported by registering a backend with
+        kernel_tuner.core.register_backend.""",
             "string",
         ),
     ),
@@ -274,6 +285,19 @@ _kernel_options = Options([
             "dict",
         ),
     ),
+    (
+        "runtime_params",
+        (
+            """A list of names of tunable parameters that are passed to the kernel at runtime
+            instead of as preprocessor definitions, only supported for C and C++ kernels with lang="C".
+            Each runtime parameter is declared as a global variable of type int or double,
+            depending on its value, and is set before the kernel is run. Configurations that only
+            differ in runtime parameters share a single compiled library, which avoids recompiling for
+            every configuration. Runtime parameters cannot be used where the code requires a
+            compile-time constant, for example in array sizes or preprocessor conditionals.""",
+            "list(string)",
+        ),
+    ),
 ])
 
 _tuning_options = Options([
@@ -371,6 +395,7 @@ _tuning_options = Options([
             * "basinhopping" Basin Hopping
             * "bayes_opt" Bayesian Optimization
             * "brute_force" (default) iterates through the entire search space
+            * "cma_es" covariance matrix adaptation evolution strategy
             * "minimize" uses a local minimization algorithm
             * "dual annealing" dual annealing
             * "diff_evo" differential evolution
@@ -378,11 +403,16 @@ _tuning_options = Options([
             * "genetic_algorithm" a genetic algorithm optimization
             * "greedy_ils" greedy randomized iterative local search
             * "greedy_mls" greedy randomized multi-start local search
+            * "island_genetic_algorithm" a genetic algorithm with sub-populations that exchange their best individuals
             * "mls" best-improvement multi-start local search
             * "ordered_greedy_mls" multi-start local search that uses a fixed order
             * "pso" particle swarm optimization
             * "random_sample" takes a random sample of the search space
             * "simulated_annealing" simulated annealing strategy
+            * "smac" sequential model-based optimization with a random forest
+            * "successive_halving" evaluates many configurations at cheaper fidelities and promotes the best
+            * "tabu_search" tabu search with aspiration criteria
+            * "tpe" tree-structured Parzen estimator
 
         Strategy-specific parameters and options are explained under strategy_options.
 
@@ -418,6 +448,73 @@ _tuning_options = Options([
             "int",
         ),
     ),
+    (
+        "adaptive_iterations",
+        (
+            """Enables adaptive benchmarking, in which the number of iterations
+        used to benchmark a kernel configuration is not fixed but determined at runtime.
+        The kernel is executed until the relative standard error of the mean execution time
+        falls below a target, or until the maximum number of iterations or the time budget
+        is reached. Pass True to use the defaults or a dict with any of the following keys:
+
+            * "rse": target relative standard error, default 0.01
+            * "min_iterations": minimum number of iterations, default 3
+            * "max_iterations": maximum number of iterations, default 100
+            * "max_time": time budget in seconds for benchmarking a single configuration, default 1.0
+
+        When enabled, the number of iterations used and the 95% confidence interval
+        of the aggregated execution time are stored in the results as "iterations" and "time_ci".
+        The iterations option is ignored when adaptive_iterations is used.
+        None by default.""",
+            "bool or dict",
+        ),
+    ),
+    (
+        "racing",
+        (
+            """Enables racing, in which benchmarking of a kernel configuration is
+        stopped early when a statistical lower bound on its aggregated execution time shows that
+        it cannot compete with the best configuration found so far. Racing can only be used
+        with the objective "time". Pass True to use the defaults or a dict with any of the
+        following keys:
+
+            * "margin": relative margin by which a configuration may be slower than the best configuration before it is dropped, default 0.0
+            * "confidence": confidence level of the one-sided lower bound on the aggregated execution time, default 0.95
+            * "min_iterations": minimum number of iterations before a configuration can be dropped, default 2
+
+        Configurations that were dropped early are marked with "partial" in the results and
+        contain the execution times measured up to that point, they are not stored in the cache. None by default.""",
+            "bool or dict",
+        ),
+    ),
+    (
+        "aggregator",
+        (
+            """The statistic used to aggregate the execution times of all iterations
+        into the reported execution time "time", choose from:
+
+            * "mean" (default) the average of all execution times
+            * "median" the median of all execution times
+            * "min" the lowest execution time
+            * "trimmed_mean" the average after removing the lowest and highest 20 percent of the execution times
+            * "mad_mean" the average of the execution times within three scaled median absolute deviations from the median
+
+        Alternatively, a function can be passed that accepts a numpy array with execution
+        times and returns a single value. The name of the aggregator is stored in the cache file,
+        so the function should be a named function rather than a lambda.
+        Simulation mode re-aggregates cached results when a different aggregator is selected.""",
+            "string or callable",
+        ),
+    ),
+    (
+        "bootstrap",
+        (
+            """The number of bootstrap resamples used to compute a 95% confidence interval
+        of the aggregated execution time, which is stored in the results as "time_bootstrap_ci".
+        None by default, which disables computing bootstrap confidence intervals.""",
+            "int",
+        ),
+    ),
     (
         "objective",
         (
@@ -462,6 +559,19 @@ _tuning_options = Options([
     ),
     ("metrics", ("specifies user-defined metrics, please see :ref:`metrics`.", "OrderedDict")),
     ("simulation_mode", ("Simulate an auto-tuning search from an existing cachefile", "bool")),
+    (
+        "model",
+        (
+            """Compute the execution time of configurations using an analytic model
+        instead of compiling and running the kernel, to test and benchmark strategies
+        without GPUs. Pass the name of a built-in model from kernel_tuner.models:
+        "roofline", "noisy", or "multimodal", or a callable that accepts a dict with an
+        array of values for each tunable parameter and the tunable parameters, and
+        returns the execution times. The kernel is not compiled or run, but the model
+        may simulate compile times and failing configurations. None by default.""",
+            "string or callable",
+        ),
+    ),
     ("observers", ("""A list of Observers to use during tuning, please see :ref:`observers`.""", "list")),
 ])
 
@@ -509,6 +619,50 @@ _device_options = Options([
             "list(string)",
         ),
     ),
+    (
+        "compile_cache",
+        (
+            """A directory in which compiled libraries are cached across tuning
+        sessions, only effective with lang="C". Libraries are addressed by a hash
+        of the kernel code, compiler, compiler options and compiler version, such that
+        identical configurations are never compiled twice. The least recently used
+        libraries are removed when the cache grows beyond 1 GiB. The hit rate is
+        reported in the environment. None by default, which disables the compile cache.""",
+            "string",
+        ),
+    ),
+    (
+        "precompiled_header",
+        (
+            """Build a precompiled header from the system includes (#include <...>)
+        at the start of the kernel code once, and reuse it when compiling every configuration,
+        only effective with lang="C" and the g++ compiler. The time spent building and the
+        estimated compile time saved by precompiled headers are reported in the environment.
+        False by default.""",
+            "bool",
+        ),
+    ),
+    (
+        "single_step_compile",
+        (
+            """Compile and link the shared library of each configuration in a single
+        compiler invocation, instead of separate compile and link steps, only effective
+        with lang="C". False by default.""",
+            "bool",
+        ),
+    ),
+    (
+        "compile_workers",
+        (
+            """Number of configurations that are compiled concurrently. When set, the
+        runner compiles the upcoming configurations that are not in the cache in batches
+        of compile_workers, such that their compile latency overlaps, before benchmarking
+        them one at a time. Only effective for backends that support batch compilation,
+        such as lang="C". None by default, which compiles every configuration right before
+        it is benchmarked.""",
+            "int",
+        ),
+    ),
 ])
 
 
@@ -568,12 +722,22 @@ def tune_kernel(
     observers=None,
     objective=None,
     objective_higher_is_better=None,
+    adaptive_iterations=None,
+    racing=None,
+    aggregator=None,
+    bootstrap=None,
+    compile_cache=None,
+    runtime_params=None,
+    precompiled_header=False,
+    single_step_compile=False,
+    compile_workers=None,
+    model=None,
 ):
     start_overhead_time = perf_counter()
     if log:
         logging.basicConfig(filename=kernel_name + datetime.now().strftime("%Y%m%d-%H:%M:%S") + ".log", level=log)
 
-    kernelsource = core.KernelSource(kernel_name, kernel_source, lang, defines)
+    kernelsource = core.KernelSource(kernel_name, kernel_source, lang, defines, runtime_params)
 
     _check_user_input(kernel_name, kernelsource, arguments, block_size_names)
 
@@ -586,6 +750,9 @@ def tune_kernel(
     # check whether block_size_names are used as expected
     util.check_block_size_params_names_list(block_size_names, tune_params)
 
+    # check whether runtime parameters are tunable parameters of a C kernel
+    util.check_runtime_params(runtime_params, tune_params, kernelsource.lang)
+
     # ensure there is always at least three names
     util.append_default_block_size_names(block_size_names)
 
@@ -596,12 +763,25 @@ def tune_kernel(
     if iterations < 1:
         raise ValueError("Iterations should be at least one!")
 
+    # check adaptive iterations options early, instead of when benchmarking the first configuration
+    if adaptive_iterations:
+        core.get_adaptive_iterations_options(adaptive_iterations)
+    if aggregator:
+        aggregation.get_aggregator(aggregator)
+        aggregation.get_aggregator_name(aggregator)
+    if racing:
+        core.get_racing_options(racing)
+        if objective != "time" or objective_higher_is_better:
+            raise ValueError("Racing can only be used when minimizing the objective 'time'")
+
     # sort all the options into separate dicts
     opts = locals()
     kernel_options = Options([(k, opts[k]) for k in _kernel_options.keys()])
     tuning_options = Options([(k, opts[k]) for k in _tuning_options.keys()])
     device_options = Options([(k, opts[k]) for k in _device_options.keys()])
     tuning_options["snap"] = True
+    if model:
+        tuning_options["model"] = models.get_model(model)
     tuning_options["unique_results"] = {}
     if strategy_options and "max_fevals" in strategy_options:
         tuning_options["max_fevals"] = strategy_options["max_fevals"]
@@ -644,7 +824,10 @@ def tune_kernel(
         strategy = brute_force
 
     # select the runner for this job based on input
-    selected_runner = SimulationRunner if simulation_mode else SequentialRunner
+    if model:
+        selected_runner = ModelRunner
+    else:
+        selected_runner = SimulationRunner if simulation_mode else SequentialRunner
     tuning_options.simulated_time = 0
     runner = selected_runner(kernelsource, kernel_options, device_options, iterations, observers)
 
@@ -664,7 +847,10 @@ def tune_kernel(
 
     # call the strategy to execute the tuning process
     tuning_options["start_time"] = perf_counter()
-    results, env = strategy.tune(runner, kernel_options, device_options, tuning_options)
+    try:
+        results, env = strategy.tune(runner, kernel_options, device_options, tuning_options)
+    finally:
+        kernelsource.cleanup()
 
     # finished iterating over search space
     if not device_options.quiet:
@@ -737,12 +923,17 @@ def run_kernel(
     block_size_names=None,
     quiet=False,
     log=None,
+    compile_cache=None,
+    runtime_params=None,
+    precompiled_header=False,
+    single_step_compile=False,
+    compile_workers=None,
 ):
 
     if log:
         logging.basicConfig(filename=kernel_name + datetime.now().strftime("%Y%m%d-%H:%M:%S") + ".log", level=log)
 
-    kernelsource = core.KernelSource(kernel_name, kernel_source, lang)
+    kernelsource = core.KernelSource(kernel_name, kernel_source, lang, runtime_params=runtime_params)
 
     _check_user_input(kernel_name, kernelsource, arguments, block_size_names)
 
@@ -783,14 +974,14 @@ def run_kernel(
             dev.copy_texture_memory_args(texmem_args)
     finally:
         # delete temp files
-        if instance is not None:
-            instance.delete_temp_files()
+        kernelsource.cleanup()
 
     # run the kernel
     if not dev.run_kernel(func, gpu_args, instance):
         raise RuntimeError("runtime error occured, too many resources requested")
 
     # copy data in GPU memory back to the host
+    torch = util.get_optional_module("torch", util.TorchPlaceHolder())
     results = []
     for i, arg in enumerate(arguments):
         if numpy.isscalar(arg):
@@ -0,0 +1,248 @@
+""" Module with analytic performance models used to tune without running kernels
+
+A model computes the objective of many kernel configurations at once using NumPy, such
+that strategies can be tested and benchmarked without GPUs or existing cache files.
+Models are used by the model runner, which is selected with the model option of tune_kernel.
+
+A model is a callable that accepts a dictionary that maps the name of each tunable parameter
+to a numpy array with the value of that parameter in each configuration, together with the
+tunable parameters. It returns either a numpy array with the execution time of each configuration
+in milliseconds, or a dictionary of numpy arrays that contains "time" and optionally other
+quantities, such as the simulated "compile_time" and "benchmark_time" in milliseconds.
+Configurations with a NaN execution time are considered to have failed.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+
+def get_columns(configs, tune_params):
+    """ Return a dictionary with an array of values for each tunable parameter from a list of configurations """
+    columns = OrderedDict()
+    for i, (name, values) in enumerate(tune_params.items()):
+        column = [config[i] for config in configs]
+        numeric = all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values)
+        columns[name] = np.array(column, dtype=np.float64 if numeric else object)
+    return columns
+
+
+def get_indices(columns, tune_params):
+    """ Return a dictionary with the position of each value in the list of values of its tunable parameter """
+    indices = OrderedDict()
+    for name, column in columns.items():
+        values = tune_params[name]
+        if column.dtype == object:
+            lookup = {v: i for i, v in enumerate(values)}
+            indices[name] = np.array([lookup[v] for v in column], dtype=np.int64)
+        else:
+            order = np.argsort(values, kind="stable")
+            sorted_values = np.asarray(values, dtype=np.float64)[order]
+            positions = np.clip(np.searchsorted(sorted_values, column), 0, len(values) - 1)
+            indices[name] = order[positions]
+    return indices
+
+
+def hash_uniform(indices, seed=0):
+    """ Return a deterministic pseudo-random number in [0, 1) for each configuration, based on its indices """
+    with np.errstate(over="ignore"):
+        h = np.full(len(next(iter(indices.values()))) if indices else 0, np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15), dtype=np.uint64)
+        for column in indices.values():
+            h = (h ^ column.astype(np.uint64)) * np.uint64(0xBF58476D1CE4E5B9)
+            # splitmix64 finalizer to mix the bits of each index into the hash
+            h ^= h >> np.uint64(30)
+            h *= np.uint64(0x94D049BB133111EB)
+            h ^= h >> np.uint64(31)
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class Model:
+    """ Base class for analytic models that simulate compile time and failing configurations
+
+    Subclasses implement get_time, which computes the execution time in milliseconds of all
+    configurations at once.
+
+    :param compile_time: The average simulated compile time of a configuration in milliseconds.
+    :type compile_time: float
+
+    :param failure_rate: The fraction of configurations that fail to run. The failing
+        configurations are chosen pseudo-randomly, but the same configuration always fails.
+    :type failure_rate: float
+
+    :param seed: Seed used to choose the failing configurations and other random properties of the model.
+    :type seed: int
+    """
+
+    def __init__(self, compile_time=1000.0, failure_rate=0.0, seed=0):
+        self.compile_time = compile_time
+        self.failure_rate = failure_rate
+        self.seed = seed
+
+    @property
+    def name(self):
+        return self.__class__.__name__.lower()
+
+    def __call__(self, columns, tune_params):
+        indices = get_indices(columns, tune_params)
+        time = np.asarray(self.get_time(columns, indices, tune_params), dtype=np.float64)
+        if self.failure_rate:
+            time = np.where(hash_uniform(indices, self.seed + 1) < self.failure_rate, np.nan, time)
+        # compile times vary by 50 percent between configurations
+        compile_time = self.compile_time * (0.75 + 0.5 * hash_uniform(indices, self.seed + 2))
+        return dict(time=time, compile_time=compile_time)
+
+    def get_time(self, columns, indices, tune_params):
+        """ Return the execution time in milliseconds of all configurations """
+        raise NotImplementedError()
+
+
+class Roofline(Model):
+    """ Roofline model of a GPU kernel with occupancy cliffs
+
+    The thread block size is the product of the block_size_x, block_size_y, and block_size_z
+    parameters that are present. All other tunable parameters are treated as optimizations
+    that increase data reuse at the cost of more registers per thread. The occupancy is limited
+    by the number of threads and registers per multiprocessor, which introduces cliffs in
+    performance. Configurations that need more than 255 registers per thread or more than
+    1024 threads per block fail.
+
+    :param flops: Number of floating-point operations performed by the kernel.
+    :type flops: float
+
+    :param bytes: Number of bytes moved between the kernel and device memory without any data reuse.
+    :type bytes: float
+
+    :param peak_gflops: Peak compute performance of the device in GFLOP/s.
+    :type peak_gflops: float
+
+    :param bandwidth: Peak memory bandwidth of the device in GB/s.
+    :type bandwidth: float
+
+    :param registers: Number of registers per thread without any optimizations.
+    :type registers: int
+
+    :param register_step: Number of additional registers per thread for each step in the value of an optimization parameter.
+    :type register_step: int
+    """
+
+    block_size_names = ("block_size_x", "block_size_y", "block_size_z")
+    max_threads_per_sm = 2048
+    max_blocks_per_sm = 32
+    registers_per_sm = 65536
+
+    def __init__(self, flops=1e10, bytes=4e9, peak_gflops=20000.0, bandwidth=800.0, registers=32, register_step=16, **kwargs):
+        super().__init__(**kwargs)
+        self.flops = flops
+        self.bytes = bytes
+        self.peak_gflops = peak_gflops
+        self.bandwidth = bandwidth
+        self.registers = registers
+        self.register_step = register_step
+
+    def get_time(self, columns, indices, tune_params):
+        n = len(next(iter(indices.values()))) if indices else 0
+        threads = np.ones(n)
+        steps = np.zeros(n)
+        for name in columns:
+            if name in self.block_size_names:
+                threads = threads * columns[name]
+            else:
+                steps = steps + indices[name]
+
+        warps = np.ceil(threads / 32)
+        registers = self.registers + self.register_step * steps
+        with np.errstate(divide="ignore", invalid="ignore"):
+            blocks = np.minimum.reduce([
+                np.full(n, self.max_blocks_per_sm, dtype=np.float64),
+                np.floor(self.max_threads_per_sm / (warps * 32)),
+                np.floor(self.registers_per_sm / (registers * warps * 32)),
+            ])
+            occupancy = blocks * warps * 32 / self.max_threads_per_sm
+            # latency hiding saturates with occupancy, threads in partially filled warps are wasted
+            efficiency = 1.25 * occupancy / (occupancy + 0.25) * threads / (warps * 32)
+            compute_time = self.flops / (self.peak_gflops * 1e6 * efficiency)
+            memory_time = self.bytes / (1 + steps) / (self.bandwidth * 1e6 * efficiency)
+        time = np.maximum(compute_time, memory_time)
+        failed = (registers > 255) | (threads > 1024) | (blocks < 1)
+        return np.where(failed, np.nan, time)
+
+
+class Noisy(Model):
+    """ Adds multiplicative measurement noise to the execution times of another model
+
+    The noise is drawn from a log-normal distribution for every evaluation, such that
+    repeated evaluations of the same configuration return different execution times.
+
+    :param model: The model to which noise is added, either a model or the name of a built-in model.
+    :type model: string or callable
+
+    :param stddev: The standard deviation of the logarithm of the noise factor.
+    :type stddev: float
+
+    :param seed: Seed of the random number generator used to draw the noise.
+    :type seed: int
+    """
+
+    def __init__(self, model="roofline", stddev=0.05, seed=0):
+        super().__init__(seed=seed)
+        self.model = get_model(model)
+        self.stddev = stddev
+        self.rng = np.random.default_rng(self.seed)
+
+    def __call__(self, columns, tune_params):
+        result = self.model(columns, tune_params)
+        if not isinstance(result, dict):
+            result = dict(time=result)
+        result = dict(result)
+        result["time"] = result["time"] * self.rng.lognormal(0.0, self.stddev, len(result["time"]))
+        return result
+
+
+class Multimodal(Model):
+    """ Multi-modal landscape with many local minima, based on the Rastrigin function
+
+    The position of each parameter value in its list of values is scaled to [0, 1], the
+    global minimum is located at a pseudo-random configuration chosen using the seed.
+
+    :param modes: The number of local minima along each dimension.
+    :type modes: int
+
+    :param amplitude: The relative depth of the local minima.
+    :type amplitude: float
+    """
+
+    def __init__(self, modes=4, amplitude=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.modes = modes
+        self.amplitude = amplitude
+
+    def get_time(self, columns, indices, tune_params):
+        rng = np.random.default_rng(self.seed)
+        n = len(next(iter(indices.values()))) if indices else 0
+        time = np.ones(n)
+        for name, index in indices.items():
+            size = len(tune_params[name])
+            optimum = rng.integers(0, size)
+            z = (index - optimum) / max(size - 1, 1)
+            time += z**2 + self.amplitude * (1 - np.cos(2 * np.pi * self.modes * z)) / len(indices)
+        return time
+
+
+models = {
+    "roofline": Roofline,
+    "noisy": Noisy,
+    "multimodal": Multimodal,
+}
+
+
+def get_model(model):
+    """ Return the model for model, which is either the name of a built-in model or a callable """
+    if callable(model):
+        return model
+    if model not in models:
+        raise ValueError(f"Unknown model {model}, choose from {list(models.keys())} or pass a callable")
+    return models[model]()
+
+
+def get_model_name(model):
+    """ Return the name of the model as reported in the environment """
+    return getattr(model, "name", getattr(model, "__name__", model.__class__.__name__))
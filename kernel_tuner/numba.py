@@ -0,0 +1,226 @@
+""" This module contains the functionality for tuning Python functions compiled with Numba
+
+The kernel source is a Python module that defines a function named after the kernel.
+The tunable parameters are prepended to the module as global variables, which Numba
+treats as compile-time constants. The function is compiled with numba.njit, by default
+with parallel=True, such that numba.prange loops are parallelized. Chunking of prange
+loops can be tuned by using a tunable parameter as the chunk size, for example::
+
+    from numba import prange
+
+    def vector_add(c, a, b, n):
+        for chunk in prange((n + chunk_size - 1) // chunk_size):
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+                c[i] = a[i] + b[i]
+
+The function is benchmarked in-process, the time is measured on the host around each call.
+"""
+import ast
+import hashlib
+import logging
+import platform
+import time
+
+import numpy as np
+
+from kernel_tuner.backend import Backend
+from kernel_tuner.c import CRuntimeObserver
+
+#embedded in try block to be able to generate documentation
+#and run tests without numba installed
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+class NumbaFunctions(Backend):
+    """Class that groups the code for compiling and running Python functions with Numba"""
+
+    def __init__(self, iterations=7, compiler_options=None):
+        """instantiate NumbaFunctions object used for compiling and running Python functions
+
+        :param iterations: Number of iterations used while benchmarking a kernel, 7 by default.
+        :type iterations: int
+
+        :param compiler_options: Options passed to numba.njit, each option is either the name
+            of a flag that is enabled, e.g. "fastmath", or has the form "name=value",
+            e.g. "parallel=False". By default, only parallel=True is passed.
+        :type compiler_options: list(string)
+        """
+        if not numba:
+            raise ImportError("Error: numba not installed, please install e.g. using 'pip install numba'.")
+
+        self.iterations = iterations
+        self.max_threads = 1024
+        self.compiler_options = compiler_options
+        self.jit_options = self.get_jit_options(compiler_options)
+        self.arg_types = None
+        # compiled functions for each kernel string, configurations are only compiled once per session
+        self.compiled = dict()
+        self.compile_cache_hits = 0
+        self.observers = [CRuntimeObserver(self)]
+        self.last_result = None
+
+        env = dict()
+        env["numba_version"] = numba.__version__
+        env["numba_num_threads"] = numba.config.NUMBA_NUM_THREADS
+        env["iterations"] = self.iterations
+        env["compiler_options"] = compiler_options
+        env["jit_options"] = self.jit_options
+        self.env = env
+        self.name = platform.processor()
+
+    @staticmethod
+    def get_jit_options(compiler_options):
+        """convert the list of compiler options into keyword arguments for numba.njit"""
+        jit_options = dict(parallel=True)
+        for option in compiler_options or []:
+            name, _, value = option.partition("=")
+            if not name.isidentifier():
+                raise ValueError(f"Invalid Numba compiler option: {option}")
+            jit_options[name] = ast.literal_eval(value) if value else True
+        return jit_options
+
+    def ready_argument_list(self, arguments):
+        """ready argument list to be passed to the function
+
+        :param arguments: List of arguments to be passed to the function.
+            The order should match the argument list of the function.
+            Allowed values are np.ndarray, and/or np.int32, np.float32, and so on.
+        :type arguments: list(numpy objects)
+
+        :returns: The list of arguments, the numpy objects are passed to the function directly.
+        :rtype: list(numpy objects)
+        """
+        for arg in arguments:
+            if not isinstance(arg, (np.ndarray, np.number)):
+                raise TypeError("Argument is not numpy ndarray or numpy scalar %s" % type(arg))
+        self.arg_types = tuple(numba.typeof(arg) for arg in arguments)
+        return list(arguments)
+
+    def compile(self, kernel_instance):
+        """compile the Python function of this kernel instance with Numba
+
+        Functions are compiled eagerly for the types of the arguments passed to
+        ready_argument_list, such that compile time is not included in the
+        benchmark. Compiled functions are reused for configurations that result
+        in the same kernel string.
+
+        :param kernel_instance: An object representing the specific instance of the tunable kernel
+            in the parameter space.
+        :type kernel_instance: kernel_tuner.core.KernelInstance
+
+        :returns: The compiled function.
+        :rtype: numba.core.registry.CPUDispatcher
+        """
+        logging.debug('compiling ' + kernel_instance.name)
+
+        key = hashlib.sha256("\n".join([kernel_instance.name, kernel_instance.kernel_string, str(self.arg_types)]).encode()).hexdigest()
+        if key in self.compiled:
+            self.compile_cache_hits += 1
+            self.env["compile_cache_hits"] = self.compile_cache_hits
+            return self.compiled[key]
+
+        module = {"__name__": "kernel_tuner_numba_" + key[:16]}
+        exec(compile(kernel_instance.kernel_string, f"<{kernel_instance.name}>", "exec"), module)
+        if kernel_instance.name not in module:
+            raise ValueError(f"Kernel source does not define a function named {kernel_instance.name}")
+        func = module[kernel_instance.name]
+        # recompile functions that are already decorated using our options
+        func = getattr(func, "py_func", func)
+
+        dispatcher = numba.njit(**self.jit_options)(func)
+        if self.arg_types is not None:
+            dispatcher.compile(self.arg_types)
+        self.compiled[key] = dispatcher
+        return dispatcher
+
+    def start_event(self):
+        """ Records the event that marks the start of a measurement
+
+        Numba backend does not use events """
+        pass
+
+    def stop_event(self):
+        """ Records the event that marks the end of a measurement
+
+        Numba backend does not use events """
+        pass
+
+    def kernel_finished(self):
+        """ Returns True if the kernel has finished, False otherwise
+
+        Numba backend does not support asynchronous launches """
+        return True
+
+    def synchronize(self):
+        """ Halts execution until device has finished its tasks
+
+        Numba backend does not support asynchronous launches """
+        pass
+
+    def run_kernel(self, func, args, threads, grid):
+        """runs the function once and measures the time it takes
+
+        :param func: A function compiled for this specific configuration
+        :type func: numba.core.registry.CPUDispatcher
+
+        :param args: A list of arguments to the function, order should match the
+            order in the code. The list should be prepared using ready_argument_list().
+        :type args: list(numpy objects)
+
+        :param threads: Ignored, but left as argument for now to have the same
+            interface as the other backends.
+        :type threads: any
+
+        :param grid: Ignored, but left as argument for now to have the same
+            interface as the other backends.
+        :type grid: any
+
+        :returns: The time in milliseconds the function took.
+        :rtype: float
+        """
+        logging.debug("run_kernel")
+        start = time.perf_counter()
+        func(*args)
+        self.last_result = (time.perf_counter() - start) * 1e3
+        return self.last_result
+
+    def memset(self, allocation, value, size):
+        """set the memory in allocation to the value in value
+
+        :param allocation: A numpy array
+        :type allocation: np.ndarray
+
+        :param value: The value to set the memory to
+        :type value: a single 8-bit unsigned int
+
+        :param size: The size of to the allocation unit in bytes
+        :type size: int
+        """
+        allocation.reshape(-1).view(np.uint8)[:size] = value
+
+    def memcpy_dtoh(self, dest, src):
+        """a simple memcpy copying from the argument to a numpy array
+
+        :param dest: A numpy array to store the data
+        :type dest: np.ndarray
+
+        :param src: The numpy array passed to the function
+        :type src: np.ndarray
+        """
+        dest[:] = src
+
+    def memcpy_htod(self, dest, src):
+        """a simple memcpy copying from a numpy array to the argument
+
+        :param dest: The numpy array passed to the function
+        :type dest: np.ndarray
+
+        :param src: A numpy array containing the source data
+        :type src: np.ndarray
+        """
+        dest[:] = src
+
+    units = {}
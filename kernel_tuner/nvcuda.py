@@ -1,7 +1,8 @@
 """This module contains all NVIDIA cuda-python specific kernel_tuner functions"""
 import numpy as np
 
-from kernel_tuner.observers import BenchmarkObserver
+from kernel_tuner.observers import RuntimeObserver
+from kernel_tuner.backend import Backend
 from kernel_tuner.util import SkippableFailure
 
 #embedded in try block to be able to generate documentation
@@ -28,7 +29,7 @@ def error_check(error):
             raise RuntimeError(f"NVRTC error: {desc.decode()}")
 
 
-class CudaRuntimeObserver(BenchmarkObserver):
+class CudaRuntimeObserver(RuntimeObserver):
     """ Observer that measures time using CUDA events during benchmarking """
     def __init__(self, dev):
         self.dev = dev
@@ -43,17 +44,10 @@ class CudaRuntimeObserver(BenchmarkObserver):
         error_check(err)
         self.times.append(time)
 
-    def get_results(self):
-        results = {
-            "time": np.average(self.times),
-            "times": self.times.copy()
-        }
-        self.times = []
-        return results
-
 
-class CudaFunctions(object):
+class CudaFunctions(Backend):
     """Class that groups the Cuda functions on maintains state about the device"""
+    capabilities = frozenset(["shared_memory", "constant_memory"])
 
     def __init__(self, device=0, iterations=7, compiler_options=None, observers=None):
         """instantiate CudaFunctions object used for interacting with the CUDA device
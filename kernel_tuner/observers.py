@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 import numpy as np
 
+from kernel_tuner import aggregation
+
 #check if power_sensor is installed
 try:
     import power_sensor
@@ -44,6 +46,30 @@ class BenchmarkObserver(ABC):
 class IterationObserver(BenchmarkObserver):
     pass
 
+class RuntimeObserver(BenchmarkObserver):
+    """Base class for the observers that backends use to measure kernel execution time
+
+    Runtime observers store the execution time of every iteration in ms in self.times,
+    which allows the DeviceInterface to inspect the measurements while benchmarking.
+    The times are aggregated into a single value using the aggregator, which can be the
+    name of one of the aggregators in kernel_tuner.aggregation or a callable. If bootstrap
+    is set to a number of resamples, a bootstrap confidence interval is reported as well.
+    """
+    objective = "time"
+    aggregator = "mean"
+    bootstrap = None
+
+    def get_results(self):
+        results = {
+            self.objective: float(aggregation.aggregate(self.times, self.aggregator)),
+            self.objective + "s": self.times.copy()
+        }
+        if self.bootstrap:
+            lower, upper = aggregation.bootstrap_confidence_interval(self.times, self.aggregator, self.bootstrap)
+            results[self.objective + "_bootstrap_ci"] = [float(lower), float(upper)]
+        self.times = []
+        return results
+
 class ContinuousObserver(BenchmarkObserver):
     pass
 
@@ -3,7 +3,8 @@ from __future__ import print_function
 import time
 import numpy as np
 
-from kernel_tuner.observers import BenchmarkObserver
+from kernel_tuner.backend import Backend
+from kernel_tuner.observers import RuntimeObserver
 
 #embedded in try block to be able to generate documentation
 try:
@@ -12,7 +13,7 @@ except ImportError:
     cl = None
 
 
-class OpenCLObserver(BenchmarkObserver):
+class OpenCLObserver(RuntimeObserver):
     """ Observer that measures time using CUDA events during benchmarking """
     def __init__(self, dev):
         self.dev = dev
@@ -22,13 +23,8 @@ class OpenCLObserver(BenchmarkObserver):
         event = self.dev.event
         self.times.append((event.profile.end - event.profile.start)*1e-6) #ms
 
-    def get_results(self):
-        results = {"time": np.average(self.times), "times": self.times.copy()}
-        self.times = []
-        return results
-
 
-class OpenCLFunctions():
+class OpenCLFunctions(Backend):
     """Class that groups the OpenCL functions on maintains some state about the device"""
 
     def __init__(self, device=0, platform=0, iterations=7, compiler_options=None, observers=None):
@@ -5,8 +5,9 @@ import logging
 import time
 import numpy as np
 
-from kernel_tuner.observers import BenchmarkObserver
+from kernel_tuner.observers import RuntimeObserver
 from kernel_tuner.nvml import nvml
+from kernel_tuner.backend import Backend
 from kernel_tuner.util import TorchPlaceHolder, SkippableFailure
 
 #embedded in try block to be able to generate documentation
@@ -51,7 +52,7 @@ class Holder(drv.PointerHolderBase):
         return self.t.data_ptr()
 
 
-class PyCudaRuntimeObserver(BenchmarkObserver):
+class PyCudaRuntimeObserver(RuntimeObserver):
     """ Observer that measures time using CUDA events during benchmarking """
 
     def __init__(self, dev):
@@ -64,17 +65,10 @@ class PyCudaRuntimeObserver(BenchmarkObserver):
     def after_finish(self):
         self.times.append(self.end.time_since(self.start))    #ms
 
-    def get_results(self):
-        results = {
-            "time": np.average(self.times),
-            "times": self.times.copy()
-        }
-        self.times = []
-        return results
-
 
-class PyCudaFunctions(object):
+class PyCudaFunctions(Backend):
     """Class that groups the CUDA functions on maintains state about the device"""
+    capabilities = frozenset(["shared_memory", "constant_memory", "texture_memory"])
 
     def __init__(self, device=0, iterations=7, compiler_options=None, observers=None):
         """instantiate PyCudaFunctions object used for interacting with the CUDA device
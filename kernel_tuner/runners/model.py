@@ -0,0 +1,149 @@
+""" The model runner for tuning with objective values computed by an analytic model instead of running kernels """
+import logging
+from datetime import datetime, timezone
+from time import perf_counter
+
+import numpy as np
+
+from kernel_tuner import models, util
+from kernel_tuner.runners.simulation import SimulationDevice
+
+
+class ModelRunner:
+    """ ModelRunner evaluates all configurations passed to run at once using a vectorized model """
+
+    def __init__(self, kernel_source, kernel_options, device_options, iterations, observers):
+        """ Instantiate the ModelRunner
+
+        :param kernel_source: The kernel source
+        :type kernel_source: kernel_tuner.core.KernelSource
+
+        :param kernel_options: A dictionary with all options for the kernel.
+        :type kernel_options: kernel_tuner.interface.Options
+
+        :param device_options: A dictionary with all options for the device
+            on which the kernel should be tuned.
+        :type device_options: kernel_tuner.interface.Options
+
+        :param iterations: The number of iterations used for benchmarking
+            each kernel instance, used to compute the simulated benchmark time.
+        :type iterations: int
+        """
+        self.quiet = device_options.quiet
+        self.dev = SimulationDevice(1024, dict(device_name="Model"), self.quiet)
+        self.iterations = iterations
+
+        self.kernel_source = kernel_source
+        self.simulation_mode = False
+
+        self.start_time = perf_counter()
+        self.last_strategy_start_time = self.start_time
+        self.last_strategy_time = 0
+        self.units = {}
+
+    def get_environment(self, tuning_options):
+        env = self.dev.get_environment()
+        env["model"] = models.get_model_name(tuning_options.model)
+        env["iterations"] = self.iterations
+        env["simulated_time"] = tuning_options.simulated_time
+        return env
+
+    def run(self, parameter_space, kernel_options, tuning_options):
+        """ Evaluate all configurations in the parameter space at once using the model
+
+        :param parameter_space: The parameter space as an iterable.
+        :type parameter_space: iterable
+
+        :param kernel_options: A dictionary with all options for the kernel.
+        :type kernel_options: kernel_tuner.interface.Options
+
+        :param tuning_options: A dictionary with all options regarding the tuning
+            process.
+        :type tuning_options: kernel_tuner.iterface.Options
+
+        :returns: A list of dictionaries for executed kernel configurations and their
+            execution times. And a dictionary that contains information
+            about the hardware/software environment on which the tuning took place.
+        :rtype: list(dict()), dict()
+
+        """
+        logging.debug('model runner started for ' + kernel_options.kernel_name)
+
+        parameter_space = list(parameter_space)
+        if not parameter_space:
+            return [], self.get_environment(tuning_options)
+
+        # configurations in the cache are not evaluated by the model again
+        x_ints = list(",".join([str(i) for i in element]) for element in parameter_space)
+        uncached = list(element for element, x_int in zip(parameter_space, x_ints) if not (tuning_options.cache and x_int in tuning_options.cache))
+        evaluated = iter(self.evaluate_model(uncached, tuning_options))
+
+        # the strategy and framework time are divided evenly over all configurations evaluated at once
+        framework_time = (1000 * (perf_counter() - self.start_time) - self.last_strategy_time) / len(parameter_space)
+        strategy_time = self.last_strategy_time / len(parameter_space)
+        timestamp = str(datetime.now(timezone.utc))
+
+        results = []
+        for element, x_int in zip(parameter_space, x_ints):
+            if tuning_options.cache and x_int in tuning_options.cache:
+                params = dict(zip(tuning_options.tune_params.keys(), element))
+                params.update(tuning_options.cache[x_int])
+                params["compile_time"] = 0
+                params["verification_time"] = 0
+                params["benchmark_time"] = 0
+                cached = True
+            else:
+                params = next(evaluated)
+                cached = False
+            params["strategy_time"] = strategy_time
+            params["framework_time"] = framework_time
+            params["timestamp"] = timestamp
+            if not cached:
+                if not self.quiet:
+                    util.print_config_output(tuning_options.tune_params, params, self.quiet, tuning_options.metrics, self.units)
+                util.store_cache(x_int, params, tuning_options)
+            results.append(params)
+
+        self.start_time = perf_counter()
+        return results, self.get_environment(tuning_options)
+
+    def evaluate_model(self, parameter_space, tuning_options):
+        """ Evaluate the configurations in the parameter space at once using the model, returns a list with a dict per configuration """
+        if not parameter_space:
+            return []
+
+        columns = models.get_columns(parameter_space, tuning_options.tune_params)
+        outputs = tuning_options.model(columns, tuning_options.tune_params)
+        if not isinstance(outputs, dict):
+            outputs = dict(time=outputs)
+        if "time" not in outputs:
+            raise ValueError("The model did not return the execution time of the configurations")
+
+        time = np.asarray(outputs["time"], dtype=np.float64)
+        failed = np.isnan(time)
+        compile_time = np.broadcast_to(outputs.get("compile_time", 0.0), time.shape)
+        benchmark_time = np.where(failed, 0.0, outputs.get("benchmark_time", time * self.iterations))
+        tuning_options.simulated_time += float(np.sum(compile_time) + np.sum(benchmark_time))
+
+        keys = list(tuning_options.tune_params.keys())
+        outputs = {k: np.asarray(v).tolist() for k, v in outputs.items() if k not in ["time", "compile_time", "benchmark_time"]}
+        time = time.tolist()
+        compile_time = compile_time.tolist()
+        benchmark_time = benchmark_time.tolist()
+
+        results = []
+        for i, element in enumerate(parameter_space):
+            params = dict(zip(keys, element))
+            if failed[i]:
+                params["time"] = util.RuntimeFailedConfig()
+                params[tuning_options.objective] = params["time"]
+            else:
+                params["time"] = time[i]
+                params.update((k, v[i]) for k, v in outputs.items())
+                if tuning_options.metrics:
+                    params = util.process_metrics(params, tuning_options.metrics)
+            params["compile_time"] = compile_time[i]
+            params["verification_time"] = 0
+            params["benchmark_time"] = benchmark_time[i]
+            results.append(params)
+        return results
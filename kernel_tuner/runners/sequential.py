@@ -41,6 +41,7 @@ class SequentialRunner:
         self.start_time = perf_counter()
         self.last_strategy_start_time = self.start_time
         self.last_strategy_time = 0
+        self.incumbent = None
 
         #move data to the GPU
         self.gpu_args = self.dev.ready_argument_list(kernel_options.arguments)
@@ -67,9 +68,17 @@ class SequentialRunner:
         logging.debug('sequential runner started for ' + kernel_options.kernel_name)
 
         results = []
+        parameter_space = list(parameter_space)
+        # the share of the batch compile time of the configurations that were compiled ahead
+        precompiled = dict()
+
+        # when racing, configurations are compared against the best configuration so far, including cached ones
+        if tuning_options.get("racing") and self.incumbent is None and tuning_options.cache:
+            for cached in tuning_options.cache.values():
+                self.update_incumbent(cached, tuning_options)
 
         # iterate over parameter space
-        for element in parameter_space:
+        for index, element in enumerate(parameter_space):
             params = OrderedDict(zip(tuning_options.tune_params.keys(), element))
 
             result = None
@@ -91,9 +100,14 @@ class SequentialRunner:
                     self.warmed_up = True
                     warmup_time = 1e3 * (perf_counter() - warmup_time)
 
-                result = self.dev.compile_and_benchmark(self.kernel_source, self.gpu_args, params, kernel_options, tuning_options)
+                if self.dev.compile_workers and x_int not in precompiled:
+                    precompiled = self.precompile(parameter_space[index:], kernel_options, tuning_options)
+
+                result = self.dev.compile_and_benchmark(self.kernel_source, self.gpu_args, params, kernel_options, tuning_options, self.incumbent)
 
                 params.update(result)
+                if "compile_time" in params:
+                    params["compile_time"] += precompiled.pop(x_int, 0)
 
                 # only compute metrics on configs that have not errored
                 if tuning_options.objective in result and isinstance(result[tuning_options.objective], ErrorConfig):
@@ -111,10 +125,39 @@ class SequentialRunner:
             params['timestamp'] = str(datetime.now(timezone.utc))
             self.start_time = perf_counter()
 
-            if result:
+            # configurations that racing dropped early have too few measurements to be reused from the cache
+            if result and not params.get("partial"):
                 store_cache(x_int, params, tuning_options)
 
+            if tuning_options.get("racing"):
+                self.update_incumbent(params, tuning_options)
+
             # all visited configurations are added to results to provide a trace for optimization strategies
             results.append(params)
 
         return results, self.dev.get_environment()
+
+    def precompile(self, parameter_space, kernel_options, tuning_options):
+        """ Compile the next compile_workers configurations that are not in the cache at once, such that their compiles overlap
+
+        Returns the share of the batch compile time of each configuration, by the key of the configuration in the cache.
+        """
+        batch = OrderedDict()
+        for element in parameter_space:
+            x_int = ",".join([str(i) for i in element])
+            if not (tuning_options.cache and x_int in tuning_options.cache):
+                batch[x_int] = OrderedDict(zip(tuning_options.tune_params.keys(), element))
+            if len(batch) == self.dev.compile_workers:
+                break
+
+        start = perf_counter()
+        self.dev.precompile(self.kernel_source, kernel_options, list(batch.values()))
+        compile_time = 1000 * (perf_counter() - start) / len(batch)
+        return {x_int: compile_time for x_int in batch}
+
+    def update_incumbent(self, result, tuning_options):
+        """ Update the execution time of the best configuration so far, ignoring failed and partial results """
+        time = result.get(tuning_options.objective)
+        if isinstance(time, (int, float)) and not result.get("partial"):
+            if self.incumbent is None or time < self.incumbent:
+                self.incumbent = time
@@ -3,6 +3,7 @@ from typing import Tuple, List
 
 from constraint import Problem, Constraint, FunctionConstraint
 import numpy as np
+from scipy.spatial import cKDTree
 
 from kernel_tuner.util import default_block_size_names
 from kernel_tuner.util import check_restrictions as check_instance_restrictions
@@ -37,6 +38,9 @@ class Searchspace:
         self.param_names = list(self.tune_params.keys())
         self.params_values = tuple(tuple(param_vals) for param_vals in self.tune_params.values())
         self.params_values_indices = None
+        self.__normalized = None
+        self.__nearest_tree = None
+        self.__keys = None
         self.build_neighbors_index = build_neighbors_index
         self.__neighbor_cache = dict()
         self.neighbor_method = neighbor_method
@@ -146,9 +150,79 @@ class Searchspace:
         # constant time O(1) access - much faster than any other method, but needs a shadow dict of the search space
         return self.__dict.get(param_config, None)
 
+    def get_params_values_indices(self) -> np.ndarray:
+        """get an array with for each parameter configuration the index of each parameter value in the tunable parameters"""
+        if self.params_values_indices is None:
+            self.__prepare_neighbors_index()
+        return self.params_values_indices
+
+    def get_normalized_array(self) -> np.ndarray:
+        """get an array of the parameter configurations in the normalized space, where the values of each parameter are spread evenly over [0, 1] in the order specified"""
+        if self.__normalized is None:
+            num_values = np.array(list(len(param_values) for param_values in self.params_values))
+            self.__normalized = (self.get_params_values_indices() + 0.5) / num_values
+        return self.__normalized
+
+    def get_indices_of_params_values_indices(self, params_values_indices: np.ndarray) -> np.ndarray:
+        """get the indices of a batch of parameter configurations given by the indices of their parameter values, -1 for configurations not in the searchspace"""
+        if self.__keys is None:
+            # encode each configuration as a single integer, using Python integers if int64 could overflow
+            num_values = list(len(param_values) for param_values in self.params_values)
+            dtype = np.int64 if np.prod(num_values, dtype=object) < 2**63 else object
+            radix = np.array(list(np.prod(num_values[:param_index], dtype=object) for param_index in range(self.num_params)), dtype=dtype)
+            keys = self.get_params_values_indices().astype(dtype) @ radix
+            order = np.argsort(keys, kind="stable")
+            self.__keys = (radix, keys[order], order)
+        radix, sorted_keys, order = self.__keys
+        if self.size == 0:
+            return np.full(len(params_values_indices), -1)
+        keys = np.reshape(params_values_indices, (-1, self.num_params)).astype(radix.dtype) @ radix
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), self.size - 1)
+        return np.where(sorted_keys[positions] == keys, order[positions], -1)
+
+    def normalize_points(self, points: np.ndarray, space="normalized", eps=None) -> np.ndarray:
+        """map a batch of points to the normalized space, from the scaled space of the strategies with its eps, or from the raw parameter values"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self.num_params)
+        if space == "normalized":
+            return points
+        num_values = np.array(list(len(param_values) for param_values in self.params_values))
+        if space == "scaled":
+            # the values of each parameter are at 0.5*eps + index*eps in the interval [0, eps*len(values)]
+            return points / (eps * num_values)
+        if space == "raw":
+            # snap each coordinate to the nearest value of the parameter, and map the index of that value to the normalized space
+            normalized = np.empty_like(points)
+            for param_index, param_values in enumerate(self.params_values):
+                values = np.array(param_values, dtype=np.float64)
+                order = np.argsort(values, kind="stable")
+                sorted_values = values[order]
+                upper = np.minimum(np.searchsorted(sorted_values, points[:, param_index]), len(values) - 1)
+                lower = np.maximum(upper - 1, 0)
+                nearest = np.where(np.abs(points[:, param_index] - sorted_values[lower]) <= np.abs(sorted_values[upper] - points[:, param_index]), lower, upper)
+                normalized[:, param_index] = (order[nearest] + 0.5) / len(values)
+            return normalized
+        raise ValueError(f"Unknown space {space}, choose from normalized, scaled or raw")
+
+    def get_nearest_indices(self, points: np.ndarray, space="normalized", eps=None) -> np.ndarray:
+        """get the indices of the nearest valid parameter configurations for a batch of points, using a KD-tree over the normalized searchspace"""
+        if self.__nearest_tree is None:
+            self.__nearest_tree = cKDTree(self.get_normalized_array())
+        _, indices = self.__nearest_tree.query(self.normalize_points(points, space, eps))
+        return indices
+
+    def get_nearest_configs(self, points: np.ndarray, space="normalized", eps=None) -> List[tuple]:
+        """get the nearest valid parameter configurations for a batch of points"""
+        return self.get_param_configs_at_indices(self.get_nearest_indices(points, space, eps))
+
     def __prepare_neighbors_index(self):
         """prepare by calculating the indices for the individual parameters"""
-        self.params_values_indices = np.array(list(self.get_param_indices(param_config) for param_config in self.list))
+        # look up the indices of the values one parameter at a time, using a dict per parameter instead of a search in the list of values
+        self.params_values_indices = np.empty((self.size, self.num_params), dtype=int)
+        for param_index, param_values in enumerate(self.params_values):
+            lookup = dict()
+            for value_index, value in enumerate(param_values):
+                lookup.setdefault(value, value_index)
+            self.params_values_indices[:, param_index] = np.fromiter((lookup[param_config[param_index]] for param_config in self.list), dtype=int, count=self.size)
 
     def __get_neighbors_indices_hamming(self, param_config: tuple) -> List[int]:
         """get the neighbors using Hamming distance from the parameter configuration"""
@@ -1,12 +1,12 @@
 """ Bayesian Optimization implementation from the thesis by Willemsen """
-import itertools
 import time
 import warnings
 from copy import deepcopy
-from random import randint, shuffle
+from random import shuffle
 from typing import Tuple
 
 import numpy as np
+from scipy.linalg import solve_triangular
 from scipy.stats import norm
 
 # BO imports
@@ -20,50 +20,122 @@ except ImportError:
     bayes_opt_present = False
 
 from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies import common
 
 supported_methods = ["poi", "ei", "lcb", "lcb-srinivas", "multi", "multi-advanced", "multi-fast"]
 
-def generate_normalized_param_dicts(tune_params: dict, eps: float) -> Tuple[dict, dict]:
-    """ Generates normalization and denormalization dictionaries """
-    original_to_normalized = dict()
-    normalized_to_original = dict()
-    for param_name in tune_params.keys():
-        original_to_normalized_dict = dict()
-        normalized_to_original_dict = dict()
-        for value_index, value in enumerate(tune_params[param_name]):
-            normalized_value = eps * value_index + 0.5 * eps
-            normalized_to_original_dict[normalized_value] = value
-            original_to_normalized_dict[value] = normalized_value
-        original_to_normalized[param_name] = original_to_normalized_dict
-        normalized_to_original[param_name] = normalized_to_original_dict
-    return original_to_normalized, normalized_to_original
-
-
-def normalize_parameter_space(param_space: list, tune_params: dict, normalized: dict) -> list:
-    """ Normalize the parameter space given a normalization dictionary """
-    keys = list(tune_params.keys())
-    param_space_normalized = list(tuple(normalized[keys[i]][v] for i, v in enumerate(params)) for params in param_space)
-    return param_space_normalized
-
-
-def prune_parameter_space(parameter_space, tuning_options, tune_params, normalize_dict):
-    """ Pruning of the parameter space to remove dimensions that have a constant parameter """
-    pruned_tune_params_mask = list()
-    removed_tune_params = list()
-    param_names = list(tune_params.keys())
-    for index, key in enumerate(tune_params.keys()):
-        pruned_tune_params_mask.append(len(tune_params[key]) > 1)
-        if len(tune_params[key]) > 1:
-            removed_tune_params.append(None)
+def get_normalized_values(tune_params: dict, eps: float) -> list:
+    """ Returns for each parameter an array that maps the index of a value to the normalized value """
+    return list(eps * np.arange(len(values)) + 0.5 * eps for values in tune_params.values())
+
+
+class IncrementalGaussianProcess():
+    """ Gaussian process regressor that is updated incrementally when observations are added
+
+    The Cholesky factor of the covariance matrix of the observations is extended with one row
+    for each added observation, which takes O(n^2) instead of refactorizing in O(n^3).
+    The observations are normalized to zero mean and unit variance, as with normalize_y in
+    sklearn's GaussianProcessRegressor. Only the normalization and the weights of the
+    observations are recomputed after adding observations, which takes O(n^2) as well.
+
+    When hyperparameter_interval is larger than zero, the hyperparameters of the kernel are
+    optimized by sklearn's GaussianProcessRegressor every hyperparameter_interval observations,
+    after which the Cholesky factor is computed from scratch.
+    """
+
+    def __init__(self, kernel, alpha=1e-10, hyperparameter_interval=0):
+        self.kernel = kernel
+        self.alpha = alpha
+        self.hyperparameter_interval = hyperparameter_interval
+        self.X = None
+        self.y = np.zeros(0)
+        self.L = np.zeros((0, 0))
+        self.weights = np.zeros(0)
+        self.y_mean = 0.0
+        self.y_std = 1.0
+        self.observations_since_optimization = 0
+
+    @property
+    def num_observations(self) -> int:
+        return len(self.y)
+
+    def fit(self, X, y):
+        """ Fit the model to all observations from scratch """
+        self.X = np.array(X, dtype=np.float64, ndmin=2)
+        self.y = np.array(y, dtype=np.float64)
+        if self.hyperparameter_interval > 0 and self.num_observations > 1:
+            self.optimize_hyperparameters()
+        K = self.kernel(self.X)
+        K[np.diag_indices_from(K)] += self.alpha
+        self.L = np.linalg.cholesky(K)
+        self.observations_since_optimization = 0
+        self.update_weights()
+        return self
+
+    def add_observations(self, X, y):
+        """ Add observations to the model, extending the Cholesky factor one row at a time """
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        y = np.array(y, dtype=np.float64)
+        if self.X is None:
+            return self.fit(X, y)
+        if self.hyperparameter_interval > 0 and self.observations_since_optimization + len(y) >= self.hyperparameter_interval:
+            return self.fit(np.vstack([self.X, X]), np.concatenate([self.y, y]))
+        for x, value in zip(X, y):
+            self.add_observation(x, value)
+        self.observations_since_optimization += len(y)
+        self.update_weights()
+        return self
+
+    def add_observation(self, x, value):
+        """ Extend the Cholesky factor with the row of a single observation, does not update the weights """
+        x = x.reshape(1, -1)
+        n = self.num_observations
+        k = self.kernel(self.X, x)[:, 0]
+        l = solve_triangular(self.L, k, lower=True, check_finite=False) if n > 0 else k
+        # the diagonal element is bounded from below to keep the factor positive definite for nearly identical observations
+        d = np.sqrt(max(self.kernel.diag(x)[0] + self.alpha - np.dot(l, l), self.alpha))
+        L = np.zeros((n + 1, n + 1))
+        L[:n, :n] = self.L
+        L[n, :n] = l
+        L[n, n] = d
+        self.L = L
+        self.X = np.vstack([self.X, x])
+        self.y = np.append(self.y, value)
+
+    def update_weights(self):
+        """ Recompute the normalization of the observations and the weights used for predictions """
+        self.y_mean = np.mean(self.y)
+        self.y_std = np.std(self.y)
+        if self.y_std == 0:
+            self.y_std = 1.0
+        y = (self.y - self.y_mean) / self.y_std
+        self.weights = solve_triangular(self.L.T, solve_triangular(self.L, y, lower=True, check_finite=False), lower=False, check_finite=False)
+
+    def optimize_hyperparameters(self):
+        """ Optimize the hyperparameters of the kernel by maximizing the log marginal likelihood """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            model = GaussianProcessRegressor(kernel=self.kernel, alpha=self.alpha, normalize_y=True)
+            self.kernel = model.fit(self.X, self.y).kernel_
+
+    def predict(self, X, return_std=False):
+        """ Predict the mean and optionally the standard deviation of all configurations in X at once """
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if self.X is None:
+            mu = np.zeros(len(X))
+            std = np.sqrt(self.kernel.diag(X))
         else:
-            value = tune_params[key][0]
-            normalized = normalize_dict[param_names[index]][value]
-            removed_tune_params.append(normalized)
-    if 'verbose' in tuning_options and tuning_options.verbose is True and len(tune_params.keys()) != sum(pruned_tune_params_mask):
-        print(f"Number of parameters (dimensions): {len(tune_params.keys())}, after pruning: {sum(pruned_tune_params_mask)}")
-    parameter_space = list(tuple(itertools.compress(param_config, pruned_tune_params_mask)) for param_config in parameter_space)
-    return parameter_space, removed_tune_params
+            K_trans = self.kernel(X, self.X)
+            mu = K_trans @ self.weights * self.y_std + self.y_mean
+            if not return_std:
+                return mu
+            V = solve_triangular(self.L, K_trans.T, lower=True, check_finite=False)
+            var = self.kernel.diag(X) - np.einsum("ij,ij->j", V, V)
+            std = np.sqrt(np.maximum(var, 0)) * self.y_std
+        if return_std:
+            return mu, std
+        return mu
 
 
 def tune(runner, kernel_options, device_options, tuning_options):
@@ -98,35 +170,18 @@ def tune(runner, kernel_options, device_options, tuning_options):
     # epsilon for scaling should be the evenly spaced distance between the largest set of parameter options in an interval [0,1]
     tune_params = tuning_options.tune_params
     tuning_options["scaling"] = True
-    _, _, eps = common.get_bounds_x0_eps(tuning_options, runner.dev.max_threads)
+    tuning_options["eps"] = np.amin([1.0 / len(v) for v in tune_params.values()])
 
-    # compute cartesian product of all tunable parameters
-    parameter_space = itertools.product(*tune_params.values())
-
-    # check for search space restrictions
-    if tuning_options.restrictions is not None:
-        tuning_options.verbose = False
-    parameter_space = filter(lambda p: util.config_valid(p, tuning_options, runner.dev.max_threads), parameter_space)
-    parameter_space = list(parameter_space)
-    if len(parameter_space) < 1:
+    # the search space only contains valid configurations, as the restrictions are applied by the constraint solver
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    if searchspace.size < 1:
         raise ValueError("Empty parameterspace after restrictionscheck. Restrictionscheck is possibly too strict.")
-    if len(parameter_space) == 1:
-        raise ValueError(f"Only one configuration after restrictionscheck. Restrictionscheck is possibly too strict. Configuration: {parameter_space[0]}")
-
-    # normalize search space to [0,1]
-    normalize_dict, denormalize_dict = generate_normalized_param_dicts(tune_params, eps)
-    parameter_space = normalize_parameter_space(parameter_space, tune_params, normalize_dict)
-
-    # prune the parameter space to remove dimensions that have a constant parameter
-    if prune_parameterspace:
-        parameter_space, removed_tune_params = prune_parameter_space(parameter_space, tuning_options, tune_params, normalize_dict)
-    else:
-        parameter_space = list(parameter_space)
-        removed_tune_params = [None] * len(tune_params.keys())
+    if searchspace.size == 1:
+        raise ValueError(f"Only one configuration after restrictionscheck. Restrictionscheck is possibly too strict. Configuration: {searchspace.list[0]}")
 
     # initialize and optimize
     try:
-        bo = BayesianOptimization(parameter_space, removed_tune_params, kernel_options, tuning_options, normalize_dict, denormalize_dict, runner)
+        bo = BayesianOptimization(searchspace, kernel_options, tuning_options, runner, prune_parameterspace=prune_parameterspace)
     except util.StopCriterionReached as e:
         print(f"Stop criterion reached during initialization, was popsize (default 20) greater than max_fevals or the alotted time?")
         raise e
@@ -145,12 +200,16 @@ _options = dict(covariancekernel=('The Covariance kernel to use, choose any from
                 covariancelengthscale=("The covariance length scale", 1.5),
                 method=("The Bayesian Optimization method to use, choose any from " + ", ".join(supported_methods), "multi-advanced"),
                 samplingmethod=("Method used for initial sampling the parameter space, either random or lhs", "lhs"),
-                popsize=("Number of initial samples", 20))
+                popsize=("Number of initial samples", 20),
+                hyperparameterinterval=("Number of observations after which the hyperparameters of the covariance kernel are optimized, 0 keeps the length scale fixed", 0),
+                maxcandidates=("Maximum number of unvisited configurations scored by the acquisition function per iteration, plus those in the trust regions, None scores all, at least one per acquisition function of the multi methods", None),
+                candidatesampling=("Method used to subsample the candidates when maxcandidates is set, either random or stratified", "stratified"),
+                trustregions=("Number of best configurations around which the candidates in a trust region are scored when maxcandidates is set", 1),
+                trustregionlength=("Initial edge length of the trust regions relative to the normalized search space", 0.4))
 
 class BayesianOptimization():
 
-    def __init__(self, searchspace: list, removed_tune_params: list, kernel_options: dict, tuning_options: dict, normalize_dict: dict, denormalize_dict: dict,
-                 runner, opt_direction='min'):
+    def __init__(self, searchspace: Searchspace, kernel_options: dict, tuning_options: dict, runner, opt_direction='min', prune_parameterspace=True):
         time_start = time.perf_counter_ns()
 
         # supported hyperparameter values
@@ -158,6 +217,7 @@ class BayesianOptimization():
         self.supported_methods = supported_methods
         self.supported_sampling_methods = ["random", "lhs"]
         self.supported_sampling_criterion = ["correlation", "ratio", "maximin", None]
+        self.supported_candidate_sampling = ["random", "stratified"]
 
         def get_hyperparam(name: str, default, supported_values=list()):
             value = tuning_options.strategy_options.get(name, default)
@@ -180,6 +240,11 @@ class BayesianOptimization():
         self.sampling_method = get_hyperparam("samplingmethod", "lhs", self.supported_sampling_methods)
         self.sampling_crit = get_hyperparam("samplingcriterion", 'maximin', self.supported_sampling_criterion)
         self.sampling_iter = get_hyperparam("samplingiterations", 1000)
+        self.hyperparameter_interval = get_hyperparam("hyperparameterinterval", 0)
+        self.max_candidates = get_hyperparam("maxcandidates", None)
+        self.candidate_sampling = get_hyperparam("candidatesampling", "stratified", self.supported_candidate_sampling)
+        self.num_trust_regions = get_hyperparam("trustregions", 1)
+        self.trust_region_initial_length = get_hyperparam("trustregionlength", 0.4)
 
         # set acquisition function hyperparameter defaults where missing
         if 'explorationfactor' not in acq_params:
@@ -194,8 +259,6 @@ class BayesianOptimization():
         self.tuning_options = tuning_options
         self.tune_params = tuning_options.tune_params
         self.param_names = list(self.tune_params.keys())
-        self.normalized_dict = normalize_dict
-        self.denormalized_dict = denormalize_dict
         self.runner = runner
         self.max_threads = runner.dev.max_threads
         self.log_timings = False
@@ -223,20 +286,32 @@ class BayesianOptimization():
         # set remaining values
         self.results = []
         self.__searchspace = searchspace
-        self.removed_tune_params = removed_tune_params
-        self.searchspace_size = len(self.searchspace)
+        self.searchspace_size = searchspace.size
         self.num_dimensions = len(self.dimensions())
+        # normalize the search space to [0,1] by looking up the normalized value of the index of each parameter value
+        self.normalized_values = get_normalized_values(self.tune_params, tuning_options.eps)
+        self.params_values_indices = searchspace.get_params_values_indices()
+        # prune the dimensions that have a constant parameter
+        self.pruned_mask = np.array(list(len(values) > 1 or not prune_parameterspace for values in self.tune_params.values()))
+        if tuning_options.get("verbose", False) is True and not all(self.pruned_mask):
+            print(f"Number of parameters (dimensions): {len(self.pruned_mask)}, after pruning: {np.count_nonzero(self.pruned_mask)}")
+        self.searchspace_array = np.column_stack(list(self.normalized_values[i][self.params_values_indices[:, i]] for i in np.flatnonzero(self.pruned_mask)))
         self.__current_optimum = self.worst_value
         self.cv_norm_maximum = None
         self.fevals = 0
         self.__visited_num = 0
         self.__visited_valid_num = 0
-        self.__visited_searchspace_indices = [False] * self.searchspace_size
-        self.__observations = [np.NaN] * self.searchspace_size
-        self.__valid_observation_indices = [False] * self.searchspace_size
-        self.__valid_params = list()
-        self.__valid_observations = list()
-        self.unvisited_cache = self.unvisited()
+        self.__visited_mask = np.zeros(self.searchspace_size, dtype=bool)
+        self.__valid_mask = np.zeros(self.searchspace_size, dtype=bool)
+        self.__observations = np.full(self.searchspace_size, np.nan)
+        # the indices of the valid observations in the order in which they were observed, to add them to the model incrementally
+        self.__valid_indices = list()
+        self.searchspace_range = np.ptp(self.searchspace_array, axis=0)
+        self.trust_region_length = self.trust_region_initial_length
+        self.trust_region_min_length = 2**-6
+        self.trust_region_successes = 0
+        self.trust_region_failures = 0
+        self.initial_sample_taken = False
         time_setup = time.perf_counter_ns()
         self.error_message_searchspace_fully_observed = "The search space has been fully observed"
 
@@ -244,6 +319,7 @@ class BayesianOptimization():
         if self.num_initial_samples > 0:
             self.initial_sample()
             time_initial_sample = time.perf_counter_ns()
+        self.initial_sample_taken = True
 
         # print the timings
         if self.log_timings:
@@ -274,7 +350,7 @@ class BayesianOptimization():
 
     def is_not_visited(self, index: int) -> bool:
         """ Returns whether a searchspace index has not been visited """
-        return not self.__visited_searchspace_indices[index]
+        return not self.__visited_mask[index]
 
     def is_valid(self, observation: float) -> bool:
         """ Returns whether an observation is valid """
@@ -314,101 +390,131 @@ class BayesianOptimization():
 
     def set_surrogate_model(self, cov_kernel_name: str, cov_kernel_lengthscale: float):
         """ Set the surrogate model with a covariance function and lengthscale """
+        # the length scale is only optimized when the hyperparameters are periodically re-optimized
+        bounds = (1e-2, 1e2) if self.hyperparameter_interval > 0 else "fixed"
         if cov_kernel_name == "constantrbf":
-            kernel = ConstantKernel(1.0, constant_value_bounds="fixed") * RBF(cov_kernel_lengthscale, length_scale_bounds="fixed")
+            kernel = ConstantKernel(1.0, constant_value_bounds="fixed") * RBF(cov_kernel_lengthscale, length_scale_bounds=bounds)
         elif cov_kernel_name == "rbf":
-            kernel = RBF(length_scale=cov_kernel_lengthscale, length_scale_bounds="fixed")
+            kernel = RBF(length_scale=cov_kernel_lengthscale, length_scale_bounds=bounds)
         elif cov_kernel_name == "matern32":
-            kernel = Matern(length_scale=cov_kernel_lengthscale, nu=1.5, length_scale_bounds="fixed")
+            kernel = Matern(length_scale=cov_kernel_lengthscale, nu=1.5, length_scale_bounds=bounds)
         elif cov_kernel_name == "matern52":
-            kernel = Matern(length_scale=cov_kernel_lengthscale, nu=2.5, length_scale_bounds="fixed")
+            kernel = Matern(length_scale=cov_kernel_lengthscale, nu=2.5, length_scale_bounds=bounds)
         else:
             raise ValueError("Acquisition function must be one of {}, is {}".format(self.supported_cov_kernels, cov_kernel_name))
-        self.__model = GaussianProcessRegressor(kernel=kernel, alpha=1e-10, normalize_y=True)    # maybe change alpha to a higher value such as 1e-5?
-
-    def valid_params_observations(self) -> Tuple[list, list]:
-        """ Returns a list of valid observations and their parameter configurations """
-        # if you do this every iteration, better keep it as cache and update in update_after_evaluation
-        params = list()
-        observations = list()
-        for index, valid in enumerate(self.__valid_observation_indices):
-            if valid is True:
-                params.append(self.searchspace[index])
-                observations.append(self.observations[index])
-        return params, observations
-
-    def unvisited(self) -> list:
-        """ Returns a list of unvisited parameter configurations - attention: cached version exists! """
-        params = list(self.searchspace[index] for index, visited in enumerate(self.__visited_searchspace_indices) if visited is False)
-        return params
+        self.__model = IncrementalGaussianProcess(kernel, alpha=1e-10, hyperparameter_interval=self.hyperparameter_interval)
+
+    def valid_params_observations(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the normalized parameter configurations of the valid observations and the observations """
+        return self.searchspace_array[self.__valid_mask], self.__observations[self.__valid_mask]
+
+    def unvisited(self) -> np.ndarray:
+        """ Returns the indices of the unvisited parameter configurations """
+        return np.flatnonzero(~self.__visited_mask)
 
     def find_param_config_index(self, param_config: tuple) -> int:
-        """ Find a parameter config index in the search space if it exists """
-        return self.searchspace.index(param_config)
-
-    def find_param_config_unvisited_index(self, param_config: tuple) -> int:
-        """ Find a parameter config index in the unvisited cache if it exists """
-        return self.unvisited_cache.index(param_config)
-
-    def normalize_param_config(self, param_config: tuple) -> tuple:
-        """ Normalizes a parameter configuration """
-        normalized = tuple(self.normalized_dict[self.param_names[index]][param_value] for index, param_value in enumerate(param_config))
-        return normalized
-
-    def denormalize_param_config(self, param_config: tuple) -> tuple:
-        """ Denormalizes a parameter configuration """
-        denormalized = tuple(self.denormalized_dict[self.param_names[index]][param_value] for index, param_value in enumerate(param_config))
-        return denormalized
-
-    def unprune_param_config(self, param_config: tuple) -> tuple:
-        """ In case of pruned dimensions, adds the removed dimensions back in the param config """
-        unpruned = list()
-        pruned_count = 0
-        for removed in self.removed_tune_params:
-            if removed is not None:
-                unpruned.append(removed)
-            else:
-                unpruned.append(param_config[pruned_count])
-                pruned_count += 1
-        return tuple(unpruned)
+        """ Find a parameter config index in the search space if it exists, returns None otherwise """
+        return self.searchspace.get_param_config_index(param_config)
 
-    def update_after_evaluation(self, observation: float, index: int, param_config: tuple):
+    def normalized_param_config(self, index: int) -> tuple:
+        """ Returns the normalized parameter configuration at an index of the search space, including the pruned dimensions """
+        return tuple(normalized[value_index] for normalized, value_index in zip(self.normalized_values, self.params_values_indices[index]))
+
+    def update_after_evaluation(self, observation: float, index: int):
         """ Adjust the visited and valid index records accordingly """
         validity = self.is_valid(observation)
+        if self.max_candidates is not None and self.initial_sample_taken:
+            self.update_trust_region(validity and self.is_better_than(observation, self.current_optimum))
         self.__visited_num += 1
         self.__observations[index] = observation
-        self.__visited_searchspace_indices[index] = True
-        del self.unvisited_cache[self.find_param_config_unvisited_index(param_config)]
-        self.__valid_observation_indices[index] = validity
+        self.__visited_mask[index] = True
+        self.__valid_mask[index] = validity
         if validity is True:
             self.__visited_valid_num += 1
-            self.__valid_params.append(param_config)
-            self.__valid_observations.append(observation)
+            self.__valid_indices.append(index)
             if self.is_better_than(observation, self.current_optimum):
                 self.current_optimum = observation
 
+    def get_candidates(self) -> np.ndarray:
+        """ Returns the indices of the unvisited parameter configurations that are scored by the acquisition functions
+
+        If maxcandidates is set and there are more unvisited parameter configurations, only a random or
+        stratified subsample of maxcandidates configurations is scored, together with the unvisited
+        configurations in the trust regions around the best observations, in the style of TuRBO (Eriksson, 2019).
+        """
+        unvisited = self.unvisited()
+        if self.max_candidates is None:
+            return unvisited
+        # the multi methods remove the candidate selected by each acquisition function, so each needs a candidate of its own
+        max_candidates = max(self.max_candidates, len(self.multi_afs))
+        if len(unvisited) <= max_candidates:
+            return unvisited
+        if self.candidate_sampling == 'random':
+            sample = np.random.choice(unvisited, max_candidates, replace=False)
+        else:
+            # draw one configuration from each of max_candidates equally sized strata of the unvisited configurations
+            bounds = np.linspace(0, len(unvisited), max_candidates + 1).astype(int)
+            sample = unvisited[bounds[:-1] + (np.random.random(max_candidates) * np.diff(bounds)).astype(int)]
+        indices = [sample]
+        # a small tolerance includes configurations exactly on the boundary despite rounding errors
+        half_width = 0.5 * self.trust_region_length * self.searchspace_range + 1e-9
+        for center in self.trust_region_centers():
+            in_region = np.all(np.abs(self.searchspace_array - center) <= half_width, axis=1) & ~self.__visited_mask
+            region = np.flatnonzero(in_region)
+            if len(region) > max_candidates:
+                region = np.random.choice(region, max_candidates, replace=False)
+            indices.append(region)
+        return np.unique(np.concatenate(indices))
+
+    def trust_region_centers(self) -> np.ndarray:
+        """ Returns the parameter configurations of the best valid observations, which are the centers of the trust regions """
+        params, observations = self.valid_params_observations()
+        order = np.argsort(observations if self.opt_direction == 'min' else -observations)
+        return params[order[:self.num_trust_regions]]
+
+    def update_trust_region(self, improved: bool):
+        """ Expand the trust regions after consecutive improvements, shrink them after consecutive evaluations without improvement """
+        if improved:
+            self.trust_region_successes += 1
+            self.trust_region_failures = 0
+        else:
+            self.trust_region_successes = 0
+            self.trust_region_failures += 1
+        if self.trust_region_successes >= 3:
+            self.trust_region_length = min(2 * self.trust_region_length, 1.0)
+            self.trust_region_successes = 0
+        elif self.trust_region_failures >= max(4, self.num_dimensions):
+            self.trust_region_length /= 2
+            self.trust_region_failures = 0
+        # restart with the initial length when the trust regions have collapsed
+        if self.trust_region_length < self.trust_region_min_length:
+            self.trust_region_length = self.trust_region_initial_length
+
     def predict(self, x) -> Tuple[float, float]:
         """ Returns a mean and standard deviation predicted by the surrogate model for the parameter configuration """
         return self.__model.predict([x], return_std=True)
 
-    def predict_list(self, lst: list) -> Tuple[list, list, list]:
-        """ Returns a list of means and standard deviations predicted by the surrogate model for the parameter configurations, and separate lists of means and standard deviations """
+    def predict_list(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns an array of means and standard deviations predicted by the surrogate model for the parameter configurations at the indices, and separate arrays of means and standard deviations """
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            mu, std = self.__model.predict(lst, return_std=True)
-            return list(zip(mu, std)), mu, std
+            mu, std = self.__model.predict(self.searchspace_array[indices], return_std=True)
+            return np.column_stack((mu, std)), mu, std
 
     def fit_observations_to_model(self):
-        """ Update the model based on the current list of observations """
-        self.__model.fit(self.__valid_params, self.__valid_observations)
-
-    def evaluate_objective_function(self, param_config: tuple) -> float:
-        """ Evaluates the objective function """
-        param_config = self.unprune_param_config(param_config)
-        denormalized_param_config = self.denormalize_param_config(param_config)
-        if not util.config_valid(denormalized_param_config, self.tuning_options, self.max_threads):
-            return self.invalid_value
-        val = common._cost_func(param_config, self.kernel_options, self.tuning_options, self.runner, self.results)
+        """ Update the model with the observations that were added since the previous update """
+        num_fitted = self.__model.num_observations
+        if len(self.__valid_indices) > num_fitted:
+            indices = self.__valid_indices[num_fitted:]
+            self.__model.add_observations(self.searchspace_array[indices], self.__observations[indices])
+
+    def evaluate_objective_function(self, index: int) -> float:
+        """ Evaluates the objective function for the parameter configuration at an index of the search space """
+        # the search space only contains valid configurations, so the restrictions need not be checked again
+        val = common._cost_func(self.normalized_param_config(index), self.kernel_options, self.tuning_options, self.runner, self.results, check_restrictions=False)
+        # configurations that failed to compile or run are invalid observations
+        if isinstance(self.results[-1][self.tuning_options.objective], util.ErrorConfig):
+            val = self.invalid_value
         self.fevals += 1
         return val
 
@@ -416,14 +522,12 @@ class BayesianOptimization():
         """ List of parameter values per parameter """
         return self.tune_params.values()
 
-    def draw_random_sample(self) -> Tuple[list, int]:
-        """ Draw a random sample from the unvisited parameter configurations """
-        if len(self.unvisited_cache) < 1:
+    def draw_random_sample(self) -> int:
+        """ Draw the index of a random sample from the unvisited parameter configurations """
+        unvisited = self.unvisited()
+        if len(unvisited) < 1:
             raise ValueError("Searchspace exhausted during random sample draw as no valid configurations were found")
-        index = randint(0, len(self.unvisited_cache) - 1)    # NOSONAR
-        param_config = self.unvisited_cache[index]
-        actual_index = self.find_param_config_index(param_config)
-        return param_config, actual_index
+        return np.random.choice(unvisited)    # NOSONAR
 
     def draw_latin_hypercube_samples(self, num_samples: int) -> list:
         """ Draws an LHS-distributed sample from the search space """
@@ -435,18 +539,13 @@ class BayesianOptimization():
             lhs = Lhs(lhs_type="classic", criterion=self.sampling_crit, iterations=self.sampling_iter)
         param_configs = lhs.generate(self.dimensions(), num_samples)
         indices = list()
-        normalized_param_configs = list()
-        for i in range(len(param_configs) - 1):
-            try:
-                param_config = self.normalize_param_config(param_configs[i])
-                index = self.find_param_config_index(param_config)
+        for param_config in param_configs:
+            index = self.find_param_config_index(tuple(param_config))
+            """ Due to search space restrictions, the search space may not be an exact cartesian product of the tunable parameter values.
+            It is thus possible for LHS to generate a parameter combination that is not in the actual searchspace, which must be skipped. """
+            if index is not None and index not in indices:
                 indices.append(index)
-                normalized_param_configs.append(param_config)
-            except ValueError:
-                """ Due to search space restrictions, the search space may not be an exact cartesian product of the tunable parameter values.
-                It is thus possible for LHS to generate a parameter combination that is not in the actual searchspace, which must be skipped. """
-                continue
-        return list(zip(normalized_param_configs, indices))
+        return indices
 
     def initial_sample(self):
         """ Draws an initial sample using random sampling """
@@ -460,24 +559,25 @@ class BayesianOptimization():
             raise ValueError("Sampling method must be one of {}, is {}".format(self.supported_sampling_methods, self.sampling_method))
         # collect the samples
         collected_samples = 0
-        for params, index in samples:
-            observation = self.evaluate_objective_function(params)
-            self.update_after_evaluation(observation, index, params)
+        for index in samples:
+            observation = self.evaluate_objective_function(index)
+            self.update_after_evaluation(observation, index)
             if self.is_valid(observation):
                 collected_samples += 1
         # collect the remainder of the samples
         while collected_samples < self.num_initial_samples:
-            params, index = self.draw_random_sample()
-            observation = self.evaluate_objective_function(params)
-            self.update_after_evaluation(observation, index, params)
+            index = self.draw_random_sample()
+            observation = self.evaluate_objective_function(index)
+            self.update_after_evaluation(observation, index)
             # check for validity to avoid having no actual initial samples
             if self.is_valid(observation):
                 collected_samples += 1
         self.fit_observations_to_model()
-        _, _, std = self.predict_list(self.unvisited_cache)
-        self.initial_sample_mean = np.mean(self.__valid_observations)
+        _, _, std = self.predict_list(self.get_candidates())
+        _, observations = self.valid_params_observations()
+        self.initial_sample_mean = np.mean(observations)
         # Alternatively:
-        # self.initial_sample_std = np.std(self.__valid_observations)
+        # self.initial_sample_std = np.std(observations)
         # self.initial_sample_mean = np.mean(predictions)
         self.initial_std = np.mean(std)
         self.cv_norm_maximum = self.initial_std
@@ -505,15 +605,15 @@ class BayesianOptimization():
         while self.fevals < max_fevals:
             if self.__visited_num >= self.searchspace_size:
                 raise ValueError(self.error_message_searchspace_fully_observed)
-            predictions, _, std = self.predict_list(self.unvisited_cache)
+            candidates = self.get_candidates()
+            predictions, _, std = self.predict_list(candidates)
             hyperparam = self.contextual_variance(std)
             list_of_acquisition_values = self.__af(predictions, hyperparam)
             # afterwards select the best AF value
             best_af = self.argopt(list_of_acquisition_values)
-            candidate_params = self.unvisited_cache[best_af]
-            candidate_index = self.find_param_config_index(candidate_params)
-            observation = self.evaluate_objective_function(candidate_params)
-            self.update_after_evaluation(observation, candidate_index, candidate_params)
+            candidate_index = candidates[best_af]
+            observation = self.evaluate_objective_function(candidate_index)
+            self.update_after_evaluation(observation, candidate_index)
             self.fit_observations_to_model()
         return self.results
 
@@ -532,17 +632,18 @@ class BayesianOptimization():
         skip_af_index = list()
         af_runtimes = [0, 0, 0]
         af_observations = [list(), list(), list()]
-        initial_sample_mean = np.mean(self.__valid_observations)
+        initial_sample_mean = np.mean(self.valid_params_observations()[1])
         while self.fevals < max_fevals:
             time_start = time.perf_counter_ns()
             # the first acquisition function is never skipped, so that should be the best for the endgame (EI)
             aqfs = self.multi_afs
-            predictions, _, std = self.predict_list(self.unvisited_cache)
+            candidates = self.get_candidates()
+            predictions, _, std = self.predict_list(candidates)
             hyperparam = self.contextual_variance(std)
             if self.__visited_num >= self.searchspace_size:
                 raise ValueError(self.error_message_searchspace_fully_observed)
             time_predictions = time.perf_counter_ns()
-            actual_candidate_params = list()
+            actual_candidate_searchspace_indices = list()
             actual_candidate_indices = list()
             actual_candidate_af_indices = list()
             duplicate_candidate_af_indices = list()
@@ -559,8 +660,7 @@ class BayesianOptimization():
                 af_runtimes[af_index] += time_taken
                 is_duplicate = best_af in actual_candidate_indices
                 if not is_duplicate:
-                    candidate_params = self.unvisited_cache[best_af]
-                    actual_candidate_params.append(candidate_params)
+                    actual_candidate_searchspace_indices.append(candidates[best_af])
                     actual_candidate_indices.append(best_af)
                     actual_candidate_af_indices.append(af_index)
                 # register whether the AF suggested a duplicate candidate
@@ -576,10 +676,9 @@ class BayesianOptimization():
             time_afs = time.perf_counter_ns()
             # evaluate the non-duplicate candidates
             for index, af_index in enumerate(actual_candidate_af_indices):
-                candidate_params = actual_candidate_params[index]
-                candidate_index = self.find_param_config_index(candidate_params)
-                observation = self.evaluate_objective_function(candidate_params)
-                self.update_after_evaluation(observation, candidate_index, candidate_params)
+                candidate_index = actual_candidate_searchspace_indices[index]
+                observation = self.evaluate_objective_function(candidate_index)
+                self.update_after_evaluation(observation, candidate_index)
                 if observation != self.invalid_value:
                     # we use the registered observations for maximization of the discounted reward
                     reg_observation = observation if self.opt_direction == 'min' else -1 * observation
@@ -648,9 +747,10 @@ class BayesianOptimization():
                 return self.__optimize(max_fevals)
             if self.__visited_num >= self.searchspace_size:
                 raise ValueError(self.error_message_searchspace_fully_observed)
-            observations_median = np.median(self.__valid_observations)
+            observations_median = np.median(self.valid_params_observations()[1])
             if increase_precision is False:
-                predictions, _, std = self.predict_list(self.unvisited_cache)
+                candidates = self.get_candidates()
+                predictions, _, std = self.predict_list(candidates)
                 hyperparam = self.contextual_variance(std)
             for af_index, af in enumerate(aqfs):
                 if af_index in skip_af_index:
@@ -658,15 +758,17 @@ class BayesianOptimization():
                 if self.__visited_num >= self.searchspace_size or self.fevals >= max_fevals:
                     break
                 if increase_precision is True:
-                    predictions, _, std = self.predict_list(self.unvisited_cache)
+                    candidates = self.get_candidates()
+                    predictions, _, std = self.predict_list(candidates)
                     hyperparam = self.contextual_variance(std)
                 list_of_acquisition_values = af(predictions, hyperparam)
                 best_af = self.argopt(list_of_acquisition_values)
-                del predictions[best_af]    # to avoid going out of bounds
-                candidate_params = self.unvisited_cache[best_af]
-                candidate_index = self.find_param_config_index(candidate_params)
-                observation = self.evaluate_objective_function(candidate_params)
-                self.update_after_evaluation(observation, candidate_index, candidate_params)
+                candidate_index = candidates[best_af]
+                # remove the candidate such that the next acquisition function selects a different candidate
+                predictions = np.delete(predictions, best_af, axis=0)
+                candidates = np.delete(candidates, best_af)
+                observation = self.evaluate_objective_function(candidate_index)
+                self.update_after_evaluation(observation, candidate_index)
                 if increase_precision is True:
                     self.fit_observations_to_model()
                 # we use the registered observations for maximization of the discounted reward
@@ -734,7 +836,8 @@ class BayesianOptimization():
         while self.fevals < max_fevals:
             aqfs = self.multi_afs
             # if we take the prediction only once, we want to go from most exploiting to most exploring, because the more exploiting an AF is, the more it relies on non-stale information from the model
-            predictions, _, std = self.predict_list(self.unvisited_cache)
+            candidates = self.get_candidates()
+            predictions, _, std = self.predict_list(candidates)
             hyperparam = self.contextual_variance(std)
             if self.__visited_num >= self.searchspace_size:
                 raise ValueError(self.error_message_searchspace_fully_observed)
@@ -743,83 +846,69 @@ class BayesianOptimization():
                     break
                 list_of_acquisition_values = af(predictions, hyperparam)
                 best_af = self.argopt(list_of_acquisition_values)
-                del predictions[best_af]    # to avoid going out of bounds
-                candidate_params = self.unvisited_cache[best_af]
-                candidate_index = self.find_param_config_index(candidate_params)
-                observation = self.evaluate_objective_function(candidate_params)
-                self.update_after_evaluation(observation, candidate_index, candidate_params)
+                candidate_index = candidates[best_af]
+                # remove the candidate such that the next acquisition function selects a different candidate
+                predictions = np.delete(predictions, best_af, axis=0)
+                candidates = np.delete(candidates, best_af)
+                observation = self.evaluate_objective_function(candidate_index)
+                self.update_after_evaluation(observation, candidate_index)
             self.fit_observations_to_model()
         return self.results
 
     def af_random(self, predictions=None, hyperparam=None) -> list:
         """ Acquisition function returning a randomly shuffled list for comparison """
-        list_random = range(len(self.unvisited_cache))
+        list_random = list(range(len(predictions) if predictions is not None else len(self.unvisited())))
         shuffle(list_random)
         return list_random
 
-    def af_probability_of_improvement(self, predictions=None, hyperparam=None) -> list:
+    def af_probability_of_improvement(self, predictions=None, hyperparam=None) -> np.ndarray:
         """ Acquisition function Probability of Improvement (PI) """
 
         # prefetch required data
         if predictions is None:
-            predictions, _, _ = self.predict_list(self.unvisited_cache)
+            predictions, _, _ = self.predict_list(self.unvisited())
         if hyperparam is None:
             hyperparam = self.af_params['explorationfactor']
         fplus = self.current_optimum - hyperparam
-
-        # precompute difference of improvement
-        list_diff_improvement = list(-((fplus - x_mu) / (x_std + 1E-9)) for (x_mu, x_std) in predictions)
+        mu, std = predictions[:, 0], predictions[:, 1]
 
         # compute probability of improvement with CDF in bulk
-        list_prob_improvement = norm.cdf(list_diff_improvement)
-
-        return list_prob_improvement
+        return norm.cdf(-((fplus - mu) / (std + 1E-9)))
 
-    def af_expected_improvement(self, predictions=None, hyperparam=None) -> list:
+    def af_expected_improvement(self, predictions=None, hyperparam=None) -> np.ndarray:
         """ Acquisition function Expected Improvement (EI) """
 
         # prefetch required data
         if predictions is None:
-            predictions, _, _ = self.predict_list(self.unvisited_cache)
+            predictions, _, _ = self.predict_list(self.unvisited())
         if hyperparam is None:
             hyperparam = self.af_params['explorationfactor']
         fplus = self.current_optimum - hyperparam
+        mu, std = predictions[:, 0], predictions[:, 1]
 
-        # precompute difference of improvement, CDF and PDF in bulk
-        list_diff_improvement = list((fplus - x_mu) / (x_std + 1E-9) for (x_mu, x_std) in predictions)
-        list_cdf = norm.cdf(list_diff_improvement)
-        list_pdf = norm.pdf(list_diff_improvement)
-
-        # specify AF calculation
-        def exp_improvement(index) -> float:
-            x_mu, x_std = predictions[index]
-            ei = (fplus - x_mu) * list_cdf[index] + x_std * list_pdf[index]
-            return -ei
-
-        # calculate AF
-        list_exp_improvement = list(map(exp_improvement, range(len(predictions))))
-        return list_exp_improvement
+        # compute difference of improvement, CDF, PDF and EI in bulk
+        diff_improvement = (fplus - mu) / (std + 1E-9)
+        return -((fplus - mu) * norm.cdf(diff_improvement) + std * norm.pdf(diff_improvement))
 
-    def af_lower_confidence_bound(self, predictions=None, hyperparam=None) -> list:
+    def af_lower_confidence_bound(self, predictions=None, hyperparam=None) -> np.ndarray:
         """ Acquisition function Lower Confidence Bound (LCB) """
 
         # prefetch required data
         if predictions is None:
-            predictions, _, _ = self.predict_list(self.unvisited_cache)
+            predictions, _, _ = self.predict_list(self.unvisited())
         if hyperparam is None:
             hyperparam = self.af_params['explorationfactor']
         beta = hyperparam
 
         # compute LCB in bulk
-        list_lower_confidence_bound = list(x_mu - beta * x_std for (x_mu, x_std) in predictions)
-        return list_lower_confidence_bound
+        return predictions[:, 0] - beta * predictions[:, 1]
 
-    def af_lower_confidence_bound_srinivas(self, predictions=None, hyperparam=None) -> list:
+    def af_lower_confidence_bound_srinivas(self, predictions=None, hyperparam=None) -> np.ndarray:
         """ Acquisition function Lower Confidence Bound (UCB-S) after Srinivas, 2010 / Brochu, 2010 """
 
         # prefetch required data
         if predictions is None:
-            predictions, _, _ = self.predict_list(self.unvisited_cache)
+            predictions, _, _ = self.predict_list(self.unvisited())
         if hyperparam is None:
             hyperparam = self.af_params['explorationfactor']
 
@@ -831,18 +920,16 @@ class BayesianOptimization():
         beta = np.sqrt(zeta * (2 * np.log((t**(d / 2. + 2)) * (np.pi**2) / (3. * delta))))
 
         # compute UCB in bulk
-        list_lower_confidence_bound = list(x_mu - beta * x_std for (x_mu, x_std) in predictions)
-        return list_lower_confidence_bound
+        return predictions[:, 0] - beta * predictions[:, 1]
 
     def visualize_after_opt(self):
         """ Visualize the model after the optimization """
-        print(self.__model.kernel_.get_params())
-        print(self.__model.log_marginal_likelihood())
+        print(self.__model.kernel.get_params())
         import matplotlib.pyplot as plt
-        _, mu, std = self.predict_list(self.searchspace)
+        _, mu, std = self.predict_list(self.searchspace.indices)
         brute_force_observations = list()
-        for param_config in self.searchspace:
-            obs = common._cost_func(param_config, self.kernel_options, self.tuning_options, self.runner, self.results)
+        for index in self.searchspace.indices:
+            obs = common._cost_func(self.normalized_param_config(index), self.kernel_options, self.tuning_options, self.runner, self.results, check_restrictions=False)
             if obs == self.invalid_value:
                 obs = None
             brute_force_observations.append(obs)
@@ -0,0 +1,157 @@
+""" Covariance matrix adaptation evolution strategy (CMA-ES) with restarts and increasing population size (IPOP) """
+from collections import OrderedDict
+
+import numpy as np
+
+from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common
+
+_options = OrderedDict(popsize=("Initial population size, by default 4 + 3 ln(number of parameters)", None),
+                       sigma=("Initial step size in the normalized searchspace, where the values of each parameter span [0, 1]", 0.3),
+                       maxstall=("Number of generations without unvisited configurations after which the strategy restarts with a doubled population", 10))
+
+
+def tune(runner, kernel_options, device_options, tuning_options):
+
+    options = tuning_options.strategy_options
+    popsize, sigma, maxstall = common.get_options(options, _options)
+    max_fevals = options.get("max_fevals", 100)
+
+    tuning_options["scaling"] = False
+
+    # limit max_fevals to max size of the parameter space
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    max_fevals = min(searchspace.size, max_fevals)
+    normalized = searchspace.get_normalized_array()
+    if popsize is None:
+        popsize = 4 + int(3 * np.log(searchspace.num_params))
+
+    results = []
+
+    def get_value(result):
+        """ Numerical value of a result taking the optimization direction into account, NaN if the configuration failed """
+        value = result[tuning_options.objective]
+        if isinstance(value, util.ErrorConfig):
+            return np.nan
+        return -value if tuning_options.objective_higher_is_better else value
+
+    def evaluate(indices):
+        """ Evaluate the configurations at the indices, only passing configurations to the runner that are not in unique_results """
+        unique, inverse = np.unique(indices, return_inverse=True)
+        values = np.full(len(unique), np.nan)
+        batch = list()
+        for i, index in enumerate(unique):
+            x_int = ",".join([str(v) for v in searchspace.list[index]])
+            if x_int in tuning_options.unique_results:
+                values[i] = get_value(tuning_options.unique_results[x_int])
+            else:
+                batch.append(i)
+
+        # configurations beyond the remaining budget are not evaluated and get no value
+        batch = batch[:max_fevals - len(tuning_options.unique_results)]
+        if batch:
+            common._cost_func_batch([searchspace.list[unique[i]] for i in batch], kernel_options, tuning_options, runner, results)
+            values[batch] = list(get_value(result) for result in results[-len(batch):])
+        return values[inverse], len(batch)
+
+    cma = CMAES(normalized[searchspace.get_random_sample_indices(1)[0]], popsize, sigma)
+    stalled = 0
+
+    try:
+        while len(tuning_options.unique_results) < max_fevals:
+            util.check_stop_criterion(tuning_options)
+
+            # sample a population and snap it to the nearest valid configurations at once
+            indices = searchspace.get_nearest_indices(cma.ask())
+            values, num_evaluated = evaluate(indices)
+
+            # the covariance is adapted from the snapped configurations that compiled and ran
+            valid = ~np.isnan(values)
+            if np.any(valid):
+                cma.tell(normalized[indices[valid]], values[valid])
+
+            # restart from a random configuration when the distribution no longer reaches unvisited configurations
+            stalled = 0 if num_evaluated > 0 else stalled + 1
+            if stalled >= maxstall or not cma.is_stable():
+                popsize = min(2 * popsize, searchspace.size)
+                cma = CMAES(normalized[searchspace.get_random_sample_indices(1)[0]], popsize, sigma)
+                stalled = 0
+
+    except util.StopCriterionReached as e:
+        if tuning_options.verbose:
+            print(e)
+
+    return results, runner.dev.get_environment()
+
+
+tune.__doc__ = common.get_strategy_docstring("Covariance matrix adaptation evolution strategy (CMA-ES)", _options)
+
+
+class CMAES():
+    """ (mu/mu_w, lambda)-CMA-ES following the tutorial of Hansen (2016) in the normalized searchspace
+
+    Samples are drawn from a multivariate normal distribution and clipped to [0, 1] in each
+    dimension. The distribution is updated with the points that were actually evaluated, which
+    are the sampled points after snapping them to the nearest valid configurations.
+    """
+
+    def __init__(self, mean, popsize, sigma):
+        n = len(mean)
+        self.dim = n
+        self.popsize = max(2, popsize)
+        self.mu = self.popsize // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / np.sum(weights)
+        self.mueff = 1 / np.sum(self.weights**2)
+
+        # strategy parameters for the adaptation of the step size and the covariance matrix
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3)**2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2)**2 + self.mueff))
+        self.damps = 1 + 2 * max(0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chin = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+
+        self.mean = np.array(mean, dtype=np.float64)
+        self.sigma = sigma
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.generation = 0
+
+    def ask(self) -> np.ndarray:
+        """ Sample a population of popsize points in [0, 1] in each dimension """
+        z = np.random.standard_normal((self.popsize, self.dim))
+        return np.clip(self.mean + self.sigma * (z * self.D) @ self.B.T, 0, 1)
+
+    def tell(self, points: np.ndarray, values: np.ndarray):
+        """ Update the distribution with the values of the evaluated points, lower values are better """
+        order = np.argsort(values, kind="stable")[:self.mu]
+        weights = self.weights[:len(order)] / np.sum(self.weights[:len(order)])
+        steps = (points[order] - self.mean) / self.sigma
+        step = weights @ steps
+        self.mean = self.mean + self.sigma * step
+        self.generation += 1
+
+        # evolution paths of the step size and the covariance matrix
+        invsqrt_C = (self.B / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * (invsqrt_C @ step)
+        hsig = np.linalg.norm(self.ps) / np.sqrt(1 - (1 - self.cs)**(2 * self.generation)) / self.chin < 1.4 + 2 / (self.dim + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * step
+
+        # rank-one and rank-mu update of the covariance matrix
+        self.C = (1 - self.c1 - self.cmu) * self.C + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C) \
+            + self.cmu * (steps.T * weights) @ steps
+        self.sigma *= np.exp(min(1, (self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chin - 1)))
+
+        # the covariance matrix is small, so it is decomposed every generation
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+    def is_stable(self) -> bool:
+        """ Check whether the distribution is numerically sound """
+        return bool(np.isfinite(self.sigma) and 1e-12 < self.sigma * np.max(self.D) < 1e6 and np.max(self.D) < 1e7 * np.min(self.D))
@@ -59,8 +59,8 @@ def get_options(strategy_options, options):
     return [strategy_options.get(opt, default) for opt, (_, default) in options.items()]
 
 
-def _cost_func(x, kernel_options, tuning_options, runner, results, check_restrictions=True):
-    """ Cost function used by almost all strategies """
+def _cost_func(x, kernel_options, tuning_options, runner, results, check_restrictions=True, searchspace=None):
+    """ Cost function used by almost all strategies, snaps x to the nearest valid configuration in the searchspace if one is passed """
     runner.last_strategy_time = 1000 * (perf_counter() - runner.last_strategy_start_time)
 
     # error value to return for numeric optimizers that need a numerical value
@@ -71,7 +71,11 @@ def _cost_func(x, kernel_options, tuning_options, runner, results, check_restric
     util.check_stop_criterion(tuning_options)
 
     # snap values in x to nearest actual value for each parameter unscale x if needed
-    if tuning_options.snap:
+    if tuning_options.snap and searchspace is not None:
+        params = searchspace.list[get_nearest_index(x, tuning_options, searchspace)]
+        # configurations in the searchspace satisfy the restrictions
+        check_restrictions = False
+    elif tuning_options.snap:
         if tuning_options.scaling:
             params = unscale_and_snap_to_nearest(x, tuning_options.tune_params, tuning_options.eps)
         else:
@@ -112,8 +116,82 @@ def _cost_func(x, kernel_options, tuning_options, runner, results, check_restric
     return return_value
 
 
-def get_bounds_x0_eps(tuning_options, max_threads):
-    """compute bounds, x0 (the initial guess), and eps"""
+def _cost_func_batch(param_configs, kernel_options, tuning_options, runner, results):
+    """ Cost function for a batch of valid configurations from the searchspace, passed to the runner at once such that they can be evaluated in parallel """
+    runner.last_strategy_time = 1000 * (perf_counter() - runner.last_strategy_start_time)
+    logging.debug('_cost_func_batch called')
+
+    # check if max_fevals is reached or time limit is exceeded
+    util.check_stop_criterion(tuning_options)
+
+    # compile and benchmark all configurations at once
+    res, _ = runner.run(param_configs, kernel_options, tuning_options)
+
+    return_values = []
+    for params, result in zip(param_configs, res):
+        # append to tuning results
+        x_int = ",".join([str(i) for i in params])
+        if x_int not in tuning_options.unique_results:
+            tuning_options.unique_results[x_int] = result
+        results.append(result)
+
+        # get numerical return value, taking optimization direction into account
+        return_value = result[tuning_options.objective] or sys.float_info.max
+        return_values.append(return_value if not tuning_options.objective_higher_is_better else -return_value)
+
+    # upon returning from this function control will be given back to the strategy, so reset the start time
+    runner.last_strategy_start_time = perf_counter()
+    return return_values
+
+
+# strategy option of the strategies that use MemoizedCostFunc
+repeats_option = ("Include repeated configurations in the results, the runner is not called again for configurations that were already evaluated", True)
+
+
+class MemoizedCostFunc():
+    """ Cost function that snaps x to the searchspace and remembers the return value of each configuration by its index
+
+    Configurations that were already evaluated are not passed to the runner again. If repeats is True, the
+    stored result of a repeated configuration is appended to the results again, otherwise it is left out.
+    Can be called with the same arguments as _cost_func, such that it can be passed to the optimizers in scipy.
+    """
+
+    def __init__(self, searchspace: Searchspace, repeats=True):
+        self.searchspace = searchspace
+        self.repeats = repeats
+        self.values = dict()
+        self.results = dict()
+        self.avoided_runner_calls = 0
+
+    def __call__(self, x, kernel_options, tuning_options, runner, results):
+        index = get_nearest_index(x, tuning_options, self.searchspace)
+        if index not in self.values:
+            self.values[index] = _cost_func(x, kernel_options, tuning_options, runner, results, searchspace=self.searchspace)
+            self.results[index] = results[-1]
+            return self.values[index]
+
+        # the time limit still applies when no configurations are evaluated
+        util.check_stop_criterion(tuning_options)
+        self.avoided_runner_calls += 1
+        if self.repeats:
+            results.append(self.results[index])
+        return self.values[index]
+
+    def report(self, tuning_options):
+        """ Print the number of runner calls that were avoided, if verbose """
+        if tuning_options.verbose:
+            print(f"avoided {self.avoided_runner_calls} runner calls for configurations that were already evaluated")
+
+
+def get_nearest_index(x, tuning_options, searchspace):
+    """ Get the index of the valid configuration in the searchspace nearest to x, in the scaled or the raw space of the strategy """
+    if tuning_options.scaling:
+        return searchspace.get_nearest_indices(x, "scaled", tuning_options.eps)[0]
+    return searchspace.get_nearest_indices(x, "raw")[0]
+
+
+def get_bounds_x0_eps(tuning_options, max_threads, searchspace=None):
+    """compute bounds, x0 (the initial guess), and eps, drawing x0 from the searchspace if it is passed"""
     values = list(tuning_options.tune_params.values())
 
     if "x0" in tuning_options.strategy_options:
@@ -131,7 +209,8 @@ def get_bounds_x0_eps(tuning_options, max_threads):
             x0 = scale_from_params(x0, tuning_options, eps)
         else:
             # get a valid x0
-            searchspace = Searchspace(tuning_options, max_threads)
+            if searchspace is None:
+                searchspace = Searchspace(tuning_options, max_threads)
             pos = list(searchspace.get_random_sample(1)[0])
             x0 = scale_from_params(pos, tuning_options.tune_params, eps)
     else:
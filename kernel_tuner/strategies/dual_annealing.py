@@ -3,25 +3,28 @@ from collections import OrderedDict
 
 import scipy.optimize
 from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies import common
-from kernel_tuner.strategies.common import (_cost_func, get_bounds_x0_eps,
+from kernel_tuner.strategies.common import (MemoizedCostFunc, get_bounds_x0_eps,
                                             setup_method_arguments,
                                             setup_method_options)
 
 supported_methods = ['COBYLA', 'L-BFGS-B', 'SLSQP', 'CG', 'Powell', 'Nelder-Mead', 'BFGS', 'trust-constr']
 
-_options = OrderedDict(method=(f"Local optimization method to use, choose any from {supported_methods}", "Powell"))
+_options = OrderedDict(method=(f"Local optimization method to use, choose any from {supported_methods}", "Powell"),
+                       repeats=common.repeats_option)
 
 def tune(runner, kernel_options, device_options, tuning_options):
 
     results = []
 
-    method = common.get_options(tuning_options.strategy_options, _options)[0]
+    method, repeats = common.get_options(tuning_options.strategy_options, _options)
 
     #scale variables in x to make 'eps' relevant for multiple variables
     tuning_options["scaling"] = True
 
-    bounds, x0, _ = get_bounds_x0_eps(tuning_options, runner.dev.max_threads)
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    bounds, x0, _ = get_bounds_x0_eps(tuning_options, runner.dev.max_threads, searchspace)
 
     kwargs = setup_method_arguments(method, bounds)
     options = setup_method_options(method, tuning_options)
@@ -32,9 +35,11 @@ def tune(runner, kernel_options, device_options, tuning_options):
     minimizer_kwargs = {}
     minimizer_kwargs["method"] = method
 
+    cost_func = MemoizedCostFunc(searchspace, repeats)
+
     opt_result = None
     try:
-        opt_result = scipy.optimize.dual_annealing(_cost_func, bounds, args=args, minimizer_kwargs=minimizer_kwargs, x0=x0)
+        opt_result = scipy.optimize.dual_annealing(cost_func, bounds, args=args, minimizer_kwargs=minimizer_kwargs, x0=x0)
     except util.StopCriterionReached as e:
         if tuning_options.verbose:
             print(e)
@@ -42,6 +47,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
     if opt_result and tuning_options.verbose:
         print(opt_result.message)
 
+    cost_func.report(tuning_options)
     return results, runner.dev.get_environment()
 
 
@@ -6,7 +6,7 @@ import numpy as np
 from kernel_tuner import util
 from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies import common
-from kernel_tuner.strategies.common import (_cost_func, get_bounds_x0_eps,
+from kernel_tuner.strategies.common import (MemoizedCostFunc, get_bounds_x0_eps,
                                             scale_from_params)
 from kernel_tuner.strategies.pso import Particle
 
@@ -14,7 +14,8 @@ _options = OrderedDict(popsize=("Population size", 20),
                        maxiter=("Maximum number of iterations", 100),
                        B0=("Maximum attractiveness", 1.0),
                        gamma=("Light absorption coefficient", 1.0),
-                       alpha=("Randomization parameter", 0.2))
+                       alpha=("Randomization parameter", 0.2),
+                       repeats=common.repeats_option)
 
 def tune(runner, kernel_options, device_options, tuning_options):
 
@@ -23,12 +24,14 @@ def tune(runner, kernel_options, device_options, tuning_options):
     # scale variables in x because PSO works with velocities to visit different configurations
     tuning_options["scaling"] = True
 
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+
     # using this instead of get_bounds because scaling is used
-    bounds, _, eps = get_bounds_x0_eps(tuning_options, runner.dev.max_threads)
+    bounds, _, eps = get_bounds_x0_eps(tuning_options, runner.dev.max_threads, searchspace)
 
     args = (kernel_options, tuning_options, runner, results)
 
-    num_particles, maxiter, B0, gamma, alpha = common.get_options(tuning_options.strategy_options, _options)
+    num_particles, maxiter, B0, gamma, alpha, repeats = common.get_options(tuning_options.strategy_options, _options)
 
     best_score_global = sys.float_info.max
     best_position_global = []
@@ -39,18 +42,20 @@ def tune(runner, kernel_options, device_options, tuning_options):
         swarm.append(Firefly(bounds, args))
 
     # ensure particles start from legal points
-    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
     population = list(list(p) for p in searchspace.get_random_sample(num_particles))
     for i, particle in enumerate(swarm):
         particle.position = scale_from_params(population[i], tuning_options.tune_params, eps)
 
+    cost_func = MemoizedCostFunc(searchspace, repeats)
+
     # compute initial intensities
     for j in range(num_particles):
         try:
-            swarm[j].compute_intensity(_cost_func)
+            swarm[j].compute_intensity(cost_func)
         except util.StopCriterionReached as e:
             if tuning_options.verbose:
                 print(e)
+            cost_func.report(tuning_options)
             return results, runner.dev.get_environment()
         if swarm[j].score <= best_score_global:
             best_position_global = swarm[j].position
@@ -70,10 +75,11 @@ def tune(runner, kernel_options, device_options, tuning_options):
 
                     swarm[i].move_towards(swarm[j], beta, alpha)
                     try:
-                        swarm[i].compute_intensity(_cost_func)
+                        swarm[i].compute_intensity(cost_func)
                     except util.StopCriterionReached as e:
                         if tuning_options.verbose:
                             print(e)
+                        cost_func.report(tuning_options)
                         return results, runner.dev.get_environment()
 
                     # update global best if needed, actually only used for printing
@@ -88,6 +94,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
         print(best_position_global)
         print(best_score_global)
 
+    cost_func.report(tuning_options)
     return results, runner.dev.get_environment()
 
 
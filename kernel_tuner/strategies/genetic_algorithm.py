@@ -1,5 +1,4 @@
 """ A simple genetic algorithm for parameter search """
-import random
 from collections import OrderedDict
 
 import numpy as np
@@ -28,25 +27,21 @@ def tune(runner, kernel_options, device_options, tuning_options):
     results = []
 
     searchspace = Searchspace(tuning_options, runner.dev.max_threads)
-    population = list(list(p) for p in searchspace.get_random_sample(pop_size))
+    pop_size = min(pop_size, searchspace.size)
+    population = searchspace.get_random_sample_indices(pop_size)
 
     for generation in range(generations):
 
         # determine fitness of population members
-        weighted_population = []
-        for dna in population:
+        scores = np.empty(len(population))
+        for i, index in enumerate(population):
             try:
-                time = _cost_func(dna, kernel_options, tuning_options, runner, results, check_restrictions=False)
+                scores[i] = _cost_func(searchspace.list[index], kernel_options, tuning_options, runner, results, check_restrictions=False)
             except util.StopCriterionReached as e:
                 if tuning_options.verbose:
                     print(e)
                 return results, runner.dev.get_environment()
 
-            weighted_population.append((dna, time))
-
-        # population is sorted such that better configs have higher chance of reproducing
-        weighted_population.sort(key=lambda x: x[1])
-
         # 'best_score' is used only for printing
         if tuning_options.verbose and results:
             best_score = util.get_best_config(results, tuning_options.objective, tuning_options.objective_higher_is_better)[tuning_options.objective]
@@ -54,22 +49,8 @@ def tune(runner, kernel_options, device_options, tuning_options):
         if tuning_options.verbose:
             print("Generation %d, best_score %f" % (generation, best_score))
 
-        population = []
-
-        # crossover and mutate
-        while len(population) < pop_size:
-            dna1, dna2 = weighted_choice(weighted_population, 2)
-
-            children = crossover(dna1, dna2)
-
-            for child in children:
-                child = mutate(child, mutation_chance, searchspace)
-
-                if child not in population and searchspace.is_param_config_valid(tuple(child)):
-                    population.append(child)
-
-                if len(population) >= pop_size:
-                    break
+        # population is sorted such that better configs have higher chance of reproducing
+        population = create_offspring(population[np.argsort(scores, kind="stable")], pop_size, crossover, mutation_chance, searchspace)
 
         # could combine old + new generation here and do a selection
 
@@ -79,100 +60,132 @@ def tune(runner, kernel_options, device_options, tuning_options):
 tune.__doc__ = common.get_strategy_docstring("Genetic Algorithm", _options)
 
 
-def weighted_choice(population, n):
-    """Randomly select n unique individuals from a weighted population, fitness determines probability of being selected"""
+def create_offspring(population, pop_size, crossover, mutation_chance, searchspace: Searchspace, max_rounds=10):
+    """Create a new population of pop_size unique valid configurations from a population of searchspace indices sorted from best to worst
 
-    def random_index_betavariate(pop_size):
+    All children of a round are created at once on the indices of the parameter values. If too few of
+    them are valid and unique after max_rounds rounds, the population is filled with random configurations.
+    """
+    genes = searchspace.get_params_values_indices()
+    offspring = []
+    seen = set()
+    for _ in range(max_rounds):
+        parents = population[weighted_choice(len(population), (pop_size + 1) // 2)]
+        children = np.stack(crossover(genes[parents[:, 0]], genes[parents[:, 1]]), axis=1).reshape(-1, searchspace.num_params)
+        children = mutate(children, mutation_chance, searchspace)
+
+        # keep the first occurrence of each valid child, using a hash set instead of searching the population
+        for index in searchspace.get_indices_of_params_values_indices(children).tolist():
+            if index >= 0 and index not in seen:
+                seen.add(index)
+                offspring.append(index)
+                if len(offspring) == pop_size:
+                    return np.array(offspring, dtype=int)
+
+    remaining = np.setdiff1d(searchspace.indices, offspring)
+    offspring += list(np.random.choice(remaining, pop_size - len(offspring), replace=False))
+    return np.array(offspring, dtype=int)
+
+
+def weighted_choice(pop_size, num_pairs):
+    """Randomly select num_pairs pairs of different individuals from a population sorted from best to worst, better individuals have a higher probability of being selected"""
+
+    def random_index_betavariate(size):
         # has a higher probability of returning index of item at the head of the list
         alpha = 1
         beta = 2.5
-        return int(random.betavariate(alpha, beta) * pop_size)
-
-    def random_index_weighted(pop_size):
-        """use weights to increase probability of selection"""
-        weights = [w for _, w in population]
-        # invert because lower is better
-        inverted_weights = [1.0 / w for w in weights]
-        prefix_sum = np.cumsum(inverted_weights)
-        total_weight = sum(inverted_weights)
-        randf = random.random() * total_weight
-        # return first index of prefix_sum larger than random number
-        return next(i for i, v in enumerate(prefix_sum) if v > randf)
-
-    random_index = random_index_betavariate
-
-    indices = [random_index(len(population)) for _ in range(n)]
-    chosen = []
-    for ind in indices:
-        while ind in chosen:
-            ind = random_index(len(population))
-        chosen.append(ind)
-
-    return [population[ind][0] for ind in chosen]
-
-
-def mutate(dna, mutation_chance, searchspace: Searchspace, cache=True):
-    """Mutate DNA with 1/mutation_chance chance"""
-
-    # this is actually a neighbors problem with Hamming distance, choose randomly from returned searchspace list
-    if int(random.random() * mutation_chance) == 0:
+        return np.minimum((np.random.beta(alpha, beta, size) * pop_size).astype(int), pop_size - 1)
+
+    pairs = random_index_betavariate((num_pairs, 2))
+    if pop_size < 2:
+        return pairs
+
+    # redraw the second individual of the pairs that selected the same individual twice
+    same = np.flatnonzero(pairs[:, 0] == pairs[:, 1])
+    while len(same) > 0:
+        pairs[same, 1] = random_index_betavariate(len(same))
+        same = same[pairs[same, 0] == pairs[same, 1]]
+    return pairs
+
+
+def mutate(genes, mutation_chance, searchspace: Searchspace, cache=True, max_tries=10):
+    """Mutate each row of parameter value indices with 1/mutation_chance chance, into a random neighbor with Hamming distance 1 from the searchspace"""
+    genes = np.array(genes)
+    mutants = np.flatnonzero(np.random.random(len(genes)) * mutation_chance < 1)
+    num_values = np.array(list(len(values) for values in searchspace.params_values))
+    if np.all(num_values < 2):
+        return genes
+
+    # change a single gene of all mutants at once and reject the invalid ones, which samples the valid neighbors uniformly
+    for _ in range(max_tries):
+        if len(mutants) == 0:
+            return genes
+        rows = np.arange(len(mutants))
+        params = np.random.choice(len(num_values), len(mutants), p=(num_values - 1) / np.sum(num_values - 1))
+        offsets = 1 + (np.random.random(len(mutants)) * (num_values[params] - 1)).astype(int)
+        candidates = genes[mutants]
+        candidates[rows, params] = (candidates[rows, params] + offsets) % num_values[params]
+        valid = searchspace.get_indices_of_params_values_indices(candidates) >= 0
+        genes[mutants[valid]] = candidates[valid]
+        mutants = mutants[~valid]
+
+    # mutants with few valid neighbors choose from their neighbors in the searchspace
+    values_indices = searchspace.get_params_values_indices()
+    for i in mutants:
+        param_config = tuple(values[j] for values, j in zip(searchspace.params_values, genes[i]))
         if cache:
-            neighbors = searchspace.get_neighbors(tuple(dna), neighbor_method="Hamming")
+            neighbors = searchspace.get_neighbors_indices(param_config, neighbor_method="Hamming")
         else:
-            neighbors = searchspace.get_neighbors_no_cache(tuple(dna), neighbor_method="Hamming")
+            neighbors = searchspace.get_neighbors_indices_no_cache(param_config, neighbor_method="Hamming")
         if len(neighbors) > 0:
-            return list(random.choice(neighbors))
-    return dna
+            genes[i] = values_indices[np.random.choice(neighbors)]
+    return genes
 
 
 def single_point_crossover(dna1, dna2):
-    """crossover dna1 and dna2 at a random index"""
-    # check if you can do the crossovers using the neighbor index: check which valid parameter configuration is closest to the crossover, probably best to use "adjacent" as it is least strict?
-    pos = int(random.random() * (len(dna1)))
-    return (dna1[:pos] + dna2[pos:], dna2[:pos] + dna1[pos:])
+    """crossover each row of dna1 and dna2 at a random index"""
+    pos = (np.random.random((len(dna1), 1)) * dna1.shape[1]).astype(int)
+    mask = np.arange(dna1.shape[1]) < pos
+    return np.where(mask, dna1, dna2), np.where(mask, dna2, dna1)
 
 
 def two_point_crossover(dna1, dna2):
-    """crossover dna1 and dna2 at 2 random indices"""
-    if len(dna1) < 5:
-        start, end = 0, len(dna1)
+    """crossover each row of dna1 and dna2 at 2 random indices"""
+    num_params = dna1.shape[1]
+    if num_params < 2:
+        return dna1.copy(), dna2.copy()
+    if num_params < 5:
+        start, end = 0, num_params
     else:
-        start, end = 1, len(dna1) - 1
-    pos1, pos2 = sorted(random.sample(list(range(start, end)), 2))
-    child1 = dna1[:pos1] + dna2[pos1:pos2] + dna1[pos2:]
-    child2 = dna2[:pos1] + dna1[pos1:pos2] + dna2[pos2:]
-    return (child1, child2)
+        start, end = 1, num_params - 1
+    # draw two different positions for each row
+    pos1 = np.random.randint(start, end, (len(dna1), 1))
+    pos2 = np.random.randint(start, end - 1, (len(dna1), 1))
+    pos2 += pos2 >= pos1
+    pos1, pos2 = np.minimum(pos1, pos2), np.maximum(pos1, pos2)
+    mask = (np.arange(num_params) >= pos1) & (np.arange(num_params) < pos2)
+    return np.where(mask, dna2, dna1), np.where(mask, dna1, dna2)
 
 
 def uniform_crossover(dna1, dna2):
-    """randomly crossover genes between dna1 and dna2"""
-    ind = np.random.random(len(dna1)) > 0.5
-    child1 = [dna1[i] if ind[i] else dna2[i] for i in range(len(ind))]
-    child2 = [dna2[i] if ind[i] else dna1[i] for i in range(len(ind))]
-    return child1, child2
+    """randomly crossover genes between each row of dna1 and dna2"""
+    mask = np.random.random(dna1.shape) > 0.5
+    return np.where(mask, dna1, dna2), np.where(mask, dna2, dna1)
 
 
 def disruptive_uniform_crossover(dna1, dna2):
     """disruptive uniform crossover
 
-    uniformly crossover genes between dna1 and dna2,
+    uniformly crossover genes between each row of dna1 and dna2,
     with children guaranteed to be different from parents,
     if the number of differences between parents is larger than 1
     """
-    differences = sum(1 for i, j in zip(dna1, dna2) if i != j)
-    swaps = 0
-    child1 = dna1[:]
-    child2 = dna2[:]
-    while swaps < (differences + 1) // 2:
-        for ind in range(len(dna1)):
-            # if there is a difference on this index and has not been swapped yet
-            if dna1[ind] != dna2[ind] and child1[ind] != dna2[ind]:
-                p = random.random()
-                if p < 0.5 and swaps < (differences + 1) // 2:
-                    child1[ind] = dna2[ind]
-                    child2[ind] = dna1[ind]
-                    swaps += 1
-    return (child1, child2)
+    differences = dna1 != dna2
+    swaps = (np.count_nonzero(differences, axis=1, keepdims=True) + 1) // 2
+    # swap a random half of the differing genes, by ranking random keys that are infinite for equal genes
+    keys = np.where(differences, np.random.random(dna1.shape), np.inf)
+    mask = np.argsort(np.argsort(keys, axis=1), axis=1) < swaps
+    return np.where(mask, dna2, dna1), np.where(mask, dna1, dna2)
 
 
 supported_methods = {
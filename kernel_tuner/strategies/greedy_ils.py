@@ -1,17 +1,19 @@
 """ A simple greedy iterative local search algorithm for parameter search """
 from collections import OrderedDict
 
+import numpy as np
 from kernel_tuner import util
 from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies import common
 from kernel_tuner.strategies.common import _cost_func
 from kernel_tuner.strategies.genetic_algorithm import mutate
-from kernel_tuner.strategies.hillclimbers import base_hillclimb
+from kernel_tuner.strategies.hillclimbers import NeighborSurrogate, base_hillclimb
 
 _options = OrderedDict(neighbor=("Method for selecting neighboring nodes, choose from Hamming or adjacent", "Hamming"),
                        restart=("controls greedyness, i.e. whether to restart from a position as soon as an improvement is found", True),
                        no_improvement=("number of evaluations to exceed without improvement before restarting", 50),
-                       random_walk=("controls greedyness, i.e. whether to restart from a position as soon as an improvement is found", 0.3))
+                       random_walk=("controls greedyness, i.e. whether to restart from a position as soon as an improvement is found", 0.3),
+                       surrogate=("model of the observations that ranks the neighbors such that the most promising are evaluated first, choose from knn, linear or None", None))
 
 def tune(runner, kernel_options, device_options, tuning_options):
 
@@ -19,7 +21,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
 
     options = tuning_options.strategy_options
 
-    neighbor, restart, no_improvement, randomwalk = common.get_options(options, _options)
+    neighbor, restart, no_improvement, randomwalk, surrogate_method = common.get_options(options, _options)
 
     perm_size = int(randomwalk * dna_size)
     if perm_size == 0:
@@ -31,6 +33,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
     # limit max_fevals to max size of the parameter space
     searchspace = Searchspace(tuning_options, runner.dev.max_threads)
     max_fevals = min(searchspace.size, max_fevals)
+    surrogate = NeighborSurrogate(searchspace, surrogate_method) if surrogate_method else None
 
     fevals = 0
     results = []
@@ -43,7 +46,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
     while fevals < max_fevals:
 
         try:
-            candidate = base_hillclimb(candidate, neighbor, max_fevals, searchspace, results, kernel_options, tuning_options, runner, restart=restart, randomize=True)
+            candidate = base_hillclimb(candidate, neighbor, max_fevals, searchspace, results, kernel_options, tuning_options, runner, restart=restart, randomize=True, surrogate=surrogate)
             new_score = _cost_func(candidate, kernel_options, tuning_options, runner, results, check_restrictions=False)
         except util.StopCriterionReached as e:
             if tuning_options.verbose:
@@ -66,6 +69,7 @@ tune.__doc__ = common.get_strategy_docstring("Greedy Iterative Local Search (ILS
 def random_walk(indiv, permutation_size, no_improve, last_improve, searchspace: Searchspace):
     if last_improve >= no_improve:
         return searchspace.get_random_sample(1)[0]
+    genes = np.array([searchspace.get_param_indices(tuple(indiv))])
     for _ in range(permutation_size):
-        indiv = mutate(indiv, 0, searchspace, cache=False)
-    return indiv
+        genes = mutate(genes, 0, searchspace, cache=False)
+    return list(searchspace.list[searchspace.get_indices_of_params_values_indices(genes)[0]])
@@ -4,18 +4,19 @@ from collections import OrderedDict
 from kernel_tuner import util
 from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies import common
-from kernel_tuner.strategies.hillclimbers import base_hillclimb
+from kernel_tuner.strategies.hillclimbers import NeighborSurrogate, base_hillclimb
 
 _options = OrderedDict(neighbor=("Method for selecting neighboring nodes, choose from Hamming or adjacent", "Hamming"),
                        restart=("controls greedyness, i.e. whether to restart from a position as soon as an improvement is found", True),
                        order=("set a user-specified order to search among dimensions while hillclimbing", None),
-                       randomize=("use a random order to search among dimensions while hillclimbing", True))
+                       randomize=("use a random order to search among dimensions while hillclimbing", True),
+                       surrogate=("model of the observations that ranks the neighbors such that the most promising are evaluated first, choose from knn, linear or None", None))
 
 def tune(runner, kernel_options, device_options, tuning_options):
 
     # retrieve options with defaults
     options = tuning_options.strategy_options
-    neighbor, restart, order, randomize = common.get_options(options, _options)
+    neighbor, restart, order, randomize, surrogate_method = common.get_options(options, _options)
 
     max_fevals = options.get("max_fevals", 100)
 
@@ -25,6 +26,9 @@ def tune(runner, kernel_options, device_options, tuning_options):
     searchspace = Searchspace(tuning_options, runner.dev.max_threads)
     max_fevals = min(searchspace.size, max_fevals)
 
+    # the surrogate keeps the observations of all restarts
+    surrogate = NeighborSurrogate(searchspace, surrogate_method) if surrogate_method else None
+
     fevals = 0
     results = []
 
@@ -33,7 +37,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
         candidate = searchspace.get_random_sample(1)[0]
 
         try:
-            base_hillclimb(candidate, neighbor, max_fevals, searchspace, results, kernel_options, tuning_options, runner, restart=restart, randomize=randomize, order=order)
+            base_hillclimb(candidate, neighbor, max_fevals, searchspace, results, kernel_options, tuning_options, runner, restart=restart, randomize=randomize, order=order, surrogate=surrogate)
         except util.StopCriterionReached as e:
             if tuning_options.verbose:
                 print(e)
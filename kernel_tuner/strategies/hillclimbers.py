@@ -1,11 +1,14 @@
 import random
 
+import numpy as np
+from scipy.stats import rankdata
+
 from kernel_tuner import util
 from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies.common import _cost_func
 
 
-def base_hillclimb(base_sol: tuple, neighbor_method: str, max_fevals: int, searchspace: Searchspace, all_results, kernel_options, tuning_options, runner, restart=True, randomize=True, order=None):
+def base_hillclimb(base_sol: tuple, neighbor_method: str, max_fevals: int, searchspace: Searchspace, all_results, kernel_options, tuning_options, runner, restart=True, randomize=True, order=None, surrogate=None):
     """ Hillclimbing search until max_fevals is reached or no improvement is found
 
     Base hillclimber that evaluates neighbouring solutions in a random or fixed order
@@ -50,6 +53,10 @@ def base_hillclimb(base_sol: tuple, neighbor_method: str, max_fevals: int, searc
         to be evaluated by the hillclimber.
     :type order: list
 
+    :params surrogate: Model of the observations that ranks all neighbors of a position, such that
+        the most promising neighbors are evaluated first. None by default.
+    :type surrogate: NeighborSurrogate
+
     :returns: The final position that was reached when hillclimbing halted.
     :rtype: list
 
@@ -61,6 +68,8 @@ def base_hillclimb(base_sol: tuple, neighbor_method: str, max_fevals: int, searc
 
     # measure start point score
     best_score = _cost_func(base_sol, kernel_options, tuning_options, runner, all_results, check_restrictions=False)
+    if surrogate is not None:
+        surrogate.add_observation(base_sol, best_score)
 
     found_improved = True
     while found_improved:
@@ -78,34 +87,108 @@ def base_hillclimb(base_sol: tuple, neighbor_method: str, max_fevals: int, searc
             random.shuffle(indices)
 
         # in each dimension see the possible values
-        for index in indices:
-            neighbors = searchspace.get_param_neighbors(tuple(child), index, neighbor_method, randomize)
-
-            # for each value in this dimension
-            for val in neighbors:
-                orig_val = child[index]
-                child[index] = val
-
-                # get score for this position
-                score = _cost_func(child, kernel_options, tuning_options, runner, current_results, check_restrictions=False)
-
-                # generalize this to other tuning objectives
-                if score < best_score:
-                    best_score = score
-                    base_sol = child[:]
-                    found_improved = True
-                    if restart:
-                        break
-                else:
-                    child[index] = orig_val
-
-                fevals = len(tuning_options.unique_results)
-                if fevals >= max_fevals:
-                    all_results += current_results
-                    return base_sol
-            if found_improved and restart:
-                break
+        moves = ((index, val) for index in indices for val in searchspace.get_param_neighbors(tuple(child), index, neighbor_method, randomize))
+        if surrogate is not None:
+            # rank the neighbors in all dimensions at once, such that the most promising neighbor is evaluated first
+            moves = list(moves)
+            ranking = surrogate.rank(list(child[:index] + [val] + child[index + 1:] for index, val in moves))
+            moves = list(moves[i] for i in ranking)
+
+        for index, val in moves:
+            orig_val = child[index]
+            child[index] = val
+
+            # with a surrogate, observed configurations are not evaluated again, and after a move
+            # the ranked neighbors of the previous position may no longer be valid
+            if surrogate is not None and (surrogate.is_observed(child) or not searchspace.is_param_config_valid(tuple(child))):
+                child[index] = orig_val
+                continue
+
+            # get score for this position
+            score = _cost_func(child, kernel_options, tuning_options, runner, current_results, check_restrictions=False)
+            if surrogate is not None:
+                surrogate.add_observation(child, score)
+
+            # generalize this to other tuning objectives
+            if score < best_score:
+                best_score = score
+                base_sol = child[:]
+                found_improved = True
+                if restart:
+                    break
+            else:
+                child[index] = orig_val
+
+            fevals = len(tuning_options.unique_results)
+            if fevals >= max_fevals:
+                all_results += current_results
+                return base_sol
 
         # append current_results to all_results
         all_results += current_results
     return base_sol
+
+
+class NeighborSurrogate():
+    """ Cheap model of the observations made so far, that ranks the neighbors a hillclimber evaluates
+
+    The model is fit to the ranks of the observed values on the normalized parameter values, such that
+    failed configurations and the optimization direction need no special treatment. The knn method predicts
+    the inverse distance weighted mean of the k nearest observations, the linear method fits a least squares
+    model with a linear and a quadratic term per parameter. With too few observations, the order is kept.
+    """
+
+    def __init__(self, searchspace: Searchspace, method="knn", k=5):
+        if method not in ["knn", "linear"]:
+            raise ValueError(f"Unknown surrogate {method}, choose from knn or linear")
+        self.searchspace = searchspace
+        self.method = method
+        self.k = k
+        self.num_values = np.array(list(len(param_values) for param_values in searchspace.params_values))
+        self.rows = dict()
+        self.X = []
+        self.y = []
+
+    def normalize(self, param_configs) -> np.ndarray:
+        """ Map parameter configurations, which need not be valid, to the normalized space of the searchspace """
+        indices = np.array(list(self.searchspace.get_param_indices(tuple(param_config)) for param_config in param_configs), dtype=float)
+        return (indices.reshape(-1, len(self.num_values)) + 0.5) / self.num_values
+
+    def add_observation(self, param_config, value: float):
+        """ Register the value of a parameter configuration, replacing an earlier value of the same configuration """
+        key = tuple(param_config)
+        if key not in self.rows:
+            self.rows[key] = len(self.y)
+            self.X.append(self.normalize([key])[0])
+            self.y.append(value)
+        else:
+            self.y[self.rows[key]] = value
+
+    def is_observed(self, param_config) -> bool:
+        """ Check whether a parameter configuration was observed """
+        return tuple(param_config) in self.rows
+
+    def predict(self, param_configs) -> np.ndarray:
+        """ Predict the rank of parameter configurations among the observations, lower is better """
+        X = self.normalize(param_configs)
+        min_observations = self.k if self.method == "knn" else 2 * len(self.num_values) + 1
+        if len(self.y) < max(min_observations, 2):
+            return np.zeros(len(X))
+        X_obs = np.array(self.X)
+        y_obs = (rankdata(self.y) - 1) / (len(self.y) - 1)
+
+        if self.method == "knn":
+            distances = np.sqrt(np.sum((X[:, None, :] - X_obs[None, :, :])**2, axis=2))
+            nearest = np.argpartition(distances, self.k - 1, axis=1)[:, :self.k]
+            weights = 1 / (np.take_along_axis(distances, nearest, axis=1) + 1e-9)
+            return np.sum(weights * y_obs[nearest], axis=1) / np.sum(weights, axis=1)
+
+        # a small ridge term keeps the least squares problem well-posed for repeated parameter values
+        features = lambda X: np.hstack((np.ones((len(X), 1)), X, X**2))
+        F = features(X_obs)
+        coefficients = np.linalg.solve(F.T @ F + 1e-6 * np.eye(F.shape[1]), F.T @ y_obs)
+        return features(X) @ coefficients
+
+    def rank(self, param_configs) -> np.ndarray:
+        """ Get the order in which to evaluate parameter configurations, keeping the given order for ties """
+        return np.argsort(self.predict(param_configs), kind="stable")
@@ -0,0 +1,87 @@
+""" An island model genetic algorithm, in which sub-populations evolve independently and exchange their best individuals """
+from collections import OrderedDict
+
+import numpy as np
+from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common
+from kernel_tuner.strategies.genetic_algorithm import create_offspring, supported_methods
+
+_options = OrderedDict(
+    popsize=("population size of each island", 20),
+    islands=("number of islands", 4),
+    maxiter=("maximum number of generations", 100),
+    method=("crossover method to use, choose any from single_point, two_point, uniform, disruptive_uniform", "uniform"),
+    mutation_chance=("chance to mutate is 1 in mutation_chance", 10),
+    migration_interval=("number of generations between migrations", 5),
+    migrants=("number of best individuals that migrate to the next island", 2),
+)
+
+
+def tune(runner, kernel_options, device_options, tuning_options):
+
+    options = tuning_options.strategy_options
+    pop_size, num_islands, generations, method, mutation_chance, migration_interval, num_migrants = common.get_options(options, _options)
+    crossover = supported_methods[method]
+
+    tuning_options["scaling"] = False
+
+    results = []
+
+    # start all islands from different random configurations
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    num_islands = max(1, min(num_islands, searchspace.size))
+    pop_size = max(1, min(pop_size, searchspace.size // num_islands))
+    num_migrants = min(num_migrants, pop_size - 1)
+    islands = np.split(searchspace.get_random_sample_indices(num_islands * pop_size), num_islands)
+    scores = dict()
+
+    # like genetic_algorithm, the number of generations limits the search if max_fevals is not given
+    max_fevals = options.get("max_fevals", searchspace.size)
+
+    try:
+        for generation in range(generations):
+
+            # each island submits the configurations of its generation that were not evaluated before as a single batch
+            for island in islands:
+                util.check_stop_criterion(tuning_options)
+                batch = list(index for index in island.tolist() if index not in scores)
+                batch = batch[:max(0, max_fevals - len(tuning_options.unique_results))]
+                if batch:
+                    values = common._cost_func_batch(searchspace.get_param_configs_at_indices(batch), kernel_options, tuning_options, runner, results)
+                    scores.update(zip(batch, values))
+
+            # islands are sorted such that better configs have higher chance of reproducing
+            islands = list(sort_by_score(island, scores) for island in islands)
+
+            if tuning_options.verbose:
+                print("Generation %d, best_score per island %s" % (generation, list(scores[island[0]] for island in islands)))
+
+            if num_islands > 1 and num_migrants > 0 and (generation + 1) % migration_interval == 0:
+                islands = migrate(islands, num_migrants, scores)
+
+            islands = list(create_offspring(island, pop_size, crossover, mutation_chance, searchspace) for island in islands)
+
+    except util.StopCriterionReached as e:
+        if tuning_options.verbose:
+            print(e)
+
+    return results, runner.dev.get_environment()
+
+
+tune.__doc__ = common.get_strategy_docstring("Island Genetic Algorithm", _options)
+
+
+def sort_by_score(island, scores):
+    """Sort the searchspace indices of an island from best to worst, configurations without a score are the worst"""
+    return island[np.argsort(list(scores.get(index, np.inf) for index in island.tolist()), kind="stable")]
+
+
+def migrate(islands, num_migrants, scores):
+    """Replace the worst individuals of each island with the best individuals of the previous island in a ring of sorted islands"""
+    migrated = []
+    for i, island in enumerate(islands):
+        migrants = islands[i - 1][:num_migrants]
+        residents = island[~np.isin(island, migrants)][:len(island) - len(migrants)]
+        migrated.append(sort_by_score(np.concatenate((residents, migrants)), scores))
+    return migrated
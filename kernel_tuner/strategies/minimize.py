@@ -7,34 +7,40 @@ from time import perf_counter
 import numpy as np
 import scipy.optimize
 from kernel_tuner import util
-from kernel_tuner.strategies.common import (_cost_func, get_bounds_x0_eps,
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies.common import (MemoizedCostFunc, get_bounds_x0_eps,
                                             get_options,
                                             get_strategy_docstring,
+                                            repeats_option,
                                             setup_method_arguments,
                                             setup_method_options)
 
 supported_methods = ["Nelder-Mead", "Powell", "CG", "BFGS", "L-BFGS-B", "TNC", "COBYLA", "SLSQP"]
 
-_options = OrderedDict(method=(f"Local optimization algorithm to use, choose any from {supported_methods}", "L-BFGS-B"))
+_options = OrderedDict(method=(f"Local optimization algorithm to use, choose any from {supported_methods}", "L-BFGS-B"),
+                       repeats=repeats_option)
 
 def tune(runner, kernel_options, device_options, tuning_options):
 
     results = []
 
-    method = get_options(tuning_options.strategy_options, _options)[0]
+    method, repeats = get_options(tuning_options.strategy_options, _options)
 
     # scale variables in x to make 'eps' relevant for multiple variables
     tuning_options["scaling"] = True
 
-    bounds, x0, _ = get_bounds_x0_eps(tuning_options, runner.dev.max_threads)
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    bounds, x0, _ = get_bounds_x0_eps(tuning_options, runner.dev.max_threads, searchspace)
     kwargs = setup_method_arguments(method, bounds)
     options = setup_method_options(method, tuning_options)
 
     args = (kernel_options, tuning_options, runner, results)
 
+    cost_func = MemoizedCostFunc(searchspace, repeats)
+
     opt_result = None
     try:
-        opt_result = scipy.optimize.minimize(_cost_func, x0, args=args, method=method, options=options, **kwargs)
+        opt_result = scipy.optimize.minimize(cost_func, x0, args=args, method=method, options=options, **kwargs)
     except util.StopCriterionReached as e:
         if tuning_options.verbose:
             print(e)
@@ -42,6 +48,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
     if opt_result and tuning_options.verbose:
         print(opt_result.message)
 
+    cost_func.report(tuning_options)
     return results, runner.dev.get_environment()
 
 
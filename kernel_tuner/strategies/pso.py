@@ -7,14 +7,15 @@ import numpy as np
 from kernel_tuner import util
 from kernel_tuner.searchspace import Searchspace
 from kernel_tuner.strategies import common
-from kernel_tuner.strategies.common import (_cost_func, get_bounds_x0_eps,
+from kernel_tuner.strategies.common import (MemoizedCostFunc, get_bounds_x0_eps,
                                             scale_from_params)
 
 _options = OrderedDict(popsize=("Population size", 20),
                        maxiter=("Maximum number of iterations", 100),
                        w=("Inertia weight constant", 0.5),
                        c1=("Cognitive constant", 2.0),
-                       c2=("Social constant", 1.0))
+                       c2=("Social constant", 1.0),
+                       repeats=common.repeats_option)
 
 def tune(runner, kernel_options, device_options, tuning_options):
 
@@ -23,12 +24,14 @@ def tune(runner, kernel_options, device_options, tuning_options):
     #scale variables in x because PSO works with velocities to visit different configurations
     tuning_options["scaling"] = True
 
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+
     #using this instead of get_bounds because scaling is used
-    bounds, _, eps = get_bounds_x0_eps(tuning_options, runner.dev.max_threads)
+    bounds, _, eps = get_bounds_x0_eps(tuning_options, runner.dev.max_threads, searchspace)
 
     args = (kernel_options, tuning_options, runner, results)
 
-    num_particles, maxiter, w, c1, c2 = common.get_options(tuning_options.strategy_options, _options)
+    num_particles, maxiter, w, c1, c2, repeats = common.get_options(tuning_options.strategy_options, _options)
 
     best_score_global = sys.float_info.max
     best_position_global = []
@@ -39,11 +42,12 @@ def tune(runner, kernel_options, device_options, tuning_options):
         swarm.append(Particle(bounds, args))
 
     # ensure particles start from legal points
-    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
     population = list(list(p) for p in searchspace.get_random_sample(num_particles))
     for i, particle in enumerate(swarm):
         particle.position = scale_from_params(population[i], tuning_options.tune_params, eps)
 
+    cost_func = MemoizedCostFunc(searchspace, repeats)
+
     # start optimization
     for i in range(maxiter):
         if tuning_options.verbose:
@@ -52,10 +56,11 @@ def tune(runner, kernel_options, device_options, tuning_options):
         # evaluate particle positions
         for j in range(num_particles):
             try:
-                swarm[j].evaluate(_cost_func)
+                swarm[j].evaluate(cost_func)
             except util.StopCriterionReached as e:
                 if tuning_options.verbose:
                     print(e)
+                cost_func.report(tuning_options)
                 return results, runner.dev.get_environment()
 
             # update global best if needed
@@ -73,6 +78,7 @@ def tune(runner, kernel_options, device_options, tuning_options):
         print(best_position_global)
         print(best_score_global)
 
+    cost_func.report(tuning_options)
     return results, runner.dev.get_environment()
 
 
@@ -0,0 +1,182 @@
+""" Sequential model-based optimization with a random forest surrogate, modeled on SMAC (Hutter, 2011) """
+from collections import OrderedDict
+
+import numpy as np
+from scipy.special import ndtr
+
+from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common
+from kernel_tuner.strategies.common import _cost_func
+
+try:
+    from sklearn.ensemble import RandomForestRegressor
+    sklearn_present = True
+except ImportError:
+    sklearn_present = False
+
+_options = OrderedDict(popsize=("Number of initial random samples", 20),
+                       trees=("Number of trees in the random forest", 10),
+                       batchsize=("Number of configurations evaluated after each fit of the random forest", 1),
+                       localsearches=("Number of best configurations from which a local search maximizes the expected improvement", 10),
+                       randomcandidates=("Number of random unvisited configurations scored by the expected improvement", 500),
+                       randomfraction=("Fraction of the configurations that are drawn at random instead of maximizing the expected improvement", 0.1),
+                       neighbor=("Method for selecting neighboring configurations in the local search, choose from Hamming, adjacent or strictly-adjacent", "Hamming"))
+
+
+def tune(runner, kernel_options, device_options, tuning_options):
+
+    if not sklearn_present:
+        raise ImportError("Error: optional dependency for the random forest surrogate not installed, please install scikit-learn")
+
+    options = tuning_options.strategy_options
+    popsize, trees, batchsize, localsearches, randomcandidates, randomfraction, neighbor = common.get_options(options, _options)
+    max_fevals = options.get("max_fevals", 100)
+
+    tuning_options["scaling"] = False
+
+    # limit max_fevals to max size of the parameter space
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads, neighbor_method=neighbor)
+    max_fevals = min(searchspace.size, max_fevals)
+
+    results = []
+    optimizer = RandomForestOptimization(searchspace, trees, localsearches, randomcandidates)
+
+    def evaluate(index):
+        value = _cost_func(searchspace.list[index], kernel_options, tuning_options, runner, results, check_restrictions=False)
+        # configurations that failed to compile or run are imputed by the optimizer
+        if isinstance(results[-1][tuning_options.objective], util.ErrorConfig):
+            value = np.nan
+        optimizer.add_observation(index, value)
+
+    try:
+        for index in searchspace.get_random_sample_indices(min(popsize, max_fevals)):
+            evaluate(index)
+
+        while optimizer.num_observations < max_fevals:
+            batch = optimizer.propose(min(batchsize, max_fevals - optimizer.num_observations), randomfraction)
+            for index in batch:
+                evaluate(index)
+
+    except util.StopCriterionReached as e:
+        if tuning_options.verbose:
+            print(e)
+
+    return results, runner.dev.get_environment()
+
+
+tune.__doc__ = common.get_strategy_docstring("Random forest sequential model-based optimization (SMAC)", _options)
+
+
+class RandomForestSurrogate():
+    """ Random forest regressor that predicts the mean and the standard deviation of the predictions of its trees
+
+    The hyperparameters follow those of the random forest in SMAC. Fitting the forest takes
+    O(n log n) time in the number of observations, instead of O(n^3) for a Gaussian process.
+    """
+
+    def __init__(self, trees=10):
+        self.forest = RandomForestRegressor(n_estimators=trees, max_features=5 / 6, min_samples_split=3, min_samples_leaf=3, bootstrap=True,
+                                            random_state=np.random.randint(2**31))
+
+    def fit(self, X, y):
+        """ Fit the forest to all observations at once """
+        self.forest.fit(X, y)
+        return self
+
+    def predict(self, X):
+        """ Predict the mean and standard deviation of all configurations in X at once """
+        # the trees predict without input validation, which dominates the time of the forest's predict for small inputs
+        X = np.asarray(X, dtype=np.float32, order="C")
+        predictions = np.stack(list(tree.predict(X, check_input=False) for tree in self.forest.estimators_))
+        return np.mean(predictions, axis=0), np.std(predictions, axis=0)
+
+
+class RandomForestOptimization():
+    """ Proposes configurations that maximize the expected improvement predicted by a random forest
+
+    The random forest is fit on the indices of the parameter values of the configurations in the
+    searchspace. The expected improvement is maximized by local searches over the neighbors in the
+    searchspace, starting from the best observed configurations, and by scoring a random sample of
+    unvisited configurations. Configurations that failed to compile or run are imputed with the
+    worst valid observation.
+    """
+
+    def __init__(self, searchspace: Searchspace, trees=10, localsearches=10, randomcandidates=500):
+        self.searchspace = searchspace
+        self.trees = trees
+        self.localsearches = localsearches
+        self.randomcandidates = randomcandidates
+        self.X = searchspace.get_params_values_indices()
+        self.visited = np.zeros(searchspace.size, dtype=bool)
+        self.observed = list()
+        self.observations = list()
+        self.surrogate = None
+        self.best = None
+
+    @property
+    def num_observations(self) -> int:
+        return len(self.observed)
+
+    def add_observation(self, index: int, value: float):
+        """ Register the observed value of the configuration at an index of the searchspace, NaN if the configuration failed """
+        self.visited[index] = True
+        self.observed.append(index)
+        self.observations.append(value)
+
+    def fit(self) -> bool:
+        """ Fit the surrogate model to all observations, returns False if there are too few valid observations """
+        y = np.array(self.observations, dtype=np.float64)
+        valid = ~np.isnan(y)
+        if np.count_nonzero(valid) < 2:
+            return False
+        y[~valid] = np.max(y[valid])
+        self.surrogate = RandomForestSurrogate(self.trees).fit(self.X[self.observed], y)
+        self.best = np.min(y)
+        return True
+
+    def expected_improvement(self, indices: np.ndarray) -> np.ndarray:
+        """ Compute the expected improvement of the configurations at the indices over the best observation """
+        mu, std = self.surrogate.predict(self.X[indices])
+        std = np.maximum(std, 1e-9)
+        z = (self.best - mu) / std
+        return (self.best - mu) * ndtr(z) + std * np.exp(-0.5 * z**2) / np.sqrt(2 * np.pi)
+
+    def local_search(self, start: int) -> list:
+        """ Hill climb on the expected improvement from a configuration, returns the indices of the unvisited neighbors that were scored """
+        scored = list()
+        current, current_ei = start, self.expected_improvement([start])[0]
+        while True:
+            neighbors = np.asarray(self.searchspace.get_neighbors_indices(self.searchspace.list[current]), dtype=int)
+            if len(neighbors) == 0:
+                break
+            scored.append(neighbors[~self.visited[neighbors]])
+            ei = self.expected_improvement(neighbors)
+            best = np.argmax(ei)
+            if not ei[best] > current_ei:
+                break
+            current, current_ei = neighbors[best], ei[best]
+        return scored
+
+    def propose(self, num: int, randomfraction: float) -> np.ndarray:
+        """ Propose the indices of num unvisited configurations to evaluate """
+        unvisited = np.flatnonzero(~self.visited)
+        num = min(num, len(unvisited))
+        if not self.fit():
+            return np.random.choice(unvisited, num, replace=False)
+
+        # score a random sample and the neighbors visited by the local searches from the best observations
+        candidates = [np.random.choice(unvisited, min(self.randomcandidates, len(unvisited)), replace=False)]
+        order = np.argsort(np.nan_to_num(self.observations, nan=np.inf), kind="stable")
+        for start in np.array(self.observed)[order[:self.localsearches]]:
+            candidates += self.local_search(start)
+        candidates = np.unique(np.concatenate(candidates))
+        proposed = list(candidates[np.argsort(-self.expected_improvement(candidates), kind="stable")[:num]])
+
+        # interleave random configurations to guarantee exploration of the entire searchspace
+        for i in range(len(proposed)):
+            if np.random.random() < randomfraction:
+                remaining = np.setdiff1d(unvisited, proposed)
+                if len(remaining) > 0:
+                    proposed[i] = np.random.choice(remaining)
+        return np.array(proposed, dtype=int)
@@ -0,0 +1,153 @@
+""" Successive halving strategy that evaluates many configurations at cheaper fidelities and promotes the best to the next fidelity """
+import os
+import warnings
+from collections import OrderedDict
+from time import perf_counter
+
+import numpy as np
+from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common
+
+_options = OrderedDict(
+    fidelities=("list of cheaper fidelities from cheapest to most expensive, each a dict with a problem_size and/or a number of iterations, "
+                "the problem_size and iterations of the tuning run are the final fidelity", [dict(iterations=1)]),
+    eta=("only the best 1/eta of the configurations are promoted to the next fidelity", 3),
+    popsize=("number of configurations evaluated at the cheapest fidelity in each round", 27),
+)
+
+
+def tune(runner, kernel_options, device_options, tuning_options):
+
+    options = tuning_options.strategy_options
+    fidelities, eta, pop_size = common.get_options(options, _options)
+    max_fevals = options.get("max_fevals", 100)
+    if eta <= 1:
+        raise ValueError("eta should be larger than one")
+
+    tuning_options["scaling"] = False
+
+    # limit max_fevals to max size of the parameter space
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    max_fevals = min(searchspace.size, max_fevals)
+
+    # the cheaper fidelities have their own results and caches, only the final fidelity is stored in the results and the cache
+    fidelities = list(Fidelity(fidelity, kernel_options, tuning_options, runner) for fidelity in fidelities if can_evaluate(fidelity, tuning_options, runner))
+    sampled = np.zeros(searchspace.size, dtype=bool)
+    results = []
+
+    try:
+        while len(tuning_options.unique_results) < max_fevals and not np.all(sampled):
+            batch = np.random.choice(np.flatnonzero(~sampled), min(pop_size, np.count_nonzero(~sampled)), replace=False)
+            sampled[batch] = True
+
+            # evaluate the batch at each cheaper fidelity, and promote the best configurations to the next
+            for fidelity in fidelities:
+                util.check_stop_criterion(tuning_options)
+                values = np.array(fidelity.evaluate(searchspace.get_param_configs_at_indices(batch), runner, tuning_options))
+                num_promoted = min(int(np.ceil(len(batch) / eta)), np.count_nonzero(np.isfinite(values)))
+                batch = batch[np.argsort(values, kind="stable")[:num_promoted]]
+
+            batch = batch[:max_fevals - len(tuning_options.unique_results)]
+            if len(batch) > 0:
+                common._cost_func_batch(searchspace.get_param_configs_at_indices(batch), kernel_options, tuning_options, runner, results)
+
+            if tuning_options.verbose:
+                print(f"evaluated {len(results)} configurations, {list(len(fidelity.results) for fidelity in fidelities)} at the cheaper fidelities")
+
+    except util.StopCriterionReached as e:
+        if tuning_options.verbose:
+            print(e)
+
+    for fidelity in fidelities:
+        fidelity.close()
+
+    return results, runner.dev.get_environment()
+
+
+tune.__doc__ = common.get_strategy_docstring("Successive halving", _options)
+
+
+class Fidelity():
+    """ A cheaper fidelity of the benchmarks, with a smaller problem_size and/or fewer iterations
+
+    The outputs of a smaller problem_size cannot be verified against the answer, so verification is
+    skipped, and racing is disabled because it compares against the best configuration at the final
+    fidelity. Each fidelity has its own cache, such that the cache of the final fidelity stays consistent.
+    If the tuning run uses a cachefile, the results of the fidelity are stored in a cachefile of its own,
+    with a name derived from the cachefile and the fidelity. In simulation mode, fidelities without a cachefile are skipped.
+    """
+
+    def __init__(self, fidelity: dict, kernel_options, tuning_options, runner):
+        unknown = set(fidelity.keys()) - {"problem_size", "iterations"}
+        if unknown:
+            raise ValueError(f"Unknown keys {sorted(unknown)} in fidelity, choose from problem_size and iterations")
+        self.iterations = fidelity.get("iterations", None)
+        if self.iterations is not None and self.iterations < 1:
+            raise ValueError("Iterations should be at least one!")
+
+        self.kernel_options = kernel_options.copy()
+        self.kernel_options["problem_size"] = fidelity.get("problem_size", kernel_options.problem_size)
+        self.tuning_options = tuning_options.copy()
+        self.tuning_options["answer"] = None
+        self.tuning_options["verify"] = None
+        self.tuning_options["racing"] = None
+        self.tuning_options.cache = {}
+        self.tuning_options.cachefile = None
+        if tuning_options.cachefile:
+            util.process_cache(get_fidelity_cachefile(tuning_options.cachefile, fidelity), self.kernel_options, self.tuning_options, runner)
+        self.results = []
+
+    def evaluate(self, param_configs, runner, tuning_options):
+        """ Benchmark a batch of configurations at this fidelity, returns the values to minimize, infinite for failed configurations """
+        runner.last_strategy_time = 1000 * (perf_counter() - runner.last_strategy_start_time)
+        self.tuning_options.simulated_time = tuning_options.simulated_time
+
+        # the number of iterations is kept by the device, or by the runner if it has no device that benchmarks
+        owner = runner.dev if hasattr(runner.dev, "iterations") else runner
+        iterations = getattr(owner, "iterations", None)
+        if self.iterations is not None and iterations is not None:
+            owner.iterations = self.iterations
+        try:
+            res, _ = runner.run(param_configs, self.kernel_options, self.tuning_options)
+        finally:
+            if iterations is not None:
+                owner.iterations = iterations
+
+        tuning_options.simulated_time = self.tuning_options.simulated_time
+        self.results += res
+
+        values = []
+        for result in res:
+            value = result[tuning_options.objective]
+            if isinstance(value, util.ErrorConfig):
+                values.append(np.inf)
+            else:
+                values.append(value if not tuning_options.objective_higher_is_better else -value)
+
+        runner.last_strategy_start_time = perf_counter()
+        return values
+
+    def close(self):
+        """ Close the cachefile of this fidelity, if any """
+        if self.tuning_options.cachefile:
+            util.close_cache(self.tuning_options.cachefile)
+
+
+def can_evaluate(fidelity, tuning_options, runner):
+    """ Check whether a fidelity can be evaluated, in simulation mode only fidelities with an existing cachefile can be """
+    if not runner.simulation_mode:
+        return True
+    if tuning_options.cachefile and os.path.isfile(get_fidelity_cachefile(tuning_options.cachefile, fidelity)):
+        return True
+    warnings.warn(f"Skipping fidelity {fidelity} in simulation mode, because there is no cachefile with its results", UserWarning)
+    return False
+
+
+def get_fidelity_cachefile(cachefile, fidelity):
+    """ Get the name of the cachefile of a fidelity, for example cache_problem_size_1024_iterations_3.json for cache.json """
+    base, extension = os.path.splitext(cachefile)
+    for key in ["problem_size", "iterations"]:
+        if key in fidelity:
+            base += f"_{key}_" + "x".join(str(value) for value in np.atleast_1d(fidelity[key]))
+    return base + extension
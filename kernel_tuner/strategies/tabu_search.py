@@ -0,0 +1,150 @@
+""" Tabu search strategy that moves to the best neighbor that is not tabu, with aspiration criteria that allow tabu moves """
+from collections import OrderedDict, deque
+
+import numpy as np
+from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common
+
+_options = OrderedDict(neighbor=("Method for selecting neighboring configurations, choose from Hamming, adjacent or strictly-adjacent", "Hamming"),
+                       tenure=("Number of moves during which a visited configuration is tabu", 10),
+                       candidates=("Maximum number of unevaluated neighbors that are evaluated in each move", 4),
+                       maxstall=("Number of moves without improvement after which the search restarts from a random configuration", 10))
+
+
+def tune(runner, kernel_options, device_options, tuning_options):
+
+    options = tuning_options.strategy_options
+    neighbor, tenure, num_candidates, maxstall = common.get_options(options, _options)
+    max_fevals = options.get("max_fevals", 100)
+
+    tuning_options["scaling"] = False
+
+    # limit max_fevals to max size of the parameter space
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads, neighbor_method=neighbor)
+    max_fevals = min(searchspace.size, max_fevals)
+
+    results = []
+    tabu = TabuSearch(searchspace, tenure, maxstall)
+
+    def evaluate(indices):
+        """ Evaluate the configurations at the indices as a single batch """
+        indices = indices[:max_fevals - len(tuning_options.unique_results)]
+        if len(indices) == 0:
+            return
+        values = common._cost_func_batch(searchspace.get_param_configs_at_indices(indices), kernel_options, tuning_options, runner, results)
+        for index, value, result in zip(indices, values, results[-len(indices):]):
+            # configurations that failed to compile or run are never moved to
+            tabu.add_observation(index, np.inf if isinstance(result[tuning_options.objective], util.ErrorConfig) else value)
+
+    try:
+        while len(tuning_options.unique_results) < max_fevals:
+            util.check_stop_criterion(tuning_options)
+            if tabu.current is None:
+                start = tabu.random_unevaluated()
+                evaluate([start])
+                tabu.restart(start)
+                continue
+
+            # evaluate a selection of the unevaluated neighbors at once, then move
+            evaluate(list(tabu.candidates(num_candidates)))
+            tabu.move()
+
+    except util.StopCriterionReached as e:
+        if tuning_options.verbose:
+            print(e)
+
+    return results, runner.dev.get_environment()
+
+
+tune.__doc__ = common.get_strategy_docstring("Tabu search", _options)
+
+
+class TabuSearch():
+    """ Keeps the state of a tabu search on the indices of the searchspace
+
+    The tabu list is a set of searchspace indices, of which the oldest expires after tenure moves, and
+    it is kept when the search restarts. Moves go to the best evaluated neighbor that is not tabu. A tabu
+    neighbor is allowed if it is better than the best configuration visited since the last restart (aspiration
+    by objective), and if all evaluated neighbors are tabu, the one that became tabu first is allowed
+    (aspiration by default). When all neighbors failed, or when maxstall moves did not improve on the best
+    configuration since the last restart, the search restarts from a random unevaluated configuration.
+    """
+
+    def __init__(self, searchspace: Searchspace, tenure=10, maxstall=10):
+        self.searchspace = searchspace
+        self.tenure = tenure
+        self.maxstall = maxstall
+        self.values = np.full(searchspace.size, np.inf)
+        self.evaluated = np.zeros(searchspace.size, dtype=bool)
+        self.tabu = set()
+        self.tabu_order = deque()
+        self.current = None
+        self.search_best = np.inf
+        self.stalled = 0
+
+    def add_observation(self, index: int, value: float):
+        """ Register the value of the configuration at an index, infinite if the configuration failed """
+        self.evaluated[index] = True
+        self.values[index] = value
+
+    def random_unevaluated(self) -> int:
+        """ Draw a random configuration that has not been evaluated """
+        return np.random.choice(np.flatnonzero(~self.evaluated))
+
+    def restart(self, index: int):
+        """ Continue the search from the configuration at an index """
+        self.current = index
+        self.search_best = self.values[index]
+        self.stalled = 0
+        self.make_tabu(index)
+
+    def make_tabu(self, index: int):
+        """ Add the configuration at an index to the tabu list, and expire the oldest one if the list is full """
+        if index in self.tabu:
+            self.tabu_order.remove(index)
+        self.tabu.add(index)
+        self.tabu_order.append(index)
+        while len(self.tabu_order) > self.tenure:
+            self.tabu.discard(self.tabu_order.popleft())
+
+    def neighbors(self) -> np.ndarray:
+        """ Get the indices of all neighbors of the current configuration """
+        return np.asarray(self.searchspace.get_neighbors_indices(self.searchspace.list[self.current]), dtype=int)
+
+    def unevaluated_neighbors(self) -> np.ndarray:
+        """ Get the indices of the neighbors of the current configuration that have not been evaluated """
+        neighbors = self.neighbors()
+        return neighbors[~self.evaluated[neighbors]]
+
+    def candidates(self, num: int) -> np.ndarray:
+        """ Draw up to num unevaluated neighbors of the current configuration, such that each parameter is changed equally often """
+        unevaluated = self.unevaluated_neighbors()
+        if len(unevaluated) <= num:
+            return unevaluated
+        # weigh each neighbor by the parameters it changes, divided by the number of neighbors that change them
+        X = self.searchspace.get_params_values_indices()
+        changed = X[unevaluated] != X[self.current]
+        weights = changed @ (1 / np.maximum(np.count_nonzero(changed, axis=0), 1))
+        return np.random.choice(unevaluated, num, replace=False, p=weights / np.sum(weights))
+
+    def move(self):
+        """ Move to the best allowed neighbor of the current configuration, or stop the current search """
+        neighbors = self.neighbors()
+        values = self.values[neighbors]
+        is_tabu = np.fromiter((index in self.tabu for index in neighbors.tolist()), dtype=bool, count=len(neighbors))
+        finite = np.isfinite(values)
+        allowed = finite & (~is_tabu | (values < self.search_best))
+
+        # the best neighbor counts as an improvement, such that the stall counter includes the evaluations of this move
+        improved = np.any(finite) and np.min(values[finite]) < self.search_best
+        self.stalled = 0 if improved else self.stalled + 1
+        if not np.any(finite) or self.stalled > self.maxstall:
+            self.current = None
+            return
+        if np.any(allowed):
+            self.current = neighbors[allowed][np.argmin(values[allowed])]
+        else:
+            self.current = min(neighbors[finite].tolist(), key=self.tabu_order.index)
+        self.search_best = min(self.search_best, self.values[self.current])
+        self.make_tabu(self.current)
@@ -0,0 +1,136 @@
+""" Tree-structured Parzen Estimator (TPE) strategy (Bergstra, 2011) with a categorical density for each parameter """
+from collections import OrderedDict
+
+import numpy as np
+
+from kernel_tuner import util
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common
+
+_options = OrderedDict(popsize=("Number of initial random samples", 20),
+                       gamma=("Fraction of the observations that form the good set", 0.25),
+                       candidates=("Number of candidates sampled from the densities of the good set for each proposal", 64),
+                       batchsize=("Number of configurations proposed and evaluated at once, such that runners can evaluate them in parallel", 1),
+                       priorweight=("Weight of the uniform prior that is added to the densities of each parameter", 1.0))
+
+
+def tune(runner, kernel_options, device_options, tuning_options):
+
+    options = tuning_options.strategy_options
+    popsize, gamma, num_candidates, batchsize, prior_weight = common.get_options(options, _options)
+    max_fevals = options.get("max_fevals", 100)
+
+    tuning_options["scaling"] = False
+
+    # limit max_fevals to max size of the parameter space
+    searchspace = Searchspace(tuning_options, runner.dev.max_threads)
+    max_fevals = min(searchspace.size, max_fevals)
+
+    results = []
+    tpe = TreeParzenEstimator(searchspace, gamma, prior_weight)
+
+    try:
+        while tpe.num_observations < max_fevals:
+            util.check_stop_criterion(tuning_options)
+
+            # the initial random sample is evaluated at once, after which batches are proposed using the densities
+            if tpe.num_observations < popsize:
+                batch = tpe.random_sample(min(popsize, max_fevals) - tpe.num_observations)
+            else:
+                batch = tpe.propose(min(batchsize, max_fevals - tpe.num_observations), num_candidates)
+
+            values = common._cost_func_batch(batch, kernel_options, tuning_options, runner, results)
+            for param_config, value, result in zip(batch, values, results[-len(batch):]):
+                # configurations that failed to compile or run are added to the bad set
+                failed = isinstance(result[tuning_options.objective], util.ErrorConfig)
+                tpe.add_observation(param_config, np.nan if failed else value)
+
+    except util.StopCriterionReached as e:
+        if tuning_options.verbose:
+            print(e)
+
+    return results, runner.dev.get_environment()
+
+
+tune.__doc__ = common.get_strategy_docstring("Tree-structured Parzen Estimator (TPE)", _options)
+
+
+class TreeParzenEstimator():
+    """ Proposes configurations that maximize the ratio of the densities of the good and the bad observations
+
+    The observations are split in a good set with the best gamma fraction of the observations and a
+    bad set with the others. For each parameter, a categorical density over the values of the parameter is
+    estimated for both sets. Candidates are sampled from the densities of the good set, and the valid and
+    unvisited candidates with the largest ratio between the densities of the good and the bad set are proposed.
+    """
+
+    def __init__(self, searchspace: Searchspace, gamma=0.25, prior_weight=1.0):
+        self.searchspace = searchspace
+        self.gamma = gamma
+        self.prior_weight = prior_weight
+        self.params_values = searchspace.params_values
+        self.value_indices = list(dict((value, index) for index, value in reversed(list(enumerate(values)))) for values in self.params_values)
+        self.visited = set()
+        self.observed = list()
+        self.observations = list()
+
+    @property
+    def num_observations(self) -> int:
+        return len(self.observed)
+
+    def add_observation(self, param_config: tuple, value: float):
+        """ Register the observed value of a parameter configuration, NaN if the configuration failed """
+        self.visited.add(param_config)
+        self.observed.append(tuple(value_indices[v] for value_indices, v in zip(self.value_indices, param_config)))
+        self.observations.append(value)
+
+    def random_sample(self, num: int, exclude=()) -> list:
+        """ Draw num random unvisited parameter configurations from the searchspace """
+        sample = list()
+        for index in np.random.permutation(self.searchspace.size):
+            param_config = self.searchspace.list[index]
+            if param_config not in self.visited and param_config not in exclude:
+                sample.append(param_config)
+                if len(sample) == num:
+                    break
+        return sample
+
+    def densities(self):
+        """ Returns the categorical density of each parameter for the good and the bad set of observations """
+        X = np.array(self.observed, dtype=int).reshape(self.num_observations, len(self.params_values))
+        y = np.array(self.observations, dtype=np.float64)
+        # failed configurations are the worst observations
+        order = np.argsort(np.where(np.isnan(y), np.inf, y), kind="stable")
+        num_good = max(1, int(np.ceil(self.gamma * np.count_nonzero(~np.isnan(y)))))
+        good, bad = X[order[:num_good]], X[order[num_good:]]
+
+        def density(observed, num_values):
+            return (np.bincount(observed, minlength=num_values) + self.prior_weight / num_values) / (len(observed) + self.prior_weight)
+
+        good_densities = list(density(good[:, p], len(values)) for p, values in enumerate(self.params_values))
+        bad_densities = list(density(bad[:, p], len(values)) for p, values in enumerate(self.params_values))
+        return good_densities, bad_densities
+
+    def propose(self, num: int, num_candidates: int) -> list:
+        """ Propose num valid and unvisited parameter configurations """
+        good_densities, bad_densities = self.densities()
+
+        # sample the value indices of all candidates for each parameter at once by inverting the cumulative densities
+        candidates = np.column_stack(list(
+            np.minimum(np.searchsorted(np.cumsum(density), np.random.random(num_candidates), side="right"), len(density) - 1)
+            for density in good_densities))
+        scores = np.sum(list(np.log(l[candidates[:, p]]) - np.log(g[candidates[:, p]]) for p, (l, g) in enumerate(zip(good_densities, bad_densities))),
+                        axis=0)
+
+        # propose the best candidates, rejecting those that are invalid or have already been visited
+        proposed = list()
+        for row in candidates[np.argsort(-scores, kind="stable")]:
+            param_config = tuple(values[i] for values, i in zip(self.params_values, row))
+            if param_config in self.visited or param_config in proposed or not self.searchspace.is_param_config_valid(param_config):
+                continue
+            proposed.append(param_config)
+            if len(proposed) == num:
+                return proposed
+
+        # fall back to random configurations when too few candidates were valid and unvisited
+        return proposed + self.random_sample(num - len(proposed), exclude=proposed)
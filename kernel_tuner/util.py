@@ -14,12 +14,8 @@ from types import FunctionType
 
 import numpy as np
 from constraint import Constraint, AllDifferentConstraint, AllEqualConstraint, MaxSumConstraint, ExactSumConstraint, MinSumConstraint, InSetConstraint, NotInSetConstraint, SomeInSetConstraint, SomeNotInSetConstraint, FunctionConstraint
-try:
-    import cupy as cp
-except ImportError:
-    cp = np
 
-from kernel_tuner.nvml import NVMLObserver
+from kernel_tuner import aggregation
 
 # number of special values to insert when a configuration cannot be measured
 
@@ -59,10 +55,14 @@ class StopCriterionReached(Exception):
     """Exception thrown when a stop criterion has been reached"""
 
 
-try:
-    import torch
-except ImportError:
-    torch = TorchPlaceHolder()
+def get_optional_module(name, fallback):
+    """ return the module with name if it has already been imported, otherwise return fallback
+
+    Arguments can only be cupy arrays or torch tensors if the user or a backend has already
+    imported cupy or torch, so there is no need to pay for importing these on startup.
+    """
+    return sys.modules.get(name) or fallback
+
 
 default_block_size_names = ["block_size_x", "block_size_y", "block_size_z"]
 
@@ -92,6 +92,8 @@ def check_argument_type(dtype, kernel_argument):
 
 def check_argument_list(kernel_name, kernel_string, args):
     """ raise an exception if a kernel arguments do not match host arguments """
+    cp = get_optional_module("cupy", np)
+    torch = get_optional_module("torch", TorchPlaceHolder())
     kernel_arguments = list()
     collected_errors = list()
     for iterator in re.finditer(kernel_name + "[ \n\t]*" + r"\(", kernel_string):
@@ -142,10 +144,35 @@ def check_tune_params_list(tune_params, observers):
         if name in forbidden_names:
             raise ValueError("Tune parameter " + name + " with value " + str(param) + " has a forbidden name!")
     if any("nvml_" in param for param in tune_params):
+        from kernel_tuner.nvml import NVMLObserver
         if not observers or not any(isinstance(obs, NVMLObserver) for obs in observers):
             raise ValueError("Tune parameters starting with nvml_ require an NVMLObserver!")
 
 
+def check_runtime_params(runtime_params, tune_params, lang):
+    """ raise an exception if runtime parameters are not tunable parameters with numeric values, or not used with C """
+    if not runtime_params:
+        return
+    if lang != "C":
+        raise ValueError("Runtime parameters are only supported with lang='C'")
+    for name in runtime_params:
+        if name not in tune_params:
+            raise ValueError(f"Runtime parameter {name} is not a tunable parameter")
+        for value in tune_params[name]:
+            get_runtime_param_type(value)
+
+
+def get_runtime_param_type(value):
+    """ return the C type used to declare a runtime parameter with value """
+    if isinstance(value, (bool, np.bool_)):
+        raise ValueError(f"Runtime parameters should have int or float values, found {value}")
+    if isinstance(value, (int, np.integer)):
+        return "int"
+    if isinstance(value, (float, np.floating)):
+        return "double"
+    raise ValueError(f"Runtime parameters should have int or float values, found {value}")
+
+
 def check_block_size_names(block_size_names):
     if block_size_names is not None:
         # do some type checks for the user input
@@ -524,7 +551,8 @@ def looks_like_a_filename(kernel_source):
     return result
 
 
-def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, block_size_names, lang, defines):
+def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, block_size_names, lang, defines, runtime_params=None,
+                          extern_runtime_params=False):
     """ prepare kernel string for compilation
 
     Prepends the kernel with a series of C preprocessor defines specific
@@ -534,6 +562,12 @@ def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, blo
      * the grid dimensions
      * tunable parameters
 
+    Runtime parameters are not defined as macros, but declared as global variables
+    that are set by the backend before running the kernel.
+
+    For Python functions compiled with Numba (lang="NUMBA"), the variables are
+    defined as Python global variables instead of preprocessor macros.
+
     :param kernel_name: Name of the kernel.
     :type kernel_name: string
 
@@ -560,6 +594,14 @@ def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, blo
         tunable parameter is defined as preprocessor macro instead.
     :type defines: dict or None
 
+    :param runtime_params: A list with the names of the tunable parameters that are
+        declared as global variables instead of preprocessor macros.
+    :type runtime_params: list(string) or None
+
+    :param extern_runtime_params: Declare the runtime parameters as extern, for secondary
+        kernel sources that are included in the primary kernel source, which defines them.
+    :type extern_runtime_params: bool
+
     :returns: A string containing the source code made specific to this kernel instance.
     :rtype: string
 
@@ -588,6 +630,10 @@ def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, blo
 
         defines["kernel_tuner"] = 1
 
+        # runtime parameters are declared as global variables below
+        for k in runtime_params or []:
+            defines.pop(k, None)
+
     for k, v in defines.items():
         if callable(v):
             v = v(params)
@@ -601,7 +647,9 @@ def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, blo
         v = str(v)
         v = v.replace("\n", "\\\n")
 
-        if "loop_unroll_factor" in k and lang == "CUDA":
+        if lang == "NUMBA":
+            kernel_prefix += f"{k} = {v}\n"
+        elif "loop_unroll_factor" in k and lang == "CUDA":
             # this handles the special case that in CUDA
             # pragma unroll loop_unroll_factor, loop_unroll_factor should be a constant integer expression
             # in OpenCL this isn't the case and we can just insert "#define loop_unroll_factor N"
@@ -613,9 +661,13 @@ def prepare_kernel_string(kernel_name, kernel_string, params, grid, threads, blo
         else:
             kernel_prefix += f"#define {k} {v}\n"
 
+    # variables in the global namespace are not name mangled, such that these can be found in both C and C++ libraries
+    for k in runtime_params or []:
+        kernel_prefix += f"{'extern ' if extern_runtime_params else ''}{get_runtime_param_type(params[k])} {k};\n"
+
     # since we insert defines above the original kernel code, the line numbers will be incorrect
     # the following preprocessor directive informs the compiler that lines should be counted from 1
-    if kernel_prefix:
+    if kernel_prefix and lang != "NUMBA":
         kernel_prefix += "#line 1\n"
 
     # Also replace parameter occurrences inside the kernel name
@@ -745,6 +797,8 @@ def process_cache(cache, kernel_options, tuning_options, runner):
           problem_size: (int, int, int)
           tune_params_keys: list
           tune_params:
+          objective: "name of objective"
+          aggregator: "name of aggregator"
           cache: {
             "x1,x2,..xN": {"block_size_x": x1, ..., time=0.234342},
             "y1,y2,..yN": {"block_size_x": y1, ..., time=0.134233},
@@ -773,6 +827,7 @@ def process_cache(cache, kernel_options, tuning_options, runner):
         c["tune_params_keys"] = list(tuning_options.tune_params.keys())
         c["tune_params"] = tuning_options.tune_params
         c["objective"] = tuning_options.objective
+        c["aggregator"] = aggregation.get_aggregator_name(tuning_options.get("aggregator") or "mean")
         c["cache"] = {}
 
         contents = json.dumps(c, cls=NpEncoder, indent="")[:-3]    # except the last "}\n}"
@@ -814,10 +869,50 @@ def process_cache(cache, kernel_options, tuning_options, runner):
             raise ValueError(f"Cannot load cache which contains results obtained with different tunable parameters. \
                 Cache has: {cached_data['tune_params_keys']}, tuning_options has: {list(tuning_options.tune_params.keys())}")
 
+        # caches written before the aggregator was stored in the cache have used the mean
+        cached_aggregator = cached_data.get("aggregator", "mean")
+        aggregator = tuning_options.get("aggregator") or "mean"
+        if cached_aggregator != aggregation.get_aggregator_name(aggregator):
+            if not tuning_options.simulation_mode:
+                raise ValueError(f"Cannot load cache which contains results aggregated with {cached_aggregator}, \
+                    use simulation mode to re-aggregate the results with a different aggregator")
+            reaggregate_cache(cached_data["cache"], tuning_options)
+
         tuning_options.cachefile = cache
         tuning_options.cache = cached_data["cache"]
 
 
+def reaggregate_cache(cache, tuning_options):
+    """ Recompute the aggregated execution time of all cached configurations from their execution times
+
+    Configurations are grouped by their number of iterations, such that each group is aggregated at once.
+    Metrics are recomputed for the configurations whose execution time has changed.
+    """
+    aggregator = tuning_options.get("aggregator") or "mean"
+    bootstrap = tuning_options.get("bootstrap")
+    metrics = tuning_options.get("metrics")
+
+    groups = dict()
+    for key, element in cache.items():
+        if isinstance(element.get("times"), list) and len(element["times"]) > 0 and not isinstance(element.get("time"), ErrorConfig):
+            groups.setdefault(len(element["times"]), []).append(key)
+
+    for keys in groups.values():
+        times = np.array([cache[key]["times"] for key in keys])
+        aggregated = aggregation.aggregate(times, aggregator)
+        if bootstrap:
+            lower, upper = aggregation.bootstrap_confidence_interval(times, aggregator, bootstrap)
+        for i, key in enumerate(keys):
+            element = cache[key]
+            element["time"] = float(aggregated[i])
+            if bootstrap:
+                element["time_bootstrap_ci"] = [float(lower[i]), float(upper[i])]
+            if metrics:
+                for metric in metrics:
+                    element.pop(metric, None)
+                process_metrics(element, metrics)
+
+
 def read_cache(cache, open_cache=True):
     """ Read the cachefile into a dictionary, if open_cache=True prepare the cachefile for appending """
     with open(cache, "r") as cachefile:
@@ -55,6 +55,7 @@ setup(
         'doc': ['sphinx', 'sphinx_rtd_theme', 'nbsphinx', 'pytest', 'ipython', 'markupsafe==2.0.1'],
         'cuda': ['pycuda', 'nvidia-ml-py', 'pynvml>=11.4.1'],
         'opencl': ['pyopencl'],
+        'numba': ['numba'],
         'cuda_opencl': ['pycuda', 'pyopencl'],
         'tutorial': ['jupyter', 'matplotlib', 'pandas'],
         'dev': [
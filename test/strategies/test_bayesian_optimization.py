@@ -1,11 +1,13 @@
 import enum
-import itertools
 from re import L
 from random import uniform as randfloat
 import numpy as np
+import pytest
 from collections import OrderedDict, namedtuple
+import kernel_tuner
 from kernel_tuner.interface import Options
-from kernel_tuner.strategies import minimize
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import common, minimize
 from kernel_tuner.strategies import bayes_opt
 from kernel_tuner.strategies.bayes_opt import BayesianOptimization
 
@@ -21,11 +23,8 @@ tuning_options["snap"] = True
 max_threads = 1024
 
 # initialize required data
-parameter_space = list(itertools.product(*tune_params.values()))
-_, _, eps = minimize.get_bounds_x0_eps(tuning_options, 1024)
-original_to_normalized, normalized_to_original = bayes_opt.generate_normalized_param_dicts(tune_params, eps)
-normalized_parameter_space = bayes_opt.normalize_parameter_space(parameter_space, tune_params, original_to_normalized)
-pruned_parameter_space, removed_tune_params = bayes_opt.prune_parameter_space(normalized_parameter_space, tuning_options, tune_params, original_to_normalized)
+_, _, eps = minimize.get_bounds_x0_eps(tuning_options, max_threads)
+searchspace = Searchspace(tuning_options, max_threads)
 
 # initialize BO
 dev_dict = {
@@ -37,43 +36,38 @@ runner_dict = {
 }
 runner = namedtuple('Struct', runner_dict.keys())(*runner_dict.values())
 kernel_options = dict()
-BO = BayesianOptimization(pruned_parameter_space, removed_tune_params, kernel_options, tuning_options, original_to_normalized, normalized_to_original, runner)
-predictions, _, std = BO.predict_list(BO.unvisited_cache)
+BO = BayesianOptimization(searchspace, kernel_options, tuning_options, runner)
+predictions, _, std = BO.predict_list(BO.unvisited())
 
 
-def test_generate_normalized_param_dicts():
-    for parameter in tune_params:
-        assert parameter in original_to_normalized.keys()
-        assert parameter in normalized_to_original.keys()
-        for o_n_value in original_to_normalized[parameter].values():
-            assert o_n_value in normalized_to_original[parameter].keys()
-            n_o_key = o_n_value
-            n_o_value = normalized_to_original[parameter][n_o_key]
-            o_n_key = n_o_value
-            assert o_n_key == n_o_value
-            assert n_o_key == o_n_value
+def test_get_normalized_values():
+    normalized_values = bayes_opt.get_normalized_values(tune_params, eps)
+    assert len(normalized_values) == len(tune_params)
+    for values, normalized in zip(tune_params.values(), normalized_values):
+        assert len(normalized) == len(values)
+        assert np.all(np.diff(normalized) > 0)
+        assert 0 < normalized[0] and normalized[-1] < 1
+        # the normalized values are mapped back to the original values when a configuration is evaluated
+        assert list(common.unscale_and_snap_to_nearest([n], dict(p=values), eps)[0] for n in normalized) == values
 
 
-def test_normalize_parameter_space():
-    assert len(parameter_space) == len(normalized_parameter_space)
-    for index in range(len(parameter_space)):
-        assert len(parameter_space[index]) == len(normalized_parameter_space[index])
-
-
-def test_prune_parameter_space():
-    assert removed_tune_params == [None, None, list(normalized_to_original['z'].keys())[0]]
-    for index in range(len(pruned_parameter_space)):
-        assert len(pruned_parameter_space[index]) <= len(parameter_space[index])
-        assert len(parameter_space[index]) - len(pruned_parameter_space[index]) == 1
+def test_bo_searchspace_array():
+    # the dimension of the constant parameter z is pruned
+    assert BO.searchspace_array.shape == (searchspace.size, 2)
+    for index, param_config in enumerate(searchspace.list):
+        normalized = BO.normalized_param_config(index)
+        assert len(normalized) == len(param_config)
+        assert tuple(common.unscale_and_snap_to_nearest(normalized, tune_params, eps)) == param_config
+        assert np.allclose(BO.searchspace_array[index], normalized[:2])
 
 
 def test_bo_initialization():
     assert BO.num_initial_samples == 0
     assert callable(BO.optimize)
     assert len(BO.results) == 0
-    assert BO.searchspace == pruned_parameter_space
-    assert BO.unvisited_cache == pruned_parameter_space
-    assert len(BO.observations) == len(pruned_parameter_space)
+    assert BO.searchspace is searchspace
+    assert BO.searchspace_size == 9
+    assert len(BO.observations) == searchspace.size
     assert BO.current_optimum == np.PINF
 
 
@@ -87,7 +81,7 @@ def test_bo_is_better_than():
 
 
 def test_bo_is_not_visited():
-    for index, _ in enumerate(BO.searchspace):
+    for index in searchspace.indices:
         assert BO.is_not_visited(index)
 
 
@@ -102,25 +96,13 @@ def test_bo_set_acquisition_function():
 
 
 def test_bo_unvisited():
-    assert BO.unvisited() == BO.unvisited_cache
+    assert np.array_equal(BO.unvisited(), searchspace.indices)
 
 
 def test_bo_find_param_config_index():
-    for index, param_config in enumerate(BO.searchspace):
+    for index, param_config in enumerate(searchspace.list):
         assert BO.find_param_config_index(param_config) == index
-
-
-def test_bo_de_normalize_param_config():
-    for param_config in BO.searchspace:
-        denormalized = BO.denormalize_param_config(param_config)
-        normalized = BO.normalize_param_config(denormalized)
-        assert param_config == normalized
-
-
-def test_bo_unprune_param_config():
-    for param_config in BO.searchspace:
-        unpruned = BO.unprune_param_config(param_config)
-        assert len(unpruned) - len(param_config) == 1
+    assert BO.find_param_config_index((1, 4, 8)) is None
 
 
 def test_bo_contextual_variance():
@@ -130,11 +112,97 @@ def test_bo_contextual_variance():
 
 def test_bo_observation_added():
     observations = list()
-    for index, param_config in enumerate(BO.searchspace):
+    for index in searchspace.indices:
         observation = randfloat(0.1, 10)
         observations.append(observation)
-        BO.update_after_evaluation(observation, index, param_config)
+        BO.update_after_evaluation(observation, index)
         assert BO.is_valid(observation)
         assert len(observations) == index + 1
-        assert len(BO.unvisited_cache) == len(BO.searchspace) - index - 1
+        assert len(BO.unvisited()) == searchspace.size - index - 1
         assert BO.current_optimum == min(observations)
+
+
+def test_incremental_gaussian_process():
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.gaussian_process.kernels import Matern
+
+    rng = np.random.default_rng(1)
+    X = rng.random((30, 3))
+    y = np.sin(5 * X[:, 0]) + X[:, 1]**2 + 0.1 * X[:, 2]
+    candidates = rng.random((100, 3))
+    kernel = Matern(length_scale=1.5, nu=1.5, length_scale_bounds="fixed")
+    reference = GaussianProcessRegressor(kernel=kernel, alpha=1e-10, normalize_y=True).fit(X, y)
+    ref_mu, ref_std = reference.predict(candidates, return_std=True)
+
+    gp = bayes_opt.IncrementalGaussianProcess(kernel, alpha=1e-10)
+    mu, std = gp.predict(candidates, return_std=True)
+    assert np.allclose(mu, 0) and np.allclose(std, 1)
+
+    gp.add_observations(X[:10], y[:10])
+    for i in range(10, 30):
+        gp.add_observations(X[i:i + 1], y[i:i + 1])
+    assert gp.num_observations == 30
+    mu, std = gp.predict(candidates, return_std=True)
+    assert np.allclose(mu, ref_mu, atol=1e-4)
+    assert np.allclose(std, ref_std, atol=1e-4)
+
+    # the hyperparameters are optimized every 5 observations
+    kernel = Matern(length_scale=1.5, nu=1.5, length_scale_bounds=(1e-2, 1e2))
+    gp = bayes_opt.IncrementalGaussianProcess(kernel, alpha=1e-10, hyperparameter_interval=5)
+    gp.add_observations(X[:10], y[:10])
+    for i in range(10, 14):
+        gp.add_observations(X[i:i + 1], y[i:i + 1])
+        assert gp.observations_since_optimization == i - 9
+    assert gp.kernel.length_scale != 1.5
+    gp.add_observations(X[14:15], y[14:15])
+    assert gp.observations_since_optimization == 0
+
+
+def test_bo_candidates_trust_region():
+    params = OrderedDict([("x", [1, 2, 3, 4, 5]), ("y", [1, 2, 3, 4, 5])])
+    options = Options(dict(restrictions=[], tune_params=params, strategy_options=dict(popsize=0, maxcandidates=10, trustregionlength=0.5)))
+    options["scaling"] = True
+    _, _, eps = minimize.get_bounds_x0_eps(options, 1024)
+    bo = BayesianOptimization(Searchspace(options, 1024), kernel_options, options, runner)
+    candidates = bo.get_candidates()
+    assert len(candidates) == 10
+    assert len(set(candidates)) == 10
+
+    # observe the center of the search space as the best configuration so far
+    center = bo.find_param_config_index((3, 3))
+    bo.update_after_evaluation(1.0, center)
+    distance = np.max(np.abs(bo.searchspace_array - bo.searchspace_array[center]), axis=1)
+    neighbors = np.flatnonzero(distance <= eps * 1.01)
+    neighbors = neighbors[neighbors != center]
+    assert len(neighbors) == 8
+    for _ in range(10):
+        candidates = bo.get_candidates()
+        assert center not in candidates
+        assert np.all(np.isin(candidates, bo.unvisited()))
+        # the trust region around the center is always scored
+        assert np.all(np.isin(neighbors, candidates))
+
+    # the trust region shrinks when evaluations do not improve and expands after consecutive improvements
+    others = np.flatnonzero(distance > eps * 1.01)
+    length = bo.trust_region_length
+    for index in others[:4]:
+        bo.update_after_evaluation(2.0, index)
+    assert bo.trust_region_length == length / 2
+    for observation, index in zip([0.9, 0.8, 0.7], others[4:]):
+        bo.update_after_evaluation(observation, index)
+    assert bo.trust_region_length == length
+
+
+@pytest.mark.parametrize("method", ["multi-advanced", "multi-fast"])
+@pytest.mark.parametrize("maxcandidates", [1, 2])
+def test_bo_multi_few_candidates(method, maxcandidates):
+    params = OrderedDict([("x", list(range(8))), ("y", list(range(8)))])
+
+    def model(columns, tune_params):
+        return (columns["x"] - 3.0)**2 + (columns["y"] - 5.0)**2 + 1.0
+
+    # each acquisition function of the portfolio selects a candidate, so there are more than maxcandidates candidates
+    strategy_options = dict(method=method, maxcandidates=maxcandidates, popsize=5, max_fevals=30)
+    results, _ = kernel_tuner.tune_kernel("kernel", "kernel", 1, [], params, model=model, quiet=True,
+                                          strategy="bayes_opt", strategy_options=strategy_options)
+    assert len(results) == 30
@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from kernel_tuner.interface import Options
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import cma_es
+
+tune_params = OrderedDict()
+tune_params["x"] = list(range(16))
+tune_params["y"] = list(range(16))
+
+tuning_options = Options(dict(restrictions=[], tune_params=tune_params))
+max_threads = 1024
+
+
+def objective(points):
+    return np.sum((points - np.array([0.7, 0.2]))**2, axis=1)
+
+
+def test_cma_es_ask():
+    np.random.seed(0)
+    cma = cma_es.CMAES([0.5, 0.5], popsize=8, sigma=0.3)
+    points = cma.ask()
+    assert points.shape == (8, 2)
+    assert np.all((points >= 0) & (points <= 1))
+
+
+def test_cma_es_converges():
+    np.random.seed(0)
+    searchspace = Searchspace(tuning_options, max_threads)
+    normalized = searchspace.get_normalized_array()
+    cma = cma_es.CMAES([0.5, 0.5], popsize=8, sigma=0.3)
+    initial_covariance = cma.C.copy()
+
+    # the distribution is updated with the snapped points, as in the strategy
+    for _ in range(30):
+        indices = searchspace.get_nearest_indices(cma.ask())
+        cma.tell(normalized[indices], objective(normalized[indices]))
+    assert cma.is_stable()
+    assert not np.allclose(cma.C, initial_covariance)
+    assert searchspace.list[searchspace.get_nearest_indices(cma.mean)[0]] in [(11, 3), (11, 2), (10, 3)]
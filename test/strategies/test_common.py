@@ -3,6 +3,7 @@ from collections import OrderedDict
 from time import perf_counter
 from kernel_tuner.strategies import common
 from kernel_tuner.interface import Options
+from kernel_tuner.searchspace import Searchspace
 
 try:
     from mock import Mock
@@ -46,6 +47,28 @@ def test__cost_func():
     assert time == sys.float_info.max
 
 
+def test__cost_func_searchspace():
+    restrictions = [lambda x, y: x + y != 7]
+    tuning_options = Options(scaling=True, snap=True, eps=1 / 3, tune_params=tune_params,
+                             restrictions=restrictions, strategy_options={}, verbose=False, cache={}, unique_results={},
+                             objective="time", objective_higher_is_better=False, metrics=None)
+    searchspace = Searchspace(tuning_options, 1024)
+    runner = fake_runner()
+    results = []
+
+    # (2, 5) is restricted, so the scaled point is snapped to a valid configuration instead of returning an invalid config
+    time = common._cost_func([0.55, 0.45], None, tuning_options, runner, results, searchspace=searchspace)
+    assert time == 5
+    runner.run.assert_called_once()
+    params = runner.run.call_args[0][0][0]
+    assert params in searchspace.list and params != (2, 5)
+
+    # in the raw space, points are snapped to the nearest values of each parameter
+    tuning_options["scaling"] = False
+    common._cost_func([2.8, 5.9], None, tuning_options, runner, results, searchspace=searchspace)
+    assert runner.run.call_args[0][0][0] == (3, 6)
+
+
 def test_setup_method_arguments():
     # check if returns a dict, the specific options depend on scipy
     assert isinstance(common.setup_method_arguments("bla", 5), dict)
@@ -59,3 +82,43 @@ def test_setup_method_options():
     assert method_options["eps"] == 1e-5
     assert method_options["maxfun"] == 100
     assert method_options["disp"] is True
+
+
+def test__cost_func_batch():
+    tuning_options = Options(tune_params=tune_params, restrictions=None, strategy_options={}, cache={}, unique_results={},
+                             objective="time", objective_higher_is_better=True, metrics=None)
+    runner = Mock()
+    runner.last_strategy_start_time = perf_counter()
+    runner.run.return_value = [[{'time': 5}, {'time': 3}], None]
+    results = []
+
+    values = common._cost_func_batch([(1, 4), (2, 5)], None, tuning_options, runner, results)
+    runner.run.assert_called_once()
+    assert values == [-5, -3]
+    assert len(results) == 2
+    assert list(tuning_options.unique_results.keys()) == ["1,4", "2,5"]
+
+
+def test_memoized_cost_func():
+    tuning_options = Options(scaling=False, snap=True, tune_params=tune_params, restrictions=None, strategy_options={}, verbose=False,
+                             cache={}, unique_results={}, objective="time", objective_higher_is_better=False, metrics=None)
+    searchspace = Searchspace(tuning_options, 1024)
+    runner = fake_runner()
+    args = (None, tuning_options, runner)
+
+    # points that snap to the same configuration only call the runner once
+    results = []
+    cost_func = common.MemoizedCostFunc(searchspace)
+    assert cost_func([1.1, 4.2], *args, results) == 5
+    assert cost_func([0.9, 3.8], *args, results) == 5
+    runner.run.assert_called_once()
+    assert cost_func.avoided_runner_calls == 1
+    assert len(results) == 2 and results[0] is results[1]
+
+    # repeats can be left out of the results
+    results = []
+    cost_func = common.MemoizedCostFunc(searchspace, repeats=False)
+    cost_func([1, 4], *args, results)
+    cost_func([1, 4], *args, results)
+    assert cost_func.avoided_runner_calls == 1
+    assert len(results) == 1
@@ -1,4 +1,7 @@
 from collections import OrderedDict
+
+import numpy as np
+
 from kernel_tuner.strategies import genetic_algorithm as ga
 from kernel_tuner.interface import Options
 from kernel_tuner.searchspace import Searchspace
@@ -14,17 +17,13 @@ searchspace = Searchspace(tuning_options, max_threads)
 
 def test_weighted_choice():
     pop_size = 5
-    pop = searchspace.get_random_sample(pop_size)
-    weighted_pop = [[p, i] for i, p in enumerate(pop)]
+    pairs = ga.weighted_choice(pop_size, 1)
+    assert pairs.shape == (1, 2)
 
-    result = ga.weighted_choice(weighted_pop, 1)
-    assert result[0] in pop
-
-    result = ga.weighted_choice(weighted_pop, 2)
-    print(result)
-    assert result[0] in pop
-    assert result[1] in pop
-    assert result[0] != result[1]
+    pairs = ga.weighted_choice(pop_size, 100)
+    assert pairs.shape == (100, 2)
+    assert np.all((pairs >= 0) & (pairs < pop_size))
+    assert np.all(pairs[:, 0] != pairs[:, 1])
 
 
 def test_random_population():
@@ -44,35 +43,50 @@ def test_random_population():
 
 
 def test_mutate():
-    pop = searchspace.get_random_sample(1)
+    genes = searchspace.get_params_values_indices()[searchspace.get_random_sample_indices(4)]
+
+    mutants = ga.mutate(genes, 10, searchspace)
+    assert mutants.shape == genes.shape
+    assert np.all(mutants < 3)
 
-    mutant = ga.mutate(pop[0], 10, searchspace)
-    assert len(pop[0]) == len(mutant)
-    assert mutant[0] in tune_params["x"]
-    assert mutant[1] in tune_params["y"]
+    # with a mutation chance of 1 every row is mutated into a neighbor with Hamming distance 1
+    mutants = ga.mutate(genes, 1, searchspace)
+    assert np.all(np.count_nonzero(mutants != genes, axis=1) == 1)
 
 
 def test_crossover_functions():
-    dna1 = ["x", "y", "z"]
-    dna2 = ["a", "b", "c"]
+    dna1 = np.array([["x", "y", "z"]] * 4)
+    dna2 = np.array([["a", "b", "c"]] * 4)
     funcs = ga.supported_methods.values()
     for func in funcs:
         children = func(dna1, dna2)
         print(dna1, dna2)
         print(children)
         assert len(children) == 2
-        assert len(children[0]) == 3
-        assert len(children[1]) == 3
+        assert children[0].shape == (4, 3)
+        assert children[1].shape == (4, 3)
+        # each gene of the children comes from one of the parents
+        assert np.all((children[0] == dna1) | (children[0] == dna2))
+        assert np.all((children[0] == dna1) == (children[1] == dna2))
 
 
 def test_disruptive_uniform_crossover():
     # two individuals with at exactly 2 differences
-    dna1 = ["x", "y", 1, 2, 3, 4, 5]
-    dna2 = ["x", "x", 1, 2, 3, 4, 7]
+    dna1 = np.array([[0, 1, 1, 2, 3, 4, 5]] * 10)
+    dna2 = np.array([[0, 0, 1, 2, 3, 4, 7]] * 10)
     # confirm that disruptive uniform crossover indeed guarantees
     # offsping that is different from the parents and each other
     # when there is more than 1 difference between the parents
     child1, child2 = ga.disruptive_uniform_crossover(dna1, dna2)
-    assert child1 != dna1 and child1 != dna2
-    assert child2 != dna1 and child2 != dna2
-    assert child1 != child2
+    assert np.all(np.any(child1 != dna1, axis=1) & np.any(child1 != dna2, axis=1))
+    assert np.all(np.any(child2 != dna1, axis=1) & np.any(child2 != dna2, axis=1))
+    assert np.all(np.any(child1 != child2, axis=1))
+
+
+def test_create_offspring():
+    population = searchspace.get_random_sample_indices(4)
+    for crossover in ga.supported_methods.values():
+        offspring = ga.create_offspring(population, 6, crossover, 10, searchspace)
+        assert len(offspring) == 6
+        assert len(np.unique(offspring)) == 6
+        assert np.all((offspring >= 0) & (offspring < searchspace.size))
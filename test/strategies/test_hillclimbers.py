@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from kernel_tuner.interface import Options
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies.hillclimbers import NeighborSurrogate
+
+tune_params = OrderedDict()
+tune_params["x"] = [1, 2, 3, 4, 5, 6, 7, 8]
+tune_params["y"] = [1, 2, 3, 4, 5, 6, 7, 8]
+
+tuning_options = Options(dict(restrictions=[], tune_params=tune_params))
+max_threads = 1024
+
+
+def objective(param_config):
+    x, y = param_config
+    return (x - 6)**2 + (y - 3)**2
+
+
+@pytest.mark.parametrize("method", ["knn", "linear"])
+def test_neighbor_surrogate(method):
+    searchspace = Searchspace(tuning_options, max_threads)
+    surrogate = NeighborSurrogate(searchspace, method)
+
+    # with too few observations the order is kept
+    neighbors = searchspace.get_neighbors((1, 1), "Hamming")
+    assert list(surrogate.rank(neighbors)) == list(range(len(neighbors)))
+
+    for param_config in searchspace.get_param_configs_at_indices(np.random.choice(searchspace.size, 30, replace=False)):
+        surrogate.add_observation(param_config, objective(param_config))
+    assert surrogate.is_observed(param_config)
+
+    # the neighbors that are ranked first are close to the minimum
+    ranked = list(neighbors[i] for i in surrogate.rank(neighbors))
+    assert objective(ranked[0]) < np.median(list(objective(neighbor) for neighbor in neighbors))
+
+
+def test_neighbor_surrogate_method():
+    searchspace = Searchspace(tuning_options, max_threads)
+    with pytest.raises(ValueError):
+        NeighborSurrogate(searchspace, "gp")
@@ -0,0 +1,26 @@
+import numpy as np
+
+from kernel_tuner.strategies import island_genetic_algorithm as iga
+
+
+def test_sort_by_score():
+    island = np.array([4, 7, 1, 9])
+    scores = {4: 3.0, 7: 1.0, 1: 2.0}
+    # configurations without a score are sorted last
+    assert iga.sort_by_score(island, scores).tolist() == [7, 1, 4, 9]
+
+
+def test_migrate():
+    scores = dict((index, float(index)) for index in range(12))
+    islands = [np.array([0, 4, 5]), np.array([1, 6, 7]), np.array([2, 8, 9])]
+    migrated = iga.migrate(islands, 1, scores)
+
+    # the best individual of each island replaces the worst of the next island
+    assert migrated[0].tolist() == [0, 2, 4]
+    assert migrated[1].tolist() == [0, 1, 6]
+    assert migrated[2].tolist() == [1, 2, 8]
+
+    # an individual that is already on the next island is not duplicated
+    islands = [np.array([0, 4]), np.array([0, 6])]
+    migrated = iga.migrate(islands, 1, scores)
+    assert migrated[1].tolist() == [0, 6]
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from kernel_tuner.interface import Options
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import smac
+
+tune_params = OrderedDict()
+tune_params["x"] = [1, 2, 3, 4, 5, 6, 7, 8]
+tune_params["y"] = [1, 2, 3, 4, 5, 6, 7, 8]
+
+tuning_options = Options(dict(restrictions=[], tune_params=tune_params))
+max_threads = 1024
+
+
+def objective(param_config):
+    x, y = param_config
+    return (x - 6)**2 + (y - 3)**2 + 1.0
+
+
+def test_random_forest_surrogate():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 8, (50, 2))
+    y = np.array([objective(x) for x in X], dtype=np.float64)
+    surrogate = smac.RandomForestSurrogate(trees=10).fit(X, y)
+    mu, std = surrogate.predict(X)
+    assert mu.shape == std.shape == (50, )
+    assert np.allclose(mu, surrogate.forest.predict(X))
+    assert np.all(std >= 0)
+
+
+def test_random_forest_optimization():
+    searchspace = Searchspace(tuning_options, max_threads, neighbor_method="adjacent")
+    optimizer = smac.RandomForestOptimization(searchspace, trees=10, localsearches=3, randomcandidates=10)
+
+    # without enough valid observations, configurations are proposed at random
+    optimizer.add_observation(0, np.nan)
+    assert not optimizer.fit()
+    proposed = optimizer.propose(3, 0.0)
+    assert len(set(proposed)) == 3
+
+    for index in searchspace.get_random_sample_indices(20):
+        if optimizer.visited[index]:
+            continue
+        optimizer.add_observation(index, objective(searchspace.list[index]))
+    assert optimizer.fit()
+
+    # the local searches and random candidates lead to the minimum of the objective
+    for _ in range(10):
+        proposed = optimizer.propose(4, 0.0)
+        assert len(set(proposed)) == 4
+        assert not np.any(optimizer.visited[proposed])
+        for index in proposed:
+            optimizer.add_observation(index, objective(searchspace.list[index]))
+    best = min(objective(searchspace.list[index]) for index in optimizer.observed)
+    assert best <= 2.0
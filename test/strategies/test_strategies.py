@@ -64,3 +64,13 @@ def test_strategies(vector_add, strategy):
                 unique_results[x_int] = result["time"]
 
         assert len(unique_results) <= filter_options["max_fevals"]
+
+
+@pytest.mark.parametrize('surrogate', ['knn', 'linear'])
+@pytest.mark.parametrize('strategy', ['greedy_mls', 'mls', 'ordered_greedy_mls', 'greedy_ils'])
+def test_hillclimber_surrogates(vector_add, strategy, surrogate):
+    strategy_options = dict(neighbor='adjacent', surrogate=surrogate, max_fevals=10)
+    results, _ = kernel_tuner.tune_kernel(*vector_add, strategy=strategy, strategy_options=strategy_options,
+                                          verbose=False, cache=cache_filename, simulation_mode=True)
+
+    assert 0 < len(set(result["block_size_x"] for result in results)) <= 10
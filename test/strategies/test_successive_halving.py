@@ -0,0 +1,66 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import kernel_tuner
+from kernel_tuner import util
+from kernel_tuner.interface import Options
+from kernel_tuner.strategies import successive_halving
+
+tune_params = OrderedDict()
+tune_params["x"] = list(range(27))
+
+
+def model(columns, tune_params):
+    return columns["x"].astype(float)
+
+
+def test_successive_halving():
+    fidelities = [dict(iterations=1), dict(iterations=2)]
+    strategy_options = dict(fidelities=fidelities, eta=3, popsize=27, max_fevals=3)
+    results, env = kernel_tuner.tune_kernel("kernel", "kernel", 1, [], tune_params, model=model, iterations=7, quiet=True,
+                                            strategy="successive_halving", strategy_options=strategy_options)
+
+    # all configurations are evaluated with 1 iteration, the best 9 with 2 iterations, and only the best 3 at the final fidelity
+    assert sorted(r["x"] for r in results) == [0, 1, 2]
+    assert all(np.isclose(r["benchmark_time"], 7 * r["time"]) for r in results)
+    assert np.isclose(env["simulated_time"], sum(range(27)) + 2 * sum(range(9)) + 7 * sum(range(3)))
+
+
+def test_fidelity_caches(tmp_path):
+    cache = str(tmp_path / "cache.json")
+    fidelities = [dict(problem_size=(64, 2)), dict(problem_size=256, iterations=3)]
+    strategy_options = dict(fidelities=fidelities, max_fevals=5)
+    kernel_tuner.tune_kernel("kernel", "kernel", 1024, [], tune_params, model=model, quiet=True, cache=cache,
+                             strategy="successive_halving", strategy_options=strategy_options)
+
+    # each fidelity has a cachefile of its own
+    assert util.read_cache(cache)["problem_size"] == 1024
+    assert util.read_cache(str(tmp_path / "cache_problem_size_64x2.json"))["problem_size"] == [64, 2]
+    assert util.read_cache(str(tmp_path / "cache_problem_size_256_iterations_3.json"))["problem_size"] == 256
+
+
+def test_fidelity_options():
+    kernel_options = Options(problem_size=1024)
+    tuning_options = Options(cachefile=None)
+    with pytest.raises(ValueError):
+        successive_halving.Fidelity(dict(grid_size=256), kernel_options, tuning_options, None)
+
+    fidelity = successive_halving.Fidelity(dict(problem_size=256), kernel_options, tuning_options, None)
+    assert fidelity.kernel_options.problem_size == 256
+    assert kernel_options.problem_size == 1024
+    assert fidelity.iterations is None
+
+
+def test_simulation_mode_without_fidelity_caches():
+    cache = os.path.dirname(os.path.realpath(__file__)) + "/../test_cache_file.json"
+    vector_add_params = OrderedDict(block_size_x=[128 + 64 * i for i in range(15)])
+    args = [np.zeros(100, dtype=np.float32), np.zeros(100, dtype=np.float32), np.zeros(100, dtype=np.float32), np.int32(100)]
+
+    # the cheaper fidelity is skipped, because there is no cachefile with its results to simulate it
+    with pytest.warns(UserWarning, match="Skipping fidelity"):
+        results, _ = kernel_tuner.tune_kernel("vector_add", "kernel", 100, args, vector_add_params, strategy="successive_halving",
+                                              strategy_options=dict(max_fevals=5), cache=cache, simulation_mode=True, quiet=True)
+    assert len(results) == 5
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from kernel_tuner.interface import Options
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import tabu_search
+
+tune_params = OrderedDict()
+tune_params["x"] = [1, 2, 3, 4, 5]
+tune_params["y"] = [1, 2, 3, 4, 5]
+
+tuning_options = Options(dict(restrictions=[], tune_params=tune_params))
+max_threads = 1024
+
+
+def objective(param_config):
+    x, y = param_config
+    return (x - 4)**2 + (y - 2)**2 + 1.0
+
+
+def test_tabu_list():
+    searchspace = Searchspace(tuning_options, max_threads, neighbor_method="Hamming")
+    tabu = tabu_search.TabuSearch(searchspace, tenure=2)
+    for index in [0, 1, 2]:
+        tabu.make_tabu(index)
+    assert tabu.tabu == {1, 2}
+
+    # making a configuration tabu again renews its tenure
+    tabu.make_tabu(1)
+    tabu.make_tabu(3)
+    assert tabu.tabu == {1, 3}
+
+
+def test_tabu_search_moves():
+    searchspace = Searchspace(tuning_options, max_threads, neighbor_method="Hamming")
+    tabu = tabu_search.TabuSearch(searchspace, tenure=3, maxstall=10)
+    start = searchspace.get_param_config_index((1, 5))
+    tabu.add_observation(start, objective((1, 5)))
+    tabu.restart(start)
+
+    # the search moves to the best neighbor and reaches the minimum
+    for _ in range(4):
+        if searchspace.list[tabu.current] == (4, 2):
+            break
+        unevaluated = tabu.unevaluated_neighbors()
+        assert not np.any(tabu.evaluated[unevaluated])
+        for index in unevaluated:
+            tabu.add_observation(index, objective(searchspace.list[index]))
+        tabu.move()
+    assert searchspace.list[tabu.current] == (4, 2)
+    assert tabu.search_best == 1.0
+
+    # from the minimum, the search moves to the best neighbor that is not tabu, even if it is worse
+    for index in tabu.unevaluated_neighbors():
+        tabu.add_observation(index, objective(searchspace.list[index]))
+    tabu.move()
+    assert objective(searchspace.list[tabu.current]) == 2.0
+    assert tabu.current in tabu.tabu
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from kernel_tuner.interface import Options
+from kernel_tuner.searchspace import Searchspace
+from kernel_tuner.strategies import tpe
+
+tune_params = OrderedDict()
+tune_params["x"] = [1, 2, 3, 4, 5, 6, 7, 8]
+tune_params["y"] = ["a", "b", "c", "d"]
+
+tuning_options = Options(dict(restrictions=[lambda x, y: x != 3], tune_params=tune_params))
+max_threads = 1024
+searchspace = Searchspace(tuning_options, max_threads)
+
+
+def objective(param_config):
+    x, y = param_config
+    return abs(x - 6) + (0 if y == "b" else 2) + 1.0
+
+
+def test_densities():
+    estimator = tpe.TreeParzenEstimator(searchspace, gamma=0.25, prior_weight=1.0)
+    for param_config in searchspace.list:
+        estimator.add_observation(param_config, objective(param_config))
+    estimator.add_observation((3, "b"), np.nan)
+    good, bad = estimator.densities()
+    for l, g, values in zip(good, bad, tune_params.values()):
+        assert len(l) == len(g) == len(values)
+        assert np.isclose(np.sum(l), 1) and np.isclose(np.sum(g), 1)
+        assert np.all(l > 0) and np.all(g > 0)
+    # the good set contains the configurations around the optimum
+    assert np.argmax(good[0]) == 5
+    assert np.argmax(good[1]) == 1
+    assert good[1][1] > bad[1][1]
+
+
+def test_propose():
+    estimator = tpe.TreeParzenEstimator(searchspace)
+    for param_config in estimator.random_sample(10):
+        estimator.add_observation(param_config, objective(param_config))
+    for _ in range(3):
+        proposed = estimator.propose(4, 64)
+        assert len(set(proposed)) == 4
+        for param_config in proposed:
+            assert searchspace.is_param_config_valid(param_config)
+            assert param_config not in estimator.visited
+            estimator.add_observation(param_config, objective(param_config))
+    assert min(estimator.observations) <= 2.0
+
+    # when almost all configurations have been visited, the remainder is proposed
+    for param_config in searchspace.list[:-3]:
+        estimator.visited.add(param_config)
+    assert set(estimator.propose(5, 64)) <= set(searchspace.list[-3:])
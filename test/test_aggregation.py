@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from kernel_tuner import aggregation
+
+
+def test_aggregate_builtin():
+    times = [1.0, 2.0, 3.0, 4.0, 100.0]
+    assert aggregation.aggregate(times, "mean") == 22.0
+    assert aggregation.aggregate(times, "median") == 3.0
+    assert aggregation.aggregate(times, "min") == 1.0
+    assert aggregation.aggregate(times, "trimmed_mean") == 3.0
+    # the outlier is removed by the MAD filter
+    assert aggregation.aggregate(times, "mad_mean") == 2.5
+
+
+def test_aggregate_vectorized():
+    times = np.array([[1.0, 2.0, 3.0], [4.0, 8.0, 9.0]])
+    for name in aggregation.aggregators:
+        expected = [aggregation.aggregate(row, name) for row in times]
+        assert np.allclose(aggregation.aggregate(times, name), expected)
+
+    def second_lowest(t):
+        return np.sort(t)[1]
+    assert np.allclose(aggregation.aggregate(times, second_lowest), [2.0, 8.0])
+
+
+def test_get_aggregator():
+    assert aggregation.get_aggregator("median") is aggregation.median
+    def maximum(t):
+        return np.max(t)
+    assert aggregation.get_aggregator(maximum) is maximum
+    assert aggregation.get_aggregator_name(maximum) == "maximum"
+    with pytest.raises(ValueError):
+        aggregation.get_aggregator("mode")
+    # all lambdas share the same name, so they cannot be told apart in the cache
+    with pytest.raises(ValueError):
+        aggregation.get_aggregator_name(lambda t: np.max(t))
+
+
+def test_bootstrap_confidence_interval():
+    times = np.random.default_rng(0).normal(10.0, 1.0, size=50)
+    lower, upper = aggregation.bootstrap_confidence_interval(times, "median", resamples=500, seed=1)
+    assert lower < np.median(times) < upper
+
+    # multiple configurations at once
+    lower, upper = aggregation.bootstrap_confidence_interval(np.array([times, times + 5]), "mean", resamples=500, seed=1)
+    assert lower.shape == (2, )
+    assert np.all(lower < upper)
+    assert lower[1] > upper[0]
@@ -1,4 +1,7 @@
+from collections import OrderedDict
 from datetime import datetime
+import os
+import subprocess
 
 import numpy as np
 import ctypes as C
@@ -11,7 +14,7 @@ except ImportError:
     from unittest.mock import patch, Mock
 
 import kernel_tuner
-from kernel_tuner.c import CFunctions, Argument
+from kernel_tuner.c import CFunctions, Argument, split_include_prefix
 from kernel_tuner.core import KernelSource, KernelInstance
 from kernel_tuner import util
 
@@ -233,6 +236,133 @@ def test_memcpy_htod():
     assert all(arg.numpy == a)
 
 
+@skip_if_no_gcc
+def test_compile_cache(tmp_path):
+    kernel_name = "my_test_function"
+
+    def compile_and_run(cfunc, value):
+        kernel_string = "float my_test_function() { return %s; }" % value
+        kernel_sources = KernelSource(kernel_name, kernel_string, "C")
+        kernel_instance = KernelInstance(kernel_name, kernel_sources, kernel_string, [], None, None, dict(), [])
+        func = cfunc.compile(kernel_instance)
+        return cfunc.run_kernel(func, [], (), ())
+
+    cache_dir = str(tmp_path / "cache")
+    cfunc = CFunctions(compile_cache=cache_dir)
+    assert compile_and_run(cfunc, "42.0f") == 42.0
+    assert compile_and_run(cfunc, "43.0f") == 43.0
+    assert cfunc.env["compile_cache_misses"] == 2
+
+    # a new session loads the libraries from the cache without compiling
+    cfunc = CFunctions(compile_cache=cache_dir)
+    with patch('kernel_tuner.c.subprocess') as subprocess:
+        assert compile_and_run(cfunc, "42.0f") == 42.0
+        assert not subprocess.check_call.called
+    assert cfunc.env["compile_cache_hits"] == 1
+    assert cfunc.env["compile_cache_hit_rate"] == 1.0
+
+    # the least recently used library is evicted when the cache is full
+    cfunc.compile_cache.max_size = max(entry.stat().st_size for entry in os.scandir(cache_dir))
+    cfunc.compile_cache.evict()
+    assert len(os.listdir(cache_dir)) == 1
+    assert compile_and_run(cfunc, "43.0f") == 43.0
+    assert cfunc.env["compile_cache_misses"] == 1
+
+
+@patch('kernel_tuner.c.subprocess')
+@patch('kernel_tuner.c.numpy.ctypeslib')
+def test_compile_single_step(npct, subprocess):
+    kernel_string = "this is a fake C program"
+    kernel_name = "blabla"
+    kernel_sources = KernelSource(kernel_name, kernel_string, "C")
+    kernel_instance = KernelInstance(kernel_name, kernel_sources, kernel_string, [], None, None, dict(), [])
+
+    cfunc = CFunctions(single_step_compile=True)
+    cfunc.compile(kernel_instance)
+
+    assert subprocess.check_call.call_count == 1
+    args, _ = subprocess.check_call.call_args
+    assert "-c" not in args[0]
+    assert "-shared" in args[0]
+
+
+@skip_if_no_gcc
+def test_tune_kernel_single_step_compile():
+    kernel_string = """
+        extern "C" float product(int n) {
+            return (float) factor;
+        }"""
+    tune_params = {"factor": [1, 2]}
+
+    with patch("kernel_tuner.c.subprocess.check_call", wraps=subprocess.check_call) as check_call:
+        results, _ = kernel_tuner.tune_kernel("product", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                              block_size_names=["factor"], single_step_compile=True)
+
+    assert [result["time"] for result in results] == [1.0, 2.0]
+    assert all("-c" not in args[0] for args, _ in check_call.call_args_list)
+
+
+@skip_if_no_gcc
+def test_compile_many():
+    kernel_name = "my_test_function"
+
+    def get_instance(kernel_string):
+        kernel_sources = KernelSource(kernel_name, kernel_string, "C")
+        return KernelInstance(kernel_name, kernel_sources, kernel_string, [], None, None, dict(), [])
+
+    kernel_strings = ["float my_test_function() { return %d.0f; }" % i for i in range(4)]
+    kernel_strings.append("this does not compile")
+
+    cfunc = CFunctions(single_step_compile=True)
+    libraries = cfunc.compile_many([get_instance(k) for k in kernel_strings], max_workers=2)
+
+    # every instance has its own library handle
+    for i, library in enumerate(libraries[:4]):
+        assert cfunc.run_kernel(library.func, [], (), ()) == float(i)
+        cfunc.cleanup_lib(library.lib)
+    assert isinstance(libraries[4], Exception)
+
+
+@skip_if_no_gcc
+def test_compile_many_runtime_params(tmp_path):
+    kernel_name = "my_test_function"
+    kernel_string = "int factor;\nfloat my_test_function() { return (float) factor; }"
+    kernel_sources = KernelSource(kernel_name, kernel_string, "C", runtime_params=["factor"])
+    instances = [KernelInstance(kernel_name, kernel_sources, kernel_string, [], None, None, dict(factor=i), []) for i in range(1, 4)]
+
+    # the instances share a build, which is taken from the compile cache the second time
+    cfunc = CFunctions(compile_cache=str(tmp_path))
+    for _ in range(2):
+        with patch.object(CFunctions, "run_compiler", autospec=True, side_effect=CFunctions.run_compiler) as run_compiler:
+            libraries = cfunc.compile_many(instances, max_workers=2)
+
+        # every instance has an independent library with its own runtime parameters
+        assert len(set(library.lib._handle for library in libraries)) == 3
+        assert [cfunc.run_kernel(library.func, [], (), ()) for library in libraries] == [1.0, 2.0, 3.0]
+        for library in libraries:
+            cfunc.cleanup_lib(library.lib)
+    assert run_compiler.call_count == 0
+    assert cfunc.env["compile_cache_hits"] == 1
+
+
+@skip_if_no_gcc
+def test_tune_kernel_compile_workers():
+    kernel_string = """
+        float product(int n) {
+            return (float) (factor * repeats);
+        }"""
+    tune_params = {"factor": [1, 2, 3], "repeats": [1, 2]}
+
+    with patch.object(CFunctions, "compile_many", autospec=True, side_effect=CFunctions.compile_many) as compile_many:
+        results, _ = kernel_tuner.tune_kernel("product", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                              block_size_names=["factor"], runtime_params=["repeats"], compile_workers=4)
+
+    # the configurations are compiled in batches of compile_workers
+    assert [len(args[1]) for args, _ in compile_many.call_args_list] == [4, 2]
+    assert all([result["time"] == result["factor"] * result["repeats"] for result in results])
+    assert all([result["compile_time"] > 0 for result in results])
+
+
 @skip_if_no_gfortran
 def test_complies_fortran_function_no_module():
     kernel_string = """
@@ -330,3 +460,160 @@ def test_benchmark(env):
 
 
 
+
+
+@skip_if_no_gcc
+def test_racing():
+    kernel_string = """
+        #include <unistd.h>
+
+        extern "C" float sleepy(int n) {
+            usleep(sleep_ms * 1000);
+            return (float) sleep_ms;
+        }"""
+    tune_params = {"sleep_ms": [1, 10]}
+
+    results, _ = kernel_tuner.tune_kernel("sleepy", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                          block_size_names=["sleep_ms"], racing=True)
+
+    assert len(results) == 2
+    assert "partial" not in results[0]
+    assert len(results[0]["times"]) == 7
+    assert results[1]["partial"]
+    assert len(results[1]["times"]) == 2
+
+    with raises(ValueError, match="Racing"):
+        kernel_tuner.tune_kernel("sleepy", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                 block_size_names=["sleep_ms"], racing=True, objective="GFLOP/s")
+
+
+@skip_if_no_gcc
+def test_racing_cache(tmp_path):
+    kernel_string = """
+        #include <unistd.h>
+
+        extern "C" float sleepy(int n) {
+            usleep(sleep_ms * 1000);
+            return (float) sleep_ms;
+        }"""
+    tune_params = OrderedDict(sleep_ms=[1, 10])
+    cache = str(tmp_path / "cache.json")
+
+    results, _ = kernel_tuner.tune_kernel("sleepy", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                          block_size_names=["sleep_ms"], racing=True, cache=cache)
+    assert results[1]["partial"]
+    assert list(util.read_cache(cache)["cache"].keys()) == ["1"]
+
+    # without racing, the configuration that was dropped early is benchmarked again
+    results, _ = kernel_tuner.tune_kernel("sleepy", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                          block_size_names=["sleep_ms"], cache=cache)
+    assert "partial" not in results[1]
+    assert len(results[1]["times"]) == 7
+    assert results[1]["benchmark_time"] > 0
+
+
+@skip_if_no_gcc
+def test_unload_without_runtime_params():
+    kernel_string = """
+        float product(int n) {
+            return (float) factor;
+        }"""
+    tune_params = {"factor": [1, 2, 3]}
+
+    with patch.object(CFunctions, "cleanup_lib", autospec=True, side_effect=CFunctions.cleanup_lib) as cleanup_lib:
+        results, _ = kernel_tuner.tune_kernel("product", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                              block_size_names=["factor"])
+
+    # without runtime parameters, the previous library is unloaded before every compile, including the warm-up
+    assert len(results) == 3
+    assert cleanup_lib.call_count == 3
+
+
+@skip_if_no_gcc
+def test_runtime_params():
+    kernel_string = """
+        float product(int n) {
+            return (float) (factor * repeats);
+        }"""
+    tune_params = {"factor": [1, 2], "repeats": [1, 2, 3]}
+
+    with patch.object(CFunctions, "run_compiler", autospec=True, side_effect=CFunctions.run_compiler) as run_compiler:
+        results, _ = kernel_tuner.tune_kernel("product", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                              block_size_names=["factor"], runtime_params=["repeats"])
+
+    # compiled once per value of the compile-time parameter
+    assert run_compiler.call_count == 2
+    assert len(results) == 6
+    assert all([result["time"] == result["factor"] * result["repeats"] for result in results])
+
+    with raises(ValueError, match="not a tunable parameter"):
+        kernel_tuner.tune_kernel("product", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                 block_size_names=["factor"], runtime_params=["unknown"])
+
+
+@skip_if_no_gcc
+def test_runtime_params_multiple_files(tmp_path):
+    helper = str(tmp_path / "helper.cpp")
+    with open(helper, "w") as fp:
+        fp.write("inline float scale() { return (float) (factor * repeats); }\n")
+    kernel_string = f"""
+        #include "{helper}"
+
+        float product(int n) {{
+            return scale();
+        }}"""
+    tune_params = {"factor": [1, 2], "repeats": [1, 2, 3]}
+
+    # the included file declares the runtime parameters that the primary kernel source defines
+    results, _ = kernel_tuner.tune_kernel("product", [kernel_string, helper], 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                          block_size_names=["factor"], runtime_params=["repeats"])
+    assert len(results) == 6
+    assert all([result["time"] == result["factor"] * result["repeats"] for result in results])
+
+
+@skip_if_no_gcc
+def test_precompiled_header():
+    kernel_string = """
+        #include <vector>
+        #include <numeric>
+
+        float sum(int n) {
+            std::vector<float> v(size, 1.0f);
+            return std::accumulate(v.begin(), v.end(), 0.0f);
+        }"""
+    tune_params = {"size": [1, 2, 3]}
+
+    results, env = kernel_tuner.tune_kernel("sum", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                            block_size_names=["size"], precompiled_header=True)
+
+    assert [result["time"] for result in results] == [1.0, 2.0, 3.0]
+    # the warm-up compiles the first configuration once more
+    assert env["precompiled_header_uses"] == 4
+    assert env["precompiled_header_build_time"] > 0
+
+
+@skip_if_no_gcc
+def test_precompiled_header_depends_on_define(tmp_path):
+    with open(tmp_path / "scale.h", "w") as fp:
+        fp.write("#if fast\ninline float scale() { return 1.0f; }\n#else\ninline float scale() { return 2.0f; }\n#endif\n")
+    kernel_string = """
+        #include <scale.h>
+
+        extern "C" float product(int n) {
+            return scale();
+        }"""
+    tune_params = {"size": [1], "fast": [0, 1]}
+
+    # the tunable parameter changes the meaning of the include, so the precompiled header is not used
+    results, env = kernel_tuner.tune_kernel("product", kernel_string, 1, [np.int32(0)], tune_params, lang="C", quiet=True,
+                                            block_size_names=["size"], precompiled_header=True, compiler_options=["-I" + str(tmp_path)])
+    assert [result["time"] for result in results] == [2.0, 1.0]
+    assert env["precompiled_header_uses"] == 0
+
+
+def test_split_include_prefix():
+    kernel_string = "#define size 4\n#line 1\n#include <vector>\n// comment\n#include <kernels/size.h>\n#include \"local.h\"\nint x;\n#include <cmath>"
+    includes, rest = split_include_prefix(kernel_string, {"size": 4})
+
+    assert includes == "#include <vector>\n"
+    assert rest == "#define size 4\n#line 1\n\n// comment\n#include <kernels/size.h>\n#include \"local.h\"\nint x;\n#include <cmath>"
@@ -1,5 +1,7 @@
 from __future__ import print_function
 
+import os
+
 import numpy as np
 import pytest
 
@@ -8,8 +10,11 @@ try:
 except ImportError:
     from unittest.mock import patch
 
+import kernel_tuner
 from kernel_tuner import core
+from kernel_tuner.backend import Backend
 from kernel_tuner.interface import Options
+from kernel_tuner.observers import RuntimeObserver
 
 from .context import skip_if_no_pycuda
 
@@ -131,6 +136,156 @@ def test_check_kernel_output(dev_func_interface):
         assert True
 
 
+class FakeRuntimeObserver(RuntimeObserver):
+    """ Runtime observer that reports a preset sequence of execution times """
+
+    def __init__(self, measurements):
+        self.measurements = iter(measurements)
+        self.times = []
+
+    def after_finish(self):
+        self.times.append(next(self.measurements))
+
+    def get_results(self):
+        results = {"time": np.average(self.times), "times": self.times.copy()}
+        self.times = []
+        return results
+
+
+def get_fake_c_device(measurements):
+    with patch('kernel_tuner.core.CFunctions') as dev_func_interface:
+        dev_func_interface.return_value.observers = [FakeRuntimeObserver(measurements)]
+        dev_func_interface.return_value.kernel_finished.return_value = True
+        dev = core.DeviceInterface(core.KernelSource("name", "", lang="C"), iterations=7, quiet=True)
+    return dev
+
+
+def test_benchmark_default_fixed_iterations():
+    dev = get_fake_c_device([1.0] * 100)
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result)
+    assert len(result["times"]) == 7
+    assert "iterations" not in result
+
+
+def test_benchmark_default_adaptive_iterations():
+    # stable measurements stop at the minimum number of iterations
+    dev = get_fake_c_device([1.0] * 100)
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, dict(min_iterations=4))
+    assert result["iterations"] == 4
+    assert len(result["times"]) == 4
+    assert result["time_ci"] == [1.0, 1.0]
+
+    # noisy measurements continue until max_iterations
+    dev = get_fake_c_device(np.random.RandomState(1).uniform(1.0, 100.0, 100))
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, dict(rse=1e-6, max_iterations=20))
+    assert result["iterations"] == 20
+    assert result["time_ci"][0] < result["time"] < result["time_ci"][1]
+
+    # time budget ends benchmarking after min_iterations
+    dev = get_fake_c_device(np.random.RandomState(1).uniform(1.0, 100.0, 100))
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, dict(rse=1e-6, min_iterations=5, max_time=0))
+    assert result["iterations"] == 5
+
+
+def test_benchmark_default_racing():
+    # a configuration that is clearly slower than the incumbent is dropped early
+    dev = get_fake_c_device([5.0, 5.1, 4.9, 5.0, 5.2, 5.0, 4.9])
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, racing=True, incumbent=1.0)
+    assert result["partial"]
+    assert result["iterations"] == 2
+    assert len(result["times"]) == 2
+
+    # a configuration that may beat the incumbent is benchmarked completely
+    dev = get_fake_c_device([1.0, 1.1, 0.9, 1.0, 1.2, 1.0, 0.9])
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, racing=True, incumbent=1.0)
+    assert "partial" not in result
+    assert len(result["times"]) == 7
+
+    # the margin allows configurations to be slightly slower than the incumbent
+    dev = get_fake_c_device([1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5])
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, racing=dict(margin=1.0), incumbent=1.0)
+    assert "partial" not in result
+
+    # without an incumbent there is nothing to race against
+    dev = get_fake_c_device([5.0] * 7)
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, racing=True)
+    assert len(result["times"]) == 7
+
+
+def test_benchmark_default_aggregator():
+    # the mean cannot compete with the incumbent, but the minimum can
+    measurements = [0.9, 5.0, 5.0, 5.0, 5.0, 5.0, 5.0]
+    dev = get_fake_c_device(measurements)
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, racing=True, incumbent=1.0)
+    assert result["partial"]
+
+    dev = get_fake_c_device(measurements)
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, racing=True, incumbent=1.0, aggregator="min")
+    assert "partial" not in result
+    assert len(result["times"]) == 7
+
+    # the confidence interval is that of the aggregated execution time
+    dev = get_fake_c_device(np.random.RandomState(1).uniform(1.0, 100.0, 100))
+    result = {}
+    dev.benchmark_default("func", [], (1, 1, 1), (1, 1, 1), result, dict(rse=1e-6, max_iterations=20), aggregator="median")
+    assert result["time_ci"][0] <= np.median(result["times"]) <= result["time_ci"][1]
+
+
+def test_get_racing_options():
+    options = core.get_racing_options(True)
+    assert options["margin"] == 0.0
+    assert options["min_iterations"] == 2
+
+    with pytest.raises(ValueError):
+        core.get_racing_options(dict(confidence=1.5))
+    with pytest.raises(ValueError):
+        core.get_racing_options("yes")
+
+
+def test_get_lower_confidence_bound():
+    assert core.get_lower_confidence_bound([1.0]) == -np.inf
+    assert core.get_lower_confidence_bound([2.0, 2.0]) == 2.0
+    times = [1.0, 2.0, 3.0]
+    assert core.get_lower_confidence_bound(times) < 2.0
+    assert core.get_lower_confidence_bound(times, 0.99) < core.get_lower_confidence_bound(times, 0.9)
+    assert core.get_lower_confidence_bound([1.0, 5.0, 5.0, 5.0], aggregator="min") == 1.0
+    lower, upper = core.get_confidence_interval([1.0, 2.0, 3.0, 10.0], aggregator="median")
+    assert lower <= 2.5 <= upper and upper <= 10.0
+
+
+def test_get_adaptive_iterations_options():
+    options = core.get_adaptive_iterations_options(True)
+    assert options["rse"] == 0.01
+    assert options["max_iterations"] == 100
+
+    options = core.get_adaptive_iterations_options(dict(rse=0.05))
+    assert options["rse"] == 0.05
+    assert options["min_iterations"] == 3
+
+    with pytest.raises(ValueError):
+        core.get_adaptive_iterations_options(dict(unknown=1))
+    with pytest.raises(ValueError):
+        core.get_adaptive_iterations_options(dict(min_iterations=0))
+
+
+def test_get_relative_standard_error():
+    assert core.get_relative_standard_error([1.0]) == np.inf
+    assert core.get_relative_standard_error([2.0, 2.0, 2.0]) == 0.0
+    times = [1.0, 2.0, 3.0, 4.0]
+    expected = np.std(times, ddof=1) / np.sqrt(4) / 2.5
+    assert np.isclose(core.get_relative_standard_error(times), expected)
+
+
 def test_default_verify_function_arrays():
 
     answer = [np.zeros(4).astype(np.float32), None, np.ones(5).astype(np.int32)]
@@ -278,3 +433,137 @@ template<typename TF> __global__ void __launch_bounds__(THREADS_PER_BLOCK, BLOCK
 
     # test that the template wrapper matches the right kernel (the second not the first)
     assert 'extern "C" __global__ void __launch_bounds__(THREADS_PER_BLOCK, BLOCKS_PER_SM) vector_add1_wrapper(float * c, const float *__restrict__ a, float * b, int n)' in ans
+
+
+def test_kernel_source_prepare_list_of_files(tmp_path):
+    primary = tmp_path / "kernel.c"
+    secondary = tmp_path / "header.cuh"
+    primary.write_text("#include \"%s\"\nfloat kernel() { return block_size_x; }" % secondary)
+    secondary.write_text("#define value block_size_x")
+
+    kernel_source = core.KernelSource("kernel", [str(primary), str(secondary)], lang="C")
+    kernel_source.max_prepared = 2
+    threads, grid = (1, 1, 1), (1, 1, 1)
+    block_size_names = ["block_size_x", "block_size_y", "block_size_z"]
+
+    with patch("kernel_tuner.util.read_file", wraps=core.util.read_file) as read_file:
+        name, kernel_string, temp_files = kernel_source.prepare_list_of_files("kernel", {"block_size_x": 1}, grid, threads, block_size_names)
+        again = kernel_source.prepare_list_of_files("kernel", {"block_size_x": 1}, grid, threads, block_size_names)
+        other = kernel_source.prepare_list_of_files("kernel", {"block_size_x": 2}, grid, threads, block_size_names)
+
+    # each source file is read once and repeated instances are reused
+    assert read_file.call_count == 2
+    assert again == (name, kernel_string, temp_files)
+    assert other[1] != kernel_string
+    assert os.path.isfile(temp_files[str(secondary)])
+
+    # the least recently used instance is removed with its temp files
+    kernel_source.prepare_list_of_files("kernel", {"block_size_x": 3}, grid, threads, block_size_names)
+    assert not os.path.isfile(temp_files[str(secondary)])
+
+    kernel_source.cleanup()
+    assert not os.path.isfile(other[2][str(secondary)])
+
+
+class PythonFunctions(Backend):
+    """ minimal backend that 'compiles' kernels by returning the tunable parameters """
+    capabilities = frozenset(["constant_memory"])
+
+    def __init__(self, iterations=7, **kwargs):
+        self.name = "python"
+        self.max_threads = 1024
+        self.units = {}
+        self.env = {"device_name": self.name}
+        self.iterations = iterations
+        self.last_result = 0.0
+        self.cmem_args = None
+
+        class Observer(RuntimeObserver):
+            def __init__(self, dev):
+                self.dev = dev
+                self.times = []
+
+            def after_finish(self):
+                self.times.append(self.dev.last_result)
+
+        self.observers = [Observer(self)]
+
+    def ready_argument_list(self, arguments):
+        return arguments
+
+    def compile(self, kernel_instance):
+        return kernel_instance.params
+
+    def start_event(self):
+        pass
+
+    def stop_event(self):
+        pass
+
+    def kernel_finished(self):
+        return True
+
+    def synchronize(self):
+        pass
+
+    def run_kernel(self, func, gpu_args, threads, grid):
+        self.last_result = float(func["x"])
+
+    def memset(self, allocation, value, size):
+        pass
+
+    def memcpy_dtoh(self, dest, src):
+        dest[:] = src
+
+    def memcpy_htod(self, dest, src):
+        dest[:] = src
+
+    def copy_constant_memory_args(self, cmem_args):
+        self.cmem_args = cmem_args
+
+
+@pytest.fixture
+def python_backend():
+    core.register_backend("PYTHON_TEST", PythonFunctions)
+    yield
+    del core._backends["PYTHON_TEST"]
+
+
+def test_register_backend(python_backend):
+    assert core.get_backend("python_test") is PythonFunctions
+    with pytest.raises(ValueError):
+        core.register_backend("PYTHON_TEST", PythonFunctions)
+    core.register_backend("PYTHON_TEST", "test.test_core:PythonFunctions", replace=True)
+    assert core.get_backend("PYTHON_TEST") is PythonFunctions
+
+    with pytest.raises(ValueError):
+        core.get_backend("NOT_A_LANGUAGE")
+
+    class Incomplete:
+        def compile(self, kernel_instance):
+            pass
+
+    with pytest.raises(TypeError):
+        core.register_backend("INCOMPLETE", Incomplete)
+
+    class UnknownCapability(PythonFunctions):
+        capabilities = frozenset(["tensor_cores"])
+
+    with pytest.raises(ValueError):
+        core.register_backend("UNKNOWN_CAPABILITY", UnknownCapability)
+
+
+def test_tune_registered_backend(python_backend):
+    cmem_args = {"x": np.zeros(1)}
+    tune_params = {"x": [3, 1, 2]}
+    with pytest.warns(UserWarning, match="smem_args"):
+        results, env = kernel_tuner.tune_kernel("kernel", "kernel source", 1, [np.zeros(1)], tune_params, lang="python_test",
+                                                smem_args={"size": 1}, cmem_args=cmem_args, verbose=False)
+    assert [r["time"] for r in results] == [3.0, 1.0, 2.0]
+    assert env["device_name"] == "python"
+
+    dev = core.DeviceInterface(core.KernelSource("kernel", "kernel source", "python_test"))
+    assert dev.supports("constant_memory")
+    assert not dev.supports("texture_memory")
+    with pytest.raises(RuntimeError):
+        dev.copy_texture_memory_args({})
@@ -0,0 +1,24 @@
+import json
+import os
+import subprocess
+import sys
+
+import kernel_tuner
+
+# generous budget in seconds for importing kernel_tuner in a fresh interpreter, mostly spent on numpy and scipy
+import_time_budget = 5.0
+
+backend_modules = ["kernel_tuner.pycuda", "kernel_tuner.cupy", "kernel_tuner.nvcuda", "kernel_tuner.opencl", "kernel_tuner.c", "kernel_tuner.nvml",
+                   "pycuda", "cupy", "cuda", "pyopencl", "pynvml", "torch"]
+
+
+def test_import_time():
+    code = "import json, sys, time; start = time.perf_counter(); import kernel_tuner; " \
+           "print(json.dumps([time.perf_counter() - start, list(sys.modules.keys())]))"
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(kernel_tuner.__file__))))
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    import_time, modules = json.loads(output.decode().splitlines()[-1])
+
+    # backends are only imported once a DeviceInterface for that language is created
+    assert not [module for module in backend_modules if module in modules]
+    assert import_time < import_time_budget
@@ -0,0 +1,134 @@
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import kernel_tuner
+from kernel_tuner import models, util
+
+
+@pytest.fixture
+def tune_params():
+    tune_params = OrderedDict()
+    tune_params["block_size_x"] = [32, 64, 128, 256, 512, 1024]
+    tune_params["block_size_y"] = [1, 2, 4]
+    tune_params["tile_size"] = [1, 2, 4, 8]
+    tune_params["method"] = ["naive", "tiled"]
+    return tune_params
+
+
+def get_all_columns(tune_params):
+    configs = list(itertools.product(*tune_params.values()))
+    return configs, models.get_columns(configs, tune_params)
+
+
+def test_get_columns_and_indices(tune_params):
+    configs = [(64, 4, 8, "tiled"), (32, 1, 1, "naive")]
+    columns = models.get_columns(configs, tune_params)
+    assert columns["block_size_x"].dtype == np.float64
+    assert columns["method"].dtype == object
+    indices = models.get_indices(columns, tune_params)
+    assert indices["block_size_x"].tolist() == [1, 0]
+    assert indices["block_size_y"].tolist() == [2, 0]
+    assert indices["tile_size"].tolist() == [3, 0]
+    assert indices["method"].tolist() == [1, 0]
+
+
+def test_hash_uniform(tune_params):
+    _, columns = get_all_columns(tune_params)
+    indices = models.get_indices(columns, tune_params)
+    u = models.hash_uniform(indices, seed=1)
+    assert np.all((u >= 0) & (u < 1))
+    assert np.array_equal(u, models.hash_uniform(indices, seed=1))
+    assert not np.array_equal(u, models.hash_uniform(indices, seed=2))
+    # the numbers should be roughly uniformly distributed
+    assert 0.4 < np.mean(u) < 0.6
+
+
+def test_roofline(tune_params):
+    configs, columns = get_all_columns(tune_params)
+    result = models.Roofline(compile_time=500.0)(columns, tune_params)
+    time = result["time"]
+    assert len(time) == len(configs)
+    threads = columns["block_size_x"] * columns["block_size_y"]
+    # too many threads per block fail
+    assert np.all(np.isnan(time[threads > 1024]))
+    # configurations that need too many registers per multiprocessor also fail
+    assert np.isnan(time[(threads == 1024) & (columns["tile_size"] == 8)]).all()
+    assert np.all(time[~np.isnan(time)] > 0)
+    assert np.sum(~np.isnan(time)) > len(time) // 2
+    assert np.all((result["compile_time"] >= 375.0) & (result["compile_time"] <= 625.0))
+
+
+def test_failure_rate(tune_params):
+    _, columns = get_all_columns(tune_params)
+    model = models.Multimodal(failure_rate=0.25)
+    time = model(columns, tune_params)["time"]
+    assert 0.1 < np.mean(np.isnan(time)) < 0.4
+    # the same configurations fail on every evaluation
+    assert np.array_equal(np.isnan(time), np.isnan(model(columns, tune_params)["time"]))
+
+
+def test_multimodal_optimum(tune_params):
+    _, columns = get_all_columns(tune_params)
+    time = models.Multimodal(seed=3)(columns, tune_params)["time"]
+    assert np.isclose(np.min(time), 1.0)
+
+
+def test_noisy(tune_params):
+    _, columns = get_all_columns(tune_params)
+    model = models.Noisy("multimodal", stddev=0.1, seed=1)
+    first = model(columns, tune_params)["time"]
+    second = model(columns, tune_params)["time"]
+    assert not np.array_equal(first, second)
+    assert np.allclose(first, second, rtol=1.0)
+
+
+def test_get_model():
+    assert isinstance(models.get_model("roofline"), models.Roofline)
+    func = lambda columns, tune_params: columns["x"]
+    assert models.get_model(func) is func
+    with pytest.raises(ValueError):
+        models.get_model("unknown")
+
+
+def test_tune_kernel_with_model(tune_params):
+    restrictions = ["block_size_x*block_size_y<=1024"]
+    results, env = kernel_tuner.tune_kernel("kernel", "kernel", 1, [], tune_params, restrictions=restrictions, model="roofline", iterations=10,
+                                            quiet=True)
+    assert len(results) == 120
+    assert env["model"] == "roofline"
+    valid = [r for r in results if not isinstance(r["time"], util.ErrorConfig)]
+    assert valid
+    assert all(np.isclose(r["benchmark_time"], 10 * r["time"]) for r in valid)
+    assert np.isclose(env["simulated_time"], sum(r["compile_time"] + r["benchmark_time"] for r in results))
+
+
+def test_tune_kernel_with_callable_model(tune_params):
+
+    def model(columns, tune_params):
+        time = columns["block_size_x"] / columns["tile_size"]
+        return dict(time=np.where(columns["method"] == "naive", np.nan, time), gflops=1e3 / time)
+
+    metrics = OrderedDict(tflops="gflops / 1000")
+    results, _ = kernel_tuner.tune_kernel("kernel", "kernel", 1, [], tune_params, model=model, metrics=metrics, quiet=True)
+    assert len(results) == 120
+    for r in results:
+        if r["method"] == "naive":
+            assert isinstance(r["time"], util.RuntimeFailedConfig)
+        else:
+            assert r["time"] == r["block_size_x"] / r["tile_size"]
+            assert np.isclose(r["tflops"], r["gflops"] / 1000)
+
+
+def test_tune_kernel_with_model_cache(tune_params, tmp_path):
+    cache = str(tmp_path / "cache.json")
+    results, env = kernel_tuner.tune_kernel("kernel", "kernel", 1, [], tune_params, model="roofline", quiet=True, cache=cache)
+    assert len(util.read_cache(cache)["cache"]) == len(results)
+    assert env["simulated_time"] > 0
+
+    # the second run reads all configurations from the cache instead of evaluating the model again
+    cached_results, env = kernel_tuner.tune_kernel("kernel", "kernel", 1, [], tune_params, model="roofline", quiet=True, cache=cache)
+    assert env["simulated_time"] == 0
+    assert [str(r["time"]) for r in cached_results] == [str(r["time"]) for r in results]
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import kernel_tuner
+from kernel_tuner import util
+from kernel_tuner.numba import NumbaFunctions
+
+from .context import skip_if_no_numba
+
+kernel_string = """
+from numba import prange
+
+def vector_add(c, a, b, n):
+    for chunk in prange((n + chunk_size - 1) // chunk_size):
+        for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+            c[i] = a[i] + b[i]
+"""
+
+
+def get_vector_add_args(size=10000):
+    a = np.random.randn(size).astype(np.float32)
+    b = np.random.randn(size).astype(np.float32)
+    c = np.zeros_like(b)
+    n = np.int32(size)
+    return [c, a, b, n]
+
+
+def test_get_jit_options():
+    assert NumbaFunctions.get_jit_options(None) == {"parallel": True}
+    options = NumbaFunctions.get_jit_options(["fastmath", "parallel=False", "error_model='numpy'"])
+    assert options == {"parallel": False, "fastmath": True, "error_model": "numpy"}
+    with pytest.raises(ValueError):
+        NumbaFunctions.get_jit_options(["-O3"])
+
+
+def test_prepare_kernel_string_numba():
+    params = OrderedDict(chunk_size=128)
+    name, kernel = util.prepare_kernel_string("vector_add", kernel_string, params, (1, 1, 1), (1, 1, 1), ["block_size_x", "block_size_y", "block_size_z"],
+                                              "NUMBA", None)
+    assert name == "vector_add"
+    assert kernel.startswith("grid_size_x = 1\n")
+    assert "chunk_size = 128\nkernel_tuner = 1\n\nfrom numba import prange" in kernel
+    assert "#" not in kernel
+    compile(kernel, "<vector_add>", "exec")
+
+
+@skip_if_no_numba
+def test_tune_kernel():
+    args = get_vector_add_args()
+    answer = [args[1] + args[2], None, None, None]
+    tune_params = OrderedDict(chunk_size=[64, 1024], unused=[1, 2])
+    # only chunk_size is inserted in the code, configurations that differ only in unused are compiled once
+    defines = {"chunk_size": "chunk_size"}
+    results, env = kernel_tuner.tune_kernel("vector_add", kernel_string, int(args[-1]), args, tune_params, lang="numba", answer=answer,
+                                            defines=defines, verbose=False)
+    assert len(results) == 4
+    assert all(r["time"] > 0 for r in results)
+    assert env["compile_cache_hits"] >= 2
+
+
+@skip_if_no_numba
+def test_compile_errors_are_raised(monkeypatch, tmp_path):
+    # the failing kernel is dumped to a temporary file in the working directory
+    monkeypatch.chdir(tmp_path)
+    args = get_vector_add_args()
+    with pytest.raises(ValueError):
+        kernel_tuner.tune_kernel("not_defined", kernel_string, int(args[-1]), args, {"chunk_size": [64]}, lang="numba")
@@ -173,6 +173,56 @@ def test_random_sample():
         assert False
 
 
+def test_indices_of_params_values_indices():
+    """test that configurations given by the indices of their parameter values are found in the searchspace"""
+    params_values_indices = simple_searchspace.get_params_values_indices()
+    assert np.array_equal(simple_searchspace.get_indices_of_params_values_indices(params_values_indices), np.arange(simple_searchspace.size))
+
+    # x = 1.5 is restricted
+    indices = simple_searchspace.get_indices_of_params_values_indices([[1, 0, 0], [3, 1, 1]])
+    assert indices[0] == -1
+    assert simple_searchspace.list[indices[1]] == (3, 5.5, "string_2")
+
+
+def test_nearest_indices():
+    """test that points in the normalized space are snapped to the nearest valid configurations"""
+    normalized = simple_searchspace.get_normalized_array()
+    assert normalized.shape == (simple_searchspace.size, simple_searchspace.num_params)
+    assert np.all((normalized > 0) & (normalized < 1))
+
+    # the normalized configurations are their own nearest configurations
+    assert np.array_equal(simple_searchspace.get_nearest_indices(normalized), np.arange(simple_searchspace.size))
+
+    # x = 1.5 is restricted, so x is snapped to 1 or 2 and points outside [0, 1] are snapped to the corners
+    indices = simple_searchspace.get_nearest_indices([[0.3, 0.2, 0.2], [-1, -1, -1], [2, 2, 2]])
+    assert simple_searchspace.list[indices[0]] == (1, 4, "string_1")
+    assert simple_searchspace.list[indices[1]] == (1, 4, "string_1")
+    assert simple_searchspace.list[indices[2]] == (3, 5.5, "string_2")
+
+
+def test_nearest_indices_spaces():
+    """test that points in the scaled space of the strategies and in the raw space are snapped like in the normalized space"""
+    tune_params = OrderedDict([("x", [1, 2, 4, 8]), ("y", [16, 4, 1])])
+    nearest_searchspace = Searchspace(Options(dict(restrictions=[lambda x, y: x != 2 or y != 4], tune_params=tune_params)), max_threads)
+    eps = 0.25
+    scaled = np.array([[0.5 * eps + eps * x, 0.5 * eps + eps * y] for x, y in nearest_searchspace.get_params_values_indices()])
+    assert np.array_equal(nearest_searchspace.get_nearest_indices(scaled, "scaled", eps), np.arange(nearest_searchspace.size))
+
+    # raw values are snapped to the nearest value of each parameter, and then to the nearest valid configuration
+    assert nearest_searchspace.get_nearest_configs([[5.9, 1.2], [7, 20], [0, 0]], "raw") == [(4, 1), (8, 16), (1, 1)]
+    assert nearest_searchspace.get_nearest_configs([[2, 4]], "raw")[0] in [(1, 4), (4, 4), (2, 16), (2, 1)]
+
+    # the values of a parameter need not be sorted
+    unsorted_searchspace = Searchspace(Options(dict(restrictions=[], tune_params=OrderedDict([("x", [4, 1, 2])]))), max_threads)
+    assert unsorted_searchspace.get_nearest_configs([[3.1], [1.4], [0], [9]], "raw") == [(4, ), (1, ), (1, ), (4, )]
+
+    try:
+        nearest_searchspace.get_nearest_indices([[0, 0]], "unknown")
+        assert False, value_error_expectation_message
+    except ValueError as e:
+        assert "Unknown space" in str(e)
+
+
 def __test_neighbors_prebuilt(param_config: tuple, expected_neighbors: list, neighbor_method: str):
     simple_searchspace_prebuilt = Searchspace(
         simple_tuning_options,
@@ -220,6 +220,26 @@ def test_prepare_kernel_string_partial_loop_unrolling():
     assert not "#pragma unroll loop_unroll_factor_monkey" in output
 
 
+def test_prepare_kernel_string_runtime_params():
+    kernel = "this is a weird kernel"
+    threads = (1, 2, 3)
+    grid = (4, 5, 6)
+    params = {"is": 8, "weird": 0.5}
+
+    _, output = prepare_kernel_string("this", kernel, params, grid, threads, block_size_names, "C", None, ["is", "weird"])
+    assert "#define is" not in output
+    assert "int is;" in output
+    assert "double weird;" in output
+    assert output.endswith("#line 1\n" + kernel)
+
+    _, output = prepare_kernel_string("this", kernel, params, grid, threads, block_size_names, "C", None, ["is"], extern_runtime_params=True)
+    assert "extern int is;" in output
+
+    with pytest.raises(ValueError):
+        check_runtime_params(["is"], {"is": ["a", "b"]}, "C")
+    with pytest.raises(ValueError):
+        check_runtime_params(["is"], {"is": [1, 2]}, "CUDA")
+
 
 def test_replace_param_occurrences():
     kernel = "this is a weird kernel"
@@ -625,12 +645,37 @@ def test_process_cache():
             tuning_options.tune_params["y"] = ["a", "b"]
             process_cache(cache, kernel_options, tuning_options, runner)
         assert "parameter" in str(excep.value)
+        del tuning_options.tune_params["y"]
+
+        # results aggregated with a different aggregator can only be used in simulation mode
+        tuning_options["aggregator"] = "median"
+        with pytest.raises(ValueError) as excep:
+            process_cache(cache, kernel_options, tuning_options, runner)
+        assert "aggregated" in str(excep.value)
 
     finally:
         delete_temp_file(cache)
         # pass
 
 
+def test_reaggregate_cache():
+    cache = {
+        "1": {"x": 1, "time": 2.5, "times": [1.0, 2.0, 3.0, 4.0]},
+        "2": {"x": 2, "time": 15.0, "times": [10.0, 10.0, 40.0]},
+        "3": {"x": 3, "time": InvalidConfig()},
+    }
+    metrics = OrderedDict()
+    metrics["speed"] = lambda p: 1 / p["time"]
+    tuning_options = Options(aggregator="min", metrics=metrics)
+
+    reaggregate_cache(cache, tuning_options)
+
+    assert cache["1"]["time"] == 1.0
+    assert cache["2"]["time"] == 10.0
+    assert cache["2"]["speed"] == 0.1
+    assert isinstance(cache["3"]["time"], InvalidConfig)
+
+
 def test_process_metrics():
     params = {
         "x": 15,